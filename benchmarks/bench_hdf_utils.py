@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmarks for writing USID datasets
+
+Created on Sun Oct 18 2026
+
+@author: Suhas Somnath, Chris Smith
+"""
+
+from __future__ import division, print_function, unicode_literals, \
+    absolute_import
+import numpy as np
+import h5py
+
+from pyUSID.io.hdf_utils import write_main_dataset
+
+from .common import get_dims, remove_file
+
+
+class WriteMainDatasetSuite(object):
+    """
+    Writing a main dataset along with its ancillary datasets
+    """
+    params = ['small', 'large']
+    param_names = ['size']
+    version = 1
+
+    def setup(self, size):
+        self.pos_dims, self.spec_dims = get_dims(size)
+        num_pos = np.prod([len(dim.values) for dim in self.pos_dims])
+        num_spec = np.prod([len(dim.values) for dim in self.spec_dims])
+        self.data = np.random.RandomState(42).rand(num_pos, num_spec).astype(np.float32)
+        self.h5_path = 'write_main_dataset_{}.h5'.format(size)
+        self.h5_file = h5py.File(self.h5_path, mode='w')
+        self.index = 0
+
+    def teardown(self, size):
+        self.h5_file.close()
+        remove_file(self.h5_path)
+
+    def time_write_main_dataset(self, size):
+        # Each call writes into a fresh group since names of datasets cannot be reused
+        h5_group = self.h5_file.create_group('Group_{}'.format(self.index))
+        self.index += 1
+        _ = write_main_dataset(h5_group, self.data, 'Raw_Data', 'Current', 'nA',
+                               self.pos_dims, self.spec_dims)
+
+    def time_write_empty_main_dataset(self, size):
+        h5_group = self.h5_file.create_group('Group_{}'.format(self.index))
+        self.index += 1
+        _ = write_main_dataset(h5_group, self.data.shape, 'Raw_Data', 'Current', 'nA',
+                               self.pos_dims, self.spec_dims, dtype=np.float32)
@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmarks for computing on USID datasets via Process
+
+Created on Sun Oct 18 2026
+
+@author: Suhas Somnath, Chris Smith
+"""
+
+from __future__ import division, print_function, unicode_literals, \
+    absolute_import
+import numpy as np
+import h5py
+
+from pyUSID.io.hdf_utils import create_results_group, write_main_dataset
+from pyUSID.io.usi_data import USIDataset
+from pyUSID.io.write_utils import Dimension
+from pyUSID.processing.process import Process
+
+from .common import make_usid_file, remove_file, MAIN_DSET_PATH
+
+
+class MeanSpectrum(Process):
+    """
+    Toy process that computes the mean of the spectrum at each position
+    """
+
+    def __init__(self, h5_main, **kwargs):
+        super(MeanSpectrum, self).__init__(h5_main, 'Mean_Spectrum', **kwargs)
+
+    def _create_results_datasets(self):
+        self.h5_results_grp = create_results_group(self.h5_main, self.process_name)
+        self.h5_results = write_main_dataset(self.h5_results_grp, (self.h5_main.shape[0], 1), 'Mean',
+                                             'Current', 'nA', None, Dimension('Empty', 'a. u.', 1),
+                                             dtype=np.float32, h5_pos_inds=self.h5_main.h5_pos_inds,
+                                             h5_pos_vals=self.h5_main.h5_pos_vals)
+
+    def _get_existing_datasets(self):
+        self.h5_results = self.h5_results_grp['Mean']
+
+    @staticmethod
+    def _map_function(spectrum, *args, **kwargs):
+        return np.mean(spectrum)
+
+    def _write_results_chunk(self):
+        self._write_to_positions(self.h5_results, self._results)
+
+
+class ProcessSuite(object):
+    """
+    Computing a toy process on a fresh copy of the dataset with a varying
+    number of cores. The number of cores is capped at the number of logical
+    cores available on the machine
+    """
+    params = [['small', 'large'], [1, 2, 4]]
+    param_names = ['size', 'cores']
+    version = 1
+    # Each run writes results so every sample needs a fresh file
+    number = 1
+    repeat = 5
+    timeout = 300
+
+    def setup(self, size, cores):
+        self.h5_path = make_usid_file('process_{}_{}.h5'.format(size, cores), size)
+        self.h5_file = h5py.File(self.h5_path, mode='r+')
+        self.h5_main = USIDataset(self.h5_file[MAIN_DSET_PATH])
+
+    def teardown(self, size, cores):
+        self.h5_file.close()
+        remove_file(self.h5_path)
+
+    def time_compute(self, size, cores):
+        proc = MeanSpectrum(self.h5_main, cores=cores)
+        _ = proc.compute(override=True)
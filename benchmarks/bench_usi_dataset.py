@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmarks for opening, reshaping, slicing and reducing USIDatasets
+
+Created on Sun Oct 18 2026
+
+@author: Suhas Somnath, Chris Smith
+"""
+
+from __future__ import division, print_function, unicode_literals, \
+    absolute_import
+import h5py
+
+from pyUSID.io.usi_data import USIDataset
+from pyUSID.io.hdf_utils import reshape_to_n_dims
+
+from .common import make_usid_file, MAIN_DSET_PATH
+
+
+class USIDatasetSuite(object):
+    """
+    Operations on a USIDataset that only read from the file
+    """
+    params = ['small', 'large']
+    param_names = ['size']
+    # Update whenever the synthetic data or the operations change so that results are not compared incorrectly
+    version = 1
+
+    def setup_cache(self):
+        # asv runs this once in a directory that is cleaned up after all benchmarks in this class
+        return dict([(size, make_usid_file('usi_dataset_{}.h5'.format(size), size)) for size in self.params])
+
+    def setup(self, h5_paths, size):
+        self.h5_file = h5py.File(h5_paths[size], mode='r')
+        self.h5_dset = self.h5_file[MAIN_DSET_PATH]
+        self.usi_dset = USIDataset(self.h5_dset)
+
+    def teardown(self, h5_paths, size):
+        self.h5_file.close()
+
+    def time_open(self, h5_paths, size):
+        _ = USIDataset(self.h5_dset)
+
+    def time_reshape_to_n_dims(self, h5_paths, size):
+        _ = reshape_to_n_dims(self.h5_dset)
+
+    def time_get_n_dim_form(self, h5_paths, size):
+        _ = self.usi_dset.get_n_dim_form()
+
+    def time_slice_by_position(self, h5_paths, size):
+        _ = self.usi_dset.slice({'X': 3, 'Y': slice(2, 12)})
+
+    def time_slice_strided_positions(self, h5_paths, size):
+        _ = self.usi_dset.slice({'X': slice(0, None, 2)})
+
+    def time_slice_by_spectroscopic(self, h5_paths, size):
+        _ = self.usi_dset.slice({'Bias': slice(0, 16), 'Cycle': 1})
+
+    def time_reduce(self, h5_paths, size):
+        _ = self.usi_dset.reduce(['Bias'])
+
+    def peakmem_get_n_dim_form(self, h5_paths, size):
+        _ = self.usi_dset.get_n_dim_form()
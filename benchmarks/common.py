@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+"""
+Utilities shared by the benchmarks such as generating synthetic USID files
+
+Created on Sun Oct 18 2026
+
+@author: Suhas Somnath, Chris Smith
+"""
+
+from __future__ import division, print_function, unicode_literals, \
+    absolute_import
+import os
+import numpy as np
+
+from pyUSID.io.numpy_translator import ArrayTranslator
+from pyUSID.io.write_utils import Dimension
+
+# Scales the number of positions in the synthetic datasets. For example, 2 quadruples the number of positions.
+# Only compare results that were obtained with the same scale
+SCALE = int(os.environ.get('PYUSID_BENCH_SCALE', 1))
+
+# Number of rows / columns of positions and the number of bias steps / cycles per position for each size
+SIZES = {'small': (32, 32, 64, 2),
+         'large': (96, 96, 128, 4)}
+
+MAIN_DSET_PATH = 'Measurement_000/Channel_000/Raw_Data'
+
+
+def get_dims(size):
+    """
+    Returns the position and spectroscopic dimensions of a synthetic dataset
+
+    Parameters
+    ----------
+    size : str
+        One of the keys in :data:`SIZES`
+
+    Returns
+    -------
+    pos_dims : list of :class:`~pyUSID.io.write_utils.Dimension`
+        Position dimensions arranged from fastest to slowest varying
+    spec_dims : list of :class:`~pyUSID.io.write_utils.Dimension`
+        Spectroscopic dimensions arranged from fastest to slowest varying
+    """
+    num_rows, num_cols, num_bias, num_cycles = SIZES[size]
+    pos_dims = [Dimension('X', 'nm', num_cols * SCALE),
+                Dimension('Y', 'nm', num_rows * SCALE)]
+    spec_dims = [Dimension('Bias', 'V', np.linspace(-1, 1, num_bias)),
+                 Dimension('Cycle', 'a. u.', num_cycles)]
+    return pos_dims, spec_dims
+
+
+def make_usid_file(h5_path, size, **kwargs):
+    """
+    Writes a synthetic USID dataset containing random numbers into a new HDF5
+    file using the :class:`~pyUSID.io.numpy_translator.ArrayTranslator`.
+    The same random numbers are generated every time for a given size
+
+    Parameters
+    ----------
+    h5_path : str
+        Path to the HDF5 file. Any existing file will be overwritten
+    size : str
+        One of the keys in :data:`SIZES`
+    kwargs : dict
+        Keyword arguments passed on to the translator such as chunks
+
+    Returns
+    -------
+    h5_path : str
+        Path to the HDF5 file. The main dataset is located at :data:`MAIN_DSET_PATH`
+    """
+    pos_dims, spec_dims = get_dims(size)
+    num_pos = np.prod([len(dim.values) for dim in pos_dims])
+    num_spec = np.prod([len(dim.values) for dim in spec_dims])
+    data = np.random.RandomState(42).rand(num_pos, num_spec).astype(np.float32)
+
+    remove_file(h5_path)
+    _ = ArrayTranslator().translate(h5_path, 'Synthetic', data, 'Current', 'nA',
+                                    pos_dims, spec_dims, **kwargs)
+    return os.path.abspath(h5_path)
+
+
+def remove_file(h5_path):
+    """
+    Deletes the provided file if it exists
+
+    Parameters
+    ----------
+    h5_path : str
+        Path to the file
+    """
+    if h5_path is not None and os.path.exists(h5_path):
+        os.remove(h5_path)
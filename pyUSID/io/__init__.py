@@ -9,6 +9,7 @@ Submodules
 
     hdf_utils
     dtype_utils
+    export_utils
     image
     io_utils
     numpy_translator
@@ -24,6 +25,7 @@ from . import hdf_utils
 from . import io_utils
 from . import dtype_utils
 from . import write_utils
+from . import export_utils
 
 from .usi_data import USIDataset
 from .numpy_translator import NumpyTranslator, ArrayTranslator
@@ -31,5 +33,5 @@ from .image import ImageTranslator
 from .write_utils import Dimension, DimType
 
 
-__all__ = ['USIDataset', 'hdf_utils', 'io_utils', 'dtype_utils', 'NumpyTranslator', 'write_utils',
+__all__ = ['USIDataset', 'hdf_utils', 'io_utils', 'dtype_utils', 'NumpyTranslator', 'write_utils', 'export_utils',
            'ImageTranslator', 'Dimension', 'DimType', 'ArrayTranslator', 'Translator']
@@ -0,0 +1,429 @@
+# -*- coding: utf-8 -*-
+"""
+Utilities for exporting USID Main datasets to columnar (Apache Arrow, Parquet) and chunked (Zarr) formats one block
+of positions at a time
+
+Created on Sun Oct 18 2026
+
+@author: Suhas Somnath, Chris Smith
+"""
+
+from __future__ import division, print_function, absolute_import, unicode_literals
+import json
+import importlib
+from collections import OrderedDict
+import numpy as np
+import h5py
+import dask
+import dask.array as da
+from sidpy.hdf.hdf_utils import get_attr, lazy_load_array
+from sidpy.proc.comp_utils import recommend_cpu_cores
+
+__all__ = ['EXPORT_MEM_BYTES', 'get_rows_per_block', 'get_export_columns', 'get_block_columns', 'iter_blocks',
+           'get_arrow_schema', 'write_arrow', 'write_zarr']
+
+EXPORT_MEM_BYTES = 1024 ** 3
+"""
+Default upper limit on the memory occupied by all the blocks being exported at any given time in bytes
+"""
+
+
+def _import_optional(module_name, purpose):
+    """
+    Imports an optional dependency
+
+    Parameters
+    ----------
+    module_name : str
+        Name of the module to import
+    purpose : str
+        What the module is needed for. Used in the error message
+
+    Returns
+    -------
+    module
+        The imported module
+    """
+    try:
+        return importlib.import_module(module_name)
+    except ImportError:
+        package = module_name.split('.')[0]
+        raise ImportError('{} requires the optional package "{}". Install it via: pip install {}'
+                          ''.format(purpose, package, package))
+
+
+def _validate_main(h5_main):
+    """
+    Raises a TypeError if the provided object is not a USIDataset
+
+    Parameters
+    ----------
+    h5_main : object
+        Object to check
+    """
+    from .usi_data import USIDataset
+
+    if not isinstance(h5_main, USIDataset):
+        raise TypeError('h5_main should be a pyUSID.USIDataset object')
+
+
+def get_rows_per_block(h5_main, bytes_per_pos, max_bytes):
+    """
+    Returns the number of positions that can be exported at a time without
+    exceeding the provided number of bytes. Blocks of chunked datasets span
+    whole chunks where possible
+
+    Parameters
+    ----------
+    h5_main : :class:`h5py.Dataset`
+        Dataset with one row per position
+    bytes_per_pos : uint
+        Memory needed for each position in bytes
+    max_bytes : uint
+        Approximate upper limit on the size of each block in bytes
+
+    Returns
+    -------
+    rows_per_block : uint
+        Number of positions per block
+    """
+    rows_per_block = min(h5_main.shape[0], max(1, int(max_bytes // max(1, bytes_per_pos))))
+    if h5_main.chunks is not None and rows_per_block >= h5_main.chunks[0]:
+        rows_per_block = rows_per_block // h5_main.chunks[0] * h5_main.chunks[0]
+    return max(1, rows_per_block)
+
+
+def get_export_columns(h5_main):
+    """
+    Returns the columns of the table that holds one row for each element of
+    the Main dataset. The first two columns hold the position and
+    spectroscopic indices of the element. These are followed by the values of
+    each position and spectroscopic dimension and finally the data itself.
+    Complex data is split into real and imaginary columns while each field of
+    compound data gets its own column
+
+    Parameters
+    ----------
+    h5_main : :class:`~pyUSID.io.usi_data.USIDataset`
+        Main dataset to export
+
+    Returns
+    -------
+    columns : list of tuple
+        Name, :class:`numpy.dtype` and metadata (dict of str) of each column
+    """
+    _validate_main(h5_main)
+    columns = [('position_index', np.dtype(np.int64), {'dimension_type': 'position'}),
+               ('spectroscopic_index', np.dtype(np.int64), {'dimension_type': 'spectroscopic'})]
+    for dim_type, h5_inds, h5_vals in [('position', h5_main.h5_pos_inds, h5_main.h5_pos_vals),
+                                       ('spectroscopic', h5_main.h5_spec_inds, h5_main.h5_spec_vals)]:
+        for label, units in zip(get_attr(h5_inds, 'labels'), get_attr(h5_inds, 'units')):
+            columns.append((str(label), h5_vals.dtype, {'units': str(units), 'dimension_type': dim_type}))
+
+    data_meta = {'quantity': str(get_attr(h5_main, 'quantity')), 'units': str(get_attr(h5_main, 'units'))}
+    if h5_main.dtype.names is not None:
+        for name in h5_main.dtype.names:
+            if np.iscomplexobj(np.zeros(0, dtype=h5_main.dtype[name])):
+                raise TypeError('Complex valued fields of compound datasets cannot be exported')
+            columns.append((str(name), h5_main.dtype[name], dict(data_meta)))
+    elif np.iscomplexobj(np.zeros(0, dtype=h5_main.dtype)):
+        real_dtype = np.zeros(0, dtype=h5_main.dtype).real.dtype
+        columns += [('value_real', real_dtype, dict(data_meta)), ('value_imag', real_dtype, dict(data_meta))]
+    else:
+        columns.append(('value', h5_main.dtype, data_meta))
+
+    names = [name for name, _, _ in columns]
+    if len(set(names)) != len(names):
+        raise ValueError('Names of dimensions and data fields should be unique. Got: {}'.format(names))
+    return columns
+
+
+def get_block_columns(h5_main, start, stop, spec_vals=None):
+    """
+    Returns the columns of the exported table for a block of positions. See
+    :func:`get_export_columns` for the layout of the table
+
+    Parameters
+    ----------
+    h5_main : :class:`~pyUSID.io.usi_data.USIDataset`
+        Main dataset to export
+    start : uint
+        Index of the first position in the block
+    stop : uint
+        Index of the position after the last position in the block
+    spec_vals : :class:`numpy.ndarray`, optional
+        Contents of the Spectroscopic Values dataset. Read from the file if
+        not provided. Pass these when exporting several blocks
+
+    Returns
+    -------
+    columns : OrderedDict
+        1D :class:`numpy.ndarray` of each column keyed by its name. Each
+        holds (stop - start) x (number of spectroscopic steps) values
+    """
+    _validate_main(h5_main)
+    num_rows = stop - start
+    num_steps = h5_main.shape[1]
+    columns = OrderedDict()
+    columns['position_index'] = np.repeat(np.arange(start, stop, dtype=np.int64), num_steps)
+    columns['spectroscopic_index'] = np.tile(np.arange(num_steps, dtype=np.int64), num_rows)
+
+    pos_vals = h5_main.h5_pos_vals[start: stop]
+    for index, label in enumerate(get_attr(h5_main.h5_pos_inds, 'labels')):
+        columns[str(label)] = np.repeat(pos_vals[:, index], num_steps)
+    if spec_vals is None:
+        spec_vals = h5_main.h5_spec_vals[()]
+    for index, label in enumerate(get_attr(h5_main.h5_spec_inds, 'labels')):
+        columns[str(label)] = np.tile(spec_vals[index], num_rows)
+
+    data = h5_main[start: stop].ravel()
+    if data.dtype.names is not None:
+        for name in data.dtype.names:
+            columns[str(name)] = data[name]
+    elif np.iscomplexobj(data):
+        columns['value_real'] = data.real
+        columns['value_imag'] = data.imag
+    else:
+        columns['value'] = data
+    return columns
+
+
+def iter_blocks(func, num_rows, rows_per_block, cores=1):
+    """
+    Applies a function to consecutive blocks of positions in parallel and
+    yields the results in order. Only as many blocks as there are cores are
+    held in memory at any given time
+
+    Parameters
+    ----------
+    func : callable
+        Function that accepts the start and stop index of a block of positions
+    num_rows : uint
+        Total number of positions
+    rows_per_block : uint
+        Number of positions in each block
+    cores : uint, optional. Default = 1
+        Number of blocks processed simultaneously by Dask's threaded scheduler
+
+    Yields
+    ------
+    object
+        Result of the function for each block
+    """
+    if not callable(func):
+        raise TypeError('func should be callable')
+    cores = max(1, int(cores))
+    bounds = [(start, min(num_rows, start + rows_per_block)) for start in range(0, num_rows, rows_per_block)]
+    for window in range(0, len(bounds), cores):
+        tasks = [dask.delayed(func)(start, stop) for start, stop in bounds[window: window + cores]]
+        for result in dask.compute(*tasks, scheduler='threads', num_workers=cores):
+            yield result
+
+
+def get_arrow_schema(h5_main):
+    """
+    Returns the Apache Arrow schema of the exported table. The units and the
+    type of each dimension, and the quantity and units of the data, are stored
+    as metadata of the corresponding fields. The schema itself records the
+    source of the data and the labels of the position and spectroscopic
+    dimensions
+
+    Parameters
+    ----------
+    h5_main : :class:`~pyUSID.io.usi_data.USIDataset`
+        Main dataset to export
+
+    Returns
+    -------
+    :class:`pyarrow.Schema`
+        Schema of the table
+    """
+    pa = _import_optional('pyarrow', 'Exporting to Arrow or Parquet')
+    fields = [pa.field(name, pa.from_numpy_dtype(dtype), nullable=False, metadata=meta)
+              for name, dtype, meta in get_export_columns(h5_main)]
+    metadata = {'quantity': str(get_attr(h5_main, 'quantity')),
+                'units': str(get_attr(h5_main, 'units')),
+                'source_file': str(h5_main.file.filename),
+                'source_dataset': str(h5_main.name),
+                'position_dimensions': json.dumps([str(lab) for lab in get_attr(h5_main.h5_pos_inds, 'labels')]),
+                'spectroscopic_dimensions': json.dumps([str(lab) for lab in
+                                                        get_attr(h5_main.h5_spec_inds, 'labels')])}
+    return pa.schema(fields, metadata=metadata)
+
+
+def _get_bytes_per_pos(h5_main):
+    """
+    Returns the memory occupied by the exported table for each position
+
+    Parameters
+    ----------
+    h5_main : :class:`~pyUSID.io.usi_data.USIDataset`
+        Main dataset to export
+
+    Returns
+    -------
+    uint
+        Bytes per position
+    """
+    row_bytes = sum(dtype.itemsize for _, dtype, _ in get_export_columns(h5_main))
+    # The data read from the file is held alongside the columns
+    return h5_main.shape[1] * (row_bytes + h5_main.dtype.itemsize)
+
+
+def _plan_blocks(h5_main, bytes_per_pos, max_mem_bytes, cores):
+    """
+    Returns the number of blocks, the number of cores, and the number of
+    positions per block such that the blocks processed simultaneously fit
+    within the memory budget
+
+    Parameters
+    ----------
+    h5_main : :class:`h5py.Dataset`
+        Dataset with one row per position
+    bytes_per_pos : uint
+        Memory needed for each position in bytes
+    max_mem_bytes : uint
+        Upper limit on the memory occupied by all blocks being processed
+    cores : uint
+        Requested number of cores. None for all but one of the available cores
+
+    Returns
+    -------
+    num_blocks : uint
+        Number of blocks
+    cores : uint
+        Number of blocks processed simultaneously
+    rows_per_block : uint
+        Number of positions per block
+    """
+    num_blocks = int(np.ceil(h5_main.shape[0] / get_rows_per_block(h5_main, bytes_per_pos, max_mem_bytes)))
+    cores = recommend_cpu_cores(num_blocks, requested_cores=cores, lengthy_computation=False)
+    rows_per_block = get_rows_per_block(h5_main, bytes_per_pos, max_mem_bytes // cores)
+    return int(np.ceil(h5_main.shape[0] / rows_per_block)), cores, rows_per_block
+
+
+def write_arrow(h5_main, output_path, file_format='arrow', max_mem_bytes=EXPORT_MEM_BYTES, cores=None):
+    """
+    Writes the Main dataset as a table to an Apache Arrow IPC (Feather v2) or
+    Parquet file. See :func:`get_export_columns` for the layout of the table
+    and :func:`get_arrow_schema` for the metadata. Blocks of positions are
+    converted in parallel and written in order, one record batch (or Parquet
+    row group) per block
+
+    Parameters
+    ----------
+    h5_main : :class:`~pyUSID.io.usi_data.USIDataset`
+        Main dataset to export
+    output_path : str
+        Path of the file to write
+    file_format : str, optional. Default = 'arrow'
+        'arrow' or 'parquet'
+    max_mem_bytes : uint, optional. Default = :data:`EXPORT_MEM_BYTES`
+        Upper limit on the memory occupied by the blocks being converted
+    cores : uint, optional
+        Number of blocks converted simultaneously. Default - all but one of
+        the available cores
+
+    Returns
+    -------
+    num_blocks : uint
+        Number of record batches or row groups written
+    """
+    if file_format not in ['arrow', 'parquet']:
+        raise ValueError('file_format should be "arrow" or "parquet"')
+    pa = _import_optional('pyarrow', 'Exporting to Arrow or Parquet')
+    if file_format == 'parquet':
+        pq = _import_optional('pyarrow.parquet', 'Exporting to Parquet')
+    schema = get_arrow_schema(h5_main)
+    if file_format == 'parquet':
+        # Parquet does not support half precision floats
+        schema = pa.schema([field.with_type(pa.float32()) if field.type == pa.float16() else field
+                            for field in schema], metadata=schema.metadata)
+
+    num_blocks, cores, rows_per_block = _plan_blocks(h5_main, _get_bytes_per_pos(h5_main), max_mem_bytes, cores)
+
+    # Shared by all blocks
+    spec_vals = h5_main.h5_spec_vals[()]
+
+    def _get_batch(start, stop):
+        columns = get_block_columns(h5_main, start, stop, spec_vals=spec_vals)
+        arrays = [pa.array(np.asarray(col, dtype=field.type.to_pandas_dtype()))
+                  for col, field in zip(columns.values(), schema)]
+        return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+    if file_format == 'parquet':
+        writer = pq.ParquetWriter(output_path, schema)
+    else:
+        writer = pa.ipc.new_file(output_path, schema)
+    try:
+        for batch in iter_blocks(_get_batch, h5_main.shape[0], rows_per_block, cores=cores):
+            if file_format == 'parquet':
+                # One row group per block
+                writer.write_table(pa.Table.from_batches([batch]))
+            else:
+                writer.write_batch(batch)
+    finally:
+        writer.close()
+    return num_blocks
+
+
+def write_zarr(h5_main, output_path, max_mem_bytes=EXPORT_MEM_BYTES, cores=None):
+    """
+    Writes the Main dataset along with its ancillary datasets to a Zarr
+    group. The layout mirrors that of the HDF5 file: the Main dataset keeps
+    its name and the Position / Spectroscopic Indices / Values datasets keep
+    their labels and units as attributes. Every array also declares its
+    dimensions via the '_ARRAY_DIMENSIONS' attribute understood by xarray. The
+    Main dataset is chunked by blocks of positions which are copied in
+    parallel
+
+    Parameters
+    ----------
+    h5_main : :class:`~pyUSID.io.usi_data.USIDataset`
+        Main dataset to export
+    output_path : str
+        Path of the directory to write the Zarr group to
+    max_mem_bytes : uint, optional. Default = :data:`EXPORT_MEM_BYTES`
+        Upper limit on the memory occupied by the blocks being copied
+    cores : uint, optional
+        Number of blocks copied simultaneously. Default - all but one of the
+        available cores
+
+    Returns
+    -------
+    num_blocks : uint
+        Number of blocks (chunks) of the Main dataset
+    """
+    _validate_main(h5_main)
+    zarr = _import_optional('zarr', 'Exporting to Zarr')
+    num_blocks, cores, rows_per_block = _plan_blocks(h5_main, h5_main.shape[1] * h5_main.dtype.itemsize,
+                                                     max_mem_bytes, cores)
+
+    z_group = zarr.open_group(output_path, mode='w')
+    z_group.attrs.update({'source_file': str(h5_main.file.filename), 'source_dataset': str(h5_main.name)})
+
+    sources = []
+    targets = []
+    main_name = h5_main.name.split('/')[-1]
+    for name, h5_dset, chunks, dims in [
+            (main_name, h5_main, (rows_per_block, h5_main.shape[1]), ['position', 'spectroscopic']),
+            ('Position_Indices', h5_main.h5_pos_inds, None, ['position', 'position_dimension']),
+            ('Position_Values', h5_main.h5_pos_vals, None, ['position', 'position_dimension']),
+            ('Spectroscopic_Indices', h5_main.h5_spec_inds, None, ['spectroscopic_dimension', 'spectroscopic']),
+            ('Spectroscopic_Values', h5_main.h5_spec_vals, None, ['spectroscopic_dimension', 'spectroscopic'])]:
+        z_dset = z_group.create_dataset(name, shape=h5_dset.shape, dtype=h5_dset.dtype,
+                                        chunks=True if chunks is None else chunks)
+        if h5_dset is h5_main:
+            attrs = {'quantity': str(get_attr(h5_main, 'quantity')), 'units': str(get_attr(h5_main, 'units'))}
+        else:
+            attrs = {'labels': [str(lab) for lab in get_attr(h5_dset, 'labels')],
+                     'units': [str(unit) for unit in get_attr(h5_dset, 'units')]}
+        attrs['_ARRAY_DIMENSIONS'] = dims
+        z_dset.attrs.update(attrs)
+        # Separate handles so that the lazy arrays do not hold on to the (possibly Main) datasets themselves
+        sources.append(lazy_load_array(h5py.Dataset(h5_dset.id)).rechunk(z_dset.chunks))
+        targets.append(z_dset)
+
+    # Each block is written to its own chunk of the Zarr arrays. No locking needed
+    da.store(sources, targets, lock=False, scheduler='threads', num_workers=cores)
+    return num_blocks
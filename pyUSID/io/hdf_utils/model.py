@@ -9,6 +9,8 @@ Created on Tue Nov  3 21:14:25 2015
 from __future__ import division, print_function, absolute_import, unicode_literals
 from warnings import warn
 import sys
+import hashlib
+import json
 import h5py
 import numpy as np
 from dask import array as da
@@ -27,6 +29,18 @@ from ..write_utils import INDICES_DTYPE, make_indices_matrix
 if sys.version_info.major == 3:
     unicode = str
 
+DIM_DESCRIPTOR_ATTR = 'dim_descriptor'
+"""
+Name of the attribute of a main dataset that caches the sizes, sort order, and labels of its dimensions
+"""
+
+_DIM_DESCRIPTOR_VERSION = 2
+
+ANC_BLOCK_BYTES = 32 * 1024 ** 2
+"""
+Approximate size in bytes of the blocks in which ancillary datasets are scanned
+"""
+
 
 def reshape_to_n_dims(h5_main, h5_pos=None, h5_spec=None, get_labels=False, verbose=False, sort_dims=False,
                       lazy=False):
@@ -488,27 +502,30 @@ def get_dimensionality(ds_index, index_sort=None):
         ds_index = ds_index.compute()
     if not isinstance(ds_index, (np.ndarray, h5py.Dataset)):
         raise TypeError('ds_index should either be a numpy array or h5py.Dataset')
+    if isinstance(ds_index, np.ndarray):
+        ds_index = np.array(ds_index, ndmin=2)
 
-    if ds_index.shape[0] > ds_index.shape[1]:
-        # must be spectroscopic like in shape (few rows, more cols)
-        ds_index = np.transpose(ds_index)
+    # must be spectroscopic like in shape (few rows, more cols) if not position like
+    entries_axis = 0 if ds_index.shape[0] > ds_index.shape[1] else 1
+    num_dims = ds_index.shape[1 - entries_axis]
 
     if index_sort is None:
-        index_sort = np.arange(ds_index.shape[0])
+        index_sort = np.arange(num_dims)
     else:
         if not contains_integers(index_sort, min_val=0):
             raise ValueError('index_sort should contain integers > 0')
         index_sort = np.array(index_sort)
         if index_sort.ndim != 1:
             raise ValueError('index_sort should be a 1D array')
-        if len(np.unique(index_sort)) > ds_index.shape[0]:
+        if len(np.unique(index_sort)) > num_dims:
             raise ValueError('length of index_sort ({}) should be smaller than number of dimensions in provided dataset'
-                             ' ({}'.format(len(np.unique(index_sort)), ds_index.shape[0]))
-        if set(np.arange(ds_index.shape[0])) !=  set(index_sort):
+                             ' ({}'.format(len(np.unique(index_sort)), num_dims))
+        if set(np.arange(num_dims)) != set(index_sort):
             raise ValueError('Sort order of dimensions ({}) not  matching  with number of dimensions ({})'
-                             ''.format(index_sort, ds_index.shape[0]))
+                             ''.format(index_sort, num_dims))
 
-    sorted_dims = [len(np.unique(row)) for row in np.array(ds_index, ndmin=2)[index_sort]]
+    sizes, _ = _scan_anc_dset(ds_index, entries_axis)
+    sorted_dims = [int(sizes[dim]) for dim in index_sort]
     return sorted_dims
 
 
@@ -532,17 +549,346 @@ def get_sort_order(ds_spec):
         ds_spec = ds_spec.compute()
     if not isinstance(ds_spec, (np.ndarray, h5py.Dataset)):
         raise TypeError('ds_spec should either be a numpy array or h5py.Dataset')
+    if isinstance(ds_spec, np.ndarray):
+        ds_spec = np.array(ds_spec, ndmin=2)
 
-    if ds_spec.shape[0] > ds_spec.shape[1]:
-        # must be spectroscopic like in shape (few rows, more cols)
-        ds_spec = np.transpose(ds_spec)
+    # must be spectroscopic like in shape (few rows, more cols) if not position like
+    entries_axis = 0 if ds_spec.shape[0] > ds_spec.shape[1] else 1
 
-    change_count = [len(np.where([row[i] != row[i - 1] for i in range(len(row))])[0]) for row in ds_spec]
+    _, change_count = _scan_anc_dset(ds_spec, entries_axis)
     change_sort = np.argsort(change_count)[::-1]
 
     return change_sort
 
 
+def _iter_anc_blocks(ds_index, entries_axis, max_bytes=None):
+    """
+    Reads an ancillary dataset in blocks of consecutive entries
+
+    Parameters
+    ----------
+    ds_index : :class:`h5py.Dataset` or :class:`numpy.ndarray`
+        2D ancillary dataset
+    entries_axis : int
+        Axis along which the entries (positions or spectroscopic steps) lie.
+        The other axis is that of dimensions
+    max_bytes : uint, optional
+        Approximate size of each block in bytes. Default - ANC_BLOCK_BYTES.
+        Blocks of chunked HDF5 datasets span whole chunks
+
+    Yields
+    ------
+    block : :class:`numpy.ndarray`
+        Block with one row per dimension and one column per entry
+    """
+    if max_bytes is None:
+        max_bytes = ANC_BLOCK_BYTES
+    num_entries = ds_index.shape[entries_axis]
+    num_dims = ds_index.shape[1 - entries_axis]
+    block_size = max(1, int(max_bytes // max(1, num_dims * ds_index.dtype.itemsize)))
+    chunks = getattr(ds_index, 'chunks', None)
+    if isinstance(ds_index, h5py.Dataset) and chunks is not None:
+        block_size = max(chunks[entries_axis], block_size // chunks[entries_axis] * chunks[entries_axis])
+    for start in range(0, num_entries, block_size):
+        if entries_axis == 0:
+            yield np.transpose(ds_index[start: start + block_size])
+        else:
+            yield ds_index[:, start: start + block_size]
+
+
+def _scan_anc_dset(ds_index, entries_axis):
+    """
+    Finds the number of unique values in each dimension of an ancillary
+    dataset and the number of times each dimension changes in value, in a
+    single pass over blocks of the dataset. Only the unique values of each
+    dimension are held in memory
+
+    Parameters
+    ----------
+    ds_index : :class:`h5py.Dataset` or :class:`numpy.ndarray`
+        2D ancillary dataset
+    entries_axis : int
+        Axis along which the entries (positions or spectroscopic steps) lie
+
+    Returns
+    -------
+    sizes : :class:`numpy.ndarray`
+        Number of unique values in each dimension
+    change_count : :class:`numpy.ndarray`
+        Number of entries whose value differs from that of the previous
+        entry in each dimension. The first entry is compared against the
+        last
+    """
+    num_dims = ds_index.shape[1 - entries_axis]
+    uniques = [np.zeros(0, dtype=ds_index.dtype) for _ in range(num_dims)]
+    change_count = np.zeros(num_dims, dtype=np.int64)
+    first_entry = None
+    last_entry = None
+    for block in _iter_anc_blocks(ds_index, entries_axis):
+        change_count += np.count_nonzero(np.diff(block, axis=1), axis=1)
+        if last_entry is None:
+            first_entry = block[:, 0].copy()
+        else:
+            # Changes across the boundary between blocks
+            change_count += block[:, 0] != last_entry
+        last_entry = block[:, -1].copy()
+        for dim in range(num_dims):
+            uniques[dim] = np.union1d(uniques[dim], block[dim])
+    if first_entry is not None:
+        change_count += first_entry != last_entry
+    sizes = np.array([vals.size for vals in uniques], dtype=np.int64)
+    return sizes, change_count
+
+
+def describe_anc_dset(h5_inds, is_spec):
+    """
+    Reads an ancillary indices dataset once, in blocks, and returns the size
+    of each dimension along with the order of dimensions from fastest
+    changing to slowest. These match :func:`get_dimensionality` and
+    :func:`get_sort_order` respectively
+
+    Parameters
+    ----------
+    h5_inds : :class:`h5py.Dataset` or :class:`numpy.ndarray`
+        Position or Spectroscopic Indices
+    is_spec : bool
+        Set to True if ``h5_inds`` is spectroscopic (one row per dimension).
+        Else - one column per dimension
+
+    Returns
+    -------
+    sizes : list of unsigned integers
+        Size of each dimension in the order they appear in ``h5_inds``
+    sort_order : list of unsigned integers
+        Order of dimensions sorted from fastest changing to slowest
+    """
+    if not isinstance(h5_inds, (np.ndarray, h5py.Dataset)):
+        raise TypeError('h5_inds should either be a numpy array or h5py.Dataset')
+    if isinstance(h5_inds, np.ndarray):
+        h5_inds = np.atleast_2d(h5_inds)
+
+    sizes, change_count = _scan_anc_dset(h5_inds, 1 if is_spec else 0)
+    sort_order = np.argsort(change_count)[::-1]
+
+    return sizes.tolist(), sort_order.tolist()
+
+
+def get_flat_strides(sizes, sort_order):
+    """
+    Returns the number of entries (positions or spectroscopic steps) between
+    successive indices of each dimension, given that the dimensions vary in
+    the provided order
+
+    Parameters
+    ----------
+    sizes : array-like of unsigned integers
+        Size of each dimension
+    sort_order : array-like of unsigned integers
+        Order of dimensions from fastest changing to slowest
+
+    Returns
+    -------
+    strides : :class:`numpy.ndarray`
+        Stride of each dimension, in the same order as ``sizes``
+    """
+    sizes = np.array(sizes, dtype=np.int64)
+    sort_order = np.array(sort_order, dtype=np.int64)
+    strides = np.zeros(sizes.size, dtype=np.int64)
+    strides[sort_order] = np.cumprod(np.append(1, sizes[sort_order][:-1]))
+    return strides
+
+
+def is_regular_anc_dset(h5_inds, is_spec, sizes=None, sort_order=None):
+    """
+    Checks whether the indices of every dimension run from 0 to the size of
+    the dimension and whether the entries enumerate every combination of
+    indices with the dimensions varying in their sort order. The index of
+    each entry (position or spectroscopic step) is then an affine function of
+    the indices of the dimensions, which allows slices to be computed without
+    searching through the ancillary dataset
+
+    Parameters
+    ----------
+    h5_inds : :class:`h5py.Dataset` or :class:`numpy.ndarray`
+        Position or Spectroscopic Indices
+    is_spec : bool
+        Set to True if ``h5_inds`` is spectroscopic (one row per dimension).
+        Else - one column per dimension
+    sizes : array-like of unsigned integers, optional
+        Size of each dimension as returned by :func:`describe_anc_dset`.
+        Computed if not provided
+    sort_order : array-like of unsigned integers, optional
+        Order of dimensions as returned by :func:`describe_anc_dset`.
+        Computed if not provided
+
+    Returns
+    -------
+    bool
+        True if the ancillary dataset is regular
+    """
+    if isinstance(h5_inds, np.ndarray):
+        h5_inds = np.atleast_2d(h5_inds)
+    if sizes is None or sort_order is None:
+        sizes, sort_order = describe_anc_dset(h5_inds, is_spec)
+    entries_axis = 1 if is_spec else 0
+    if np.prod(sizes) != h5_inds.shape[entries_axis]:
+        return False
+    sizes = np.array(sizes, dtype=np.int64)
+    strides = get_flat_strides(sizes, sort_order)
+    start = 0
+    for block in _iter_anc_blocks(h5_inds, entries_axis):
+        entries = np.arange(start, start + block.shape[1], dtype=np.int64)
+        expected = (entries[np.newaxis, :] // strides[:, np.newaxis]) % sizes[:, np.newaxis]
+        if not np.array_equal(block, expected):
+            return False
+        start += block.shape[1]
+    return True
+
+
+def get_flat_indices(strides, dim_indices):
+    """
+    Computes the indices of the entries (positions or spectroscopic steps) of
+    regular ancillary datasets that correspond to every combination of the
+    provided indices of each dimension
+
+    Parameters
+    ----------
+    strides : array-like of unsigned integers
+        Strides of the dimensions as returned by :func:`get_flat_strides`
+    dim_indices : list of array-like
+        Indices within each dimension, in the same order as ``strides``
+
+    Returns
+    -------
+    flat_indices : :class:`numpy.ndarray`
+        Array with one axis per dimension, holding the index of the entry
+        corresponding to each combination of the provided indices
+    """
+    if len(strides) != len(dim_indices):
+        raise ValueError('Provided {} strides for {} dimensions'.format(len(strides), len(dim_indices)))
+    flat_indices = np.zeros((), dtype=np.int64)
+    for stride, inds in zip(strides, dim_indices):
+        flat_indices = np.add.outer(flat_indices, np.array(inds, dtype=np.int64).ravel() * int(stride))
+    return flat_indices
+
+
+def get_contiguous_slices(indices):
+    """
+    Groups sorted, unique indices into the fewest slices of consecutive
+    indices
+
+    Parameters
+    ----------
+    indices : array-like of unsigned integers
+        Sorted, unique indices
+
+    Returns
+    -------
+    slices : list of slice
+        Slices that together cover the provided indices
+    """
+    indices = np.asarray(indices, dtype=np.int64).ravel()
+    if indices.size == 0:
+        return []
+    breaks = np.flatnonzero(np.diff(indices) != 1) + 1
+    starts = indices[np.append(0, breaks)]
+    stops = indices[np.append(breaks - 1, indices.size - 1)] + 1
+    return [slice(int(start), int(stop)) for start, stop in zip(starts, stops)]
+
+
+def _get_anc_fingerprint(h5_inds):
+    """
+    Returns a hash that changes when the provided ancillary dataset is
+    replaced, resized, relabeled, or when its first or last entries change.
+    Only these two entries are read so that the cost does not grow with the
+    size of the dataset. Changes to the other entries are not detected
+
+    Parameters
+    ----------
+    h5_inds : :class:`h5py.Dataset`
+        Position or Spectroscopic Indices
+
+    Returns
+    -------
+    str
+        Hexadecimal SHA-256 hash
+    """
+    summary = [h5_inds.name, list(h5_inds.shape), h5_inds.dtype.str, h5py.h5o.get_info(h5_inds.id).addr,
+               [str(item) for item in get_attr(h5_inds, 'labels')], [str(item) for item in get_attr(h5_inds, 'units')]]
+    hasher = hashlib.sha256(json.dumps(summary).encode('utf-8'))
+    if h5_inds.size > 0:
+        hasher.update(np.ascontiguousarray(h5_inds[0]).tobytes())
+        hasher.update(np.ascontiguousarray(h5_inds[-1]).tobytes())
+    return hasher.hexdigest()
+
+
+def get_dim_descriptor(h5_main, cache=False):
+    """
+    Returns the sizes, sort order, and labels of the position and
+    spectroscopic dimensions of a main dataset. These are read from the
+    descriptor cached in the attributes of the main dataset so long as the
+    ancillary datasets have not changed since. Otherwise, the ancillary
+    datasets are analyzed again.
+
+    Looking up the cached descriptor takes constant time. It is therefore
+    keyed only on the name, shape, data type, location, labels, units, and
+    the first and last entries of each ancillary dataset. Descriptors are
+    not invalidated when any other entries are overwritten in place. Delete
+    the DIM_DESCRIPTOR_ATTR attribute after such edits. USIDataset
+    additionally compares a few entries against the cached dimensions
+    before slicing
+
+    Parameters
+    ----------
+    h5_main : :class:`h5py.Dataset`
+        USID main dataset
+    cache : bool, optional. Default = False
+        If True, a missing or outdated descriptor is written to the
+        attributes of ``h5_main`` if the file is open in a writable mode.
+        With the MPI-IO driver, all ranks must call this function together
+
+    Returns
+    -------
+    descriptor : dict
+        Keyed by 'Position' and 'Spectroscopic'. Each contains the 'labels',
+        'sizes' (in the order they appear in the ancillary datasets), and
+        'sort' (fastest to slowest) of the dimensions and whether or not the
+        ancillary dataset is 'regular' (see :func:`is_regular_anc_dset`)
+    """
+    if not isinstance(h5_main, h5py.Dataset):
+        raise TypeError('h5_main should be a h5py.Dataset object')
+
+    anc_dsets = {'Position': h5_main.file[h5_main.attrs['Position_Indices']],
+                 'Spectroscopic': h5_main.file[h5_main.attrs['Spectroscopic_Indices']]}
+    fingerprints = dict([(key, _get_anc_fingerprint(h5_inds)) for key, h5_inds in anc_dsets.items()])
+
+    cached = h5_main.attrs.get(DIM_DESCRIPTOR_ATTR)
+    if cached is not None:
+        if isinstance(cached, bytes):
+            cached = cached.decode('utf-8')
+        try:
+            cached = json.loads(cached)
+            # Descriptors written by older versions lack some of the fields
+            if cached.get('version') == _DIM_DESCRIPTOR_VERSION and \
+                    all([cached[key]['fingerprint'] == fingerprints[key] for key in anc_dsets.keys()]):
+                return cached
+        except (ValueError, KeyError, TypeError):
+            warn('Ignoring unreadable {} attribute of {}'.format(DIM_DESCRIPTOR_ATTR, h5_main.name))
+
+    descriptor = {'version': _DIM_DESCRIPTOR_VERSION}
+    for key, h5_inds in anc_dsets.items():
+        is_spec = key == 'Spectroscopic'
+        sizes, sort_order = describe_anc_dset(h5_inds, is_spec)
+        regular = is_regular_anc_dset(h5_inds, is_spec, sizes=sizes, sort_order=sort_order)
+        descriptor[key] = {'labels': [str(item) for item in get_attr(h5_inds, 'labels')],
+                           'sizes': sizes, 'sort': sort_order, 'regular': regular,
+                           'fingerprint': fingerprints[key]}
+
+    if cache and is_editable_h5(h5_main):
+        h5_main.attrs[DIM_DESCRIPTOR_ATTR] = json.dumps(descriptor, sort_keys=True)
+    return descriptor
+
+
 def get_unit_values(ds_inds, ds_vals, dim_names=None, all_dim_names=None, is_spec=None, verbose=False):
     """
     Gets the unit arrays of values that describe the spectroscopic dimensions
@@ -932,6 +1278,11 @@ def write_main_dataset(h5_parent_group, main_data, main_data_name, quantity, uni
     if verbose:
         print('Successfully linked datasets - dataset should be main now')
 
+    # Cache the dimensions so that the ancillary datasets need not be analyzed when reading
+    get_dim_descriptor(h5_main, cache=True)
+    if verbose:
+        print('Cached the dimension descriptor in the main dataset')
+
     from ..usi_data import USIDataset
     return USIDataset(h5_main)
 
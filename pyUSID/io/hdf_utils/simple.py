@@ -8,6 +8,9 @@ Created on Tue Nov  3 21:14:25 2015
 """
 from __future__ import division, print_function, absolute_import, unicode_literals
 import collections
+import hashlib
+import json
+from numbers import Number
 from warnings import warn
 import sys
 import h5py
@@ -28,6 +31,17 @@ from .base import write_book_keeping_attrs
 
 if sys.version_info.major == 3:
     unicode = str
+
+PARMS_HASH_ATTR = 'parms_hash'
+"""
+Name of the attribute of a results group holding the hash of the parameters used to compute the results
+"""
+
+RESULTS_INDEX_ATTR = 'results_index'
+"""
+Prefix of the attributes of the parent of results groups that list the results groups computed with the same
+parameters. Each attribute is named as <prefix>:<source dataset>-<tool>:<hash of parameters>
+"""
 """
 __all__ = ['assign_group_index', 'check_and_link_ancillary', 'check_for_matching_attrs', 'check_for_old',
            'check_if_main', 'copy_attributes', 'copy_main_attributes']
@@ -588,7 +602,11 @@ def check_for_old(h5_base, tool_name, new_parms=None, target_dset=None,
                   h5_parent_goup=None, verbose=False):
     """
     Check to see if the results of a tool already exist and if they
-    were performed with the same parameters.
+    were performed with the same parameters. Groups registered via
+    :func:`register_results_group` with identical parameters are returned
+    without comparing their attributes. The parameters are compared against
+    the attributes of every other results group, including groups that were
+    never registered or that store more parameters than ``new_parms``.
 
     Parameters
     ----------
@@ -632,6 +650,15 @@ def check_for_old(h5_base, tool_name, new_parms=None, target_dset=None,
     if target_dset is not None:
         target_dset = validate_single_string_arg(target_dset, 'target_dset')
 
+    registered = []
+    if target_dset is None:
+        # Groups registered with identical parameters match without comparing their attributes
+        base_name = '{}-{}'.format(h5_base.name.split('/')[-1], tool_name)
+        registered = _find_registered_groups(h5_parent_goup, base_name, get_parms_hash(new_parms))
+        if verbose:
+            print('Found {} groups registered with the same parameters'.format(len(registered)))
+    registered_names = [group.name for group in registered]
+
     matching_groups = []
     groups = find_results_groups(h5_base, tool_name,
                                  h5_parent_group=h5_parent_goup)
@@ -640,6 +667,10 @@ def check_for_old(h5_base, tool_name, new_parms=None, target_dset=None,
         if verbose:
             print('Looking at group - {}'.format(group.name.split('/')[-1]))
 
+        if group.name in registered_names:
+            matching_groups.append(group)
+            continue
+
         h5_obj = group
         if target_dset is not None:
             if target_dset in group.keys():
@@ -654,9 +685,200 @@ def check_for_old(h5_base, tool_name, new_parms=None, target_dset=None,
             # return group
             matching_groups.append(group)
 
+    # Registered groups that are not named as results groups of this dataset
+    matching_names = [group.name for group in matching_groups]
+    matching_groups += [group for group in registered if group.name not in matching_names]
+
     return matching_groups
 
 
+def _canonicalize_parm(value):
+    """
+    Converts the value of a parameter to a form that can be serialized to
+    JSON identically regardless of the (numpy / python) type of the value
+
+    Parameters
+    ----------
+    value : object
+        Value of the parameter
+
+    Returns
+    -------
+    object
+        Canonical form of the value
+    """
+    if isinstance(value, bytes):
+        return value.decode('utf-8')
+    if isinstance(value, (str, unicode)):
+        return value
+    if isinstance(value, (bool, np.bool_)):
+        return bool(value)
+    if isinstance(value, Number) and not isinstance(value, complex):
+        # 1 and 1.0 are considered the same parameter just as with np.allclose()
+        return float(value)
+    if isinstance(value, np.ndarray):
+        value = value.tolist()
+    if isinstance(value, (list, tuple)):
+        return [_canonicalize_parm(item) for item in value]
+    if isinstance(value, dict):
+        return dict([(str(key), _canonicalize_parm(val)) for key, val in value.items()])
+    return str(value)
+
+
+def get_parms_hash(parms_dict):
+    """
+    Returns a hash of the provided parameters that does not depend on the
+    order of the parameters or on the types used to represent them
+    (e.g. list vs. tuple vs. :class:`numpy.ndarray`). Parameters set to
+    None are ignored since they cannot be written to HDF5 attributes
+
+    Parameters
+    ----------
+    parms_dict : dict
+        Parameters of a computation
+
+    Returns
+    -------
+    str
+        Hexadecimal SHA-256 hash of the parameters
+    """
+    if parms_dict is None:
+        parms_dict = dict()
+    if not isinstance(parms_dict, dict):
+        raise TypeError('parms_dict should be a dict')
+    canonical = dict([(str(key), _canonicalize_parm(val)) for key, val in parms_dict.items() if val is not None])
+    serialized = json.dumps(canonical, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(serialized.encode('utf-8')).hexdigest()
+
+
+def _get_index_attr_name(base_name, parms_hash):
+    """
+    Returns the name of the attribute listing the results groups computed
+    with the same parameters
+
+    Parameters
+    ----------
+    base_name : str
+        Base name of the results groups as <source dataset>-<tool>
+    parms_hash : str
+        Hash of the parameters
+
+    Returns
+    -------
+    str
+        Name of the attribute
+    """
+    return '{}:{}:{}'.format(RESULTS_INDEX_ATTR, base_name, parms_hash)
+
+
+def _read_index_attr(h5_parent_group, attr_name):
+    """
+    Reads the names of the results groups listed in an attribute written by
+    :func:`register_results_group`
+
+    Parameters
+    ----------
+    h5_parent_group : :class:`h5py.Group`
+        Group containing the results groups
+    attr_name : str
+        Name of the attribute
+
+    Returns
+    -------
+    list of str
+        Names of the results groups
+    """
+    grp_names = h5_parent_group.attrs.get(attr_name)
+    if grp_names is None:
+        return []
+    if isinstance(grp_names, bytes):
+        grp_names = grp_names.decode('utf-8')
+    try:
+        return list(json.loads(grp_names))
+    except (ValueError, TypeError):
+        warn('Could not read the attribute {} of {}. Parameters will be compared '
+             'instead'.format(attr_name, h5_parent_group.name))
+        return []
+
+
+def _find_registered_groups(h5_parent_group, base_name, parms_hash):
+    """
+    Returns the results groups registered via :func:`register_results_group`
+    with the provided hash of parameters
+
+    Parameters
+    ----------
+    h5_parent_group : :class:`h5py.Group`
+        Group containing the results groups
+    base_name : str
+        Base name of the results groups as <source dataset>-<tool>
+    parms_hash : str
+        Hash of the parameters
+
+    Returns
+    -------
+    list of :class:`h5py.Group`
+        Results groups sorted by name
+    """
+    groups = []
+    for grp_name in sorted(_read_index_attr(h5_parent_group, _get_index_attr_name(base_name, parms_hash))):
+        h5_group = h5_parent_group.get(grp_name)
+        # The group may since have been deleted or replaced
+        if isinstance(h5_group, h5py.Group) and h5_group.attrs.get(PARMS_HASH_ATTR) == parms_hash:
+            groups.append(h5_group)
+    return groups
+
+
+def register_results_group(h5_group, parms_dict):
+    """
+    Writes the hash of the parameters used to compute the results in the
+    provided group as an attribute of the group and lists the group in an
+    attribute of its parent named after the hash. This allows
+    :func:`check_for_old` to find results computed with identical parameters
+    without looking at every results group. Only the attribute for this hash
+    is read and written
+
+    Parameters
+    ----------
+    h5_group : :class:`h5py.Group`
+        Results group named as <source dataset>-<tool>_<index>
+    parms_dict : dict
+        Parameters used to compute the results
+
+    Returns
+    -------
+    parms_hash : str
+        Hash of the parameters
+    """
+    if not isinstance(h5_group, h5py.Group):
+        raise TypeError('h5_group should be a h5py.Group object')
+    parms_hash = get_parms_hash(parms_dict)
+    grp_name = h5_group.name.split('/')[-1]
+    base_name = grp_name.rsplit('_', 1)[0]
+
+    h5_parent = h5_group.parent
+
+    old_hash = h5_group.attrs.get(PARMS_HASH_ATTR)
+    if isinstance(old_hash, bytes):
+        old_hash = old_hash.decode('utf-8')
+    if old_hash is not None and old_hash != parms_hash:
+        # The group was registered with different parameters earlier
+        attr_name = _get_index_attr_name(base_name, old_hash)
+        grp_names = [name for name in _read_index_attr(h5_parent, attr_name) if name != grp_name]
+        if len(grp_names) > 0:
+            h5_parent.attrs[attr_name] = json.dumps(grp_names)
+        elif attr_name in h5_parent.attrs:
+            del h5_parent.attrs[attr_name]
+
+    h5_group.attrs[PARMS_HASH_ATTR] = parms_hash
+
+    attr_name = _get_index_attr_name(base_name, parms_hash)
+    grp_names = _read_index_attr(h5_parent, attr_name)
+    if grp_name not in grp_names:
+        h5_parent.attrs[attr_name] = json.dumps(grp_names + [grp_name])
+    return parms_hash
+
+
 def get_source_dataset(h5_group):
     """
     Find the name of the source dataset used to create the input `h5_group`,
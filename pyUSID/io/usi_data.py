@@ -11,6 +11,7 @@ from __future__ import division, print_function, absolute_import, unicode_litera
 
 import os
 import sys
+import shutil
 from warnings import warn
 import h5py
 import numpy as np
@@ -26,12 +27,33 @@ from sidpy.viz.jupyter_utils import simple_ndim_visualizer
 from sidpy.viz.plot_utils import plot_map, get_plot_grid_size
 
 from .hdf_utils import check_if_main, create_results_group, write_reduced_anc_dsets, link_as_main, \
-    get_dimensionality, get_sort_order, get_unit_values, reshape_to_n_dims, write_main_dataset, reshape_from_n_dims
+    get_unit_values, reshape_to_n_dims, write_main_dataset, reshape_from_n_dims, get_dim_descriptor, \
+    get_flat_strides, get_flat_indices
 from .write_utils import Dimension
+from .export_utils import get_rows_per_block, write_arrow, write_zarr
 
 if sys.version_info.major == 3:
     unicode = str
 
+REGULAR_SPOT_CHECKS = 8
+"""
+Number of entries of each ancillary dataset that are compared against their
+expected indices before slicing a regular dataset arithmetically
+"""
+
+MAX_HYPERSLAB_GAP = 64
+"""
+Largest number of consecutive spectroscopic steps that are read and discarded
+in order to read two runs of requested steps as a single hyperslab
+"""
+
+MAX_POSITION_GAP_BYTES = 4 * 1024 ** 2
+"""
+Largest amount of data in bytes belonging to consecutive unrequested positions
+that is read and discarded in order to read two runs of requested positions as
+a single hyperslab
+"""
+
 
 class USIDataset(h5py.Dataset):
     """
@@ -109,13 +131,19 @@ class USIDataset(h5py.Dataset):
         self.pos_dim_descriptors = self.__get_anc_labels(self.h5_pos_inds)
         self.spec_dim_descriptors = self.__get_anc_labels(self.h5_spec_inds)
 
-        # The size of each dimension
-        self.__orig_pos_dim_sizes = np.array(get_dimensionality(np.transpose(self.h5_pos_inds)))
-        self.__orig_spec_dim_sizes = np.array(get_dimensionality(np.atleast_2d(self.h5_spec_inds)))
+        # The size and sorted order of each dimension. Cached in the file by write_main_dataset so that the ancillary
+        # datasets are only analyzed when they change. Never written here
+        dim_descriptor = get_dim_descriptor(self)
+        self.__orig_pos_dim_sizes = np.array(dim_descriptor['Position']['sizes'])
+        self.__orig_spec_dim_sizes = np.array(dim_descriptor['Spectroscopic']['sizes'])
+        self.__pos_sort_order = np.array(dim_descriptor['Position']['sort'], dtype=int)
+        self.__spec_sort_order = np.array(dim_descriptor['Spectroscopic']['sort'], dtype=int)
 
-        # Sorted dimension order
-        self.__pos_sort_order = get_sort_order(np.transpose(self.h5_pos_inds))
-        self.__spec_sort_order = get_sort_order(np.atleast_2d(self.h5_spec_inds))
+        # Slices of regular ancillary datasets can be computed arithmetically from these strides
+        self.__pos_regular = dim_descriptor['Position']['regular']
+        self.__spec_regular = dim_descriptor['Spectroscopic']['regular']
+        self.__pos_strides = get_flat_strides(self.__orig_pos_dim_sizes, self.__pos_sort_order)
+        self.__spec_strides = get_flat_strides(self.__orig_spec_dim_sizes, self.__spec_sort_order)
 
         # internal book-keeping / we don't want users to mess with these?
         self.__orig_n_dim_sizes = np.append(self.__orig_pos_dim_sizes, self.__orig_spec_dim_sizes)
@@ -141,12 +169,13 @@ class USIDataset(h5py.Dataset):
         self.n_dim_labels = None
         self.n_dim_sizes = None
 
-        self.__lazy_2d = lazy_load_array(self)
+        # Wrapping the same identifier keeps the lazy array from referencing (and forming a cycle with) this object
+        self.__lazy_2d = lazy_load_array(h5py.Dataset(self.id))
 
         self.__set_labels_and_sizes()
 
         try:
-            self.__n_dim_data_orig = self.get_n_dim_form(lazy=True)
+            self.__n_dim_data_orig = self.__get_lazy_n_dim_form()
             self.__n_dim_form_avail = True
             self.__n_dim_data_s2f = self.__n_dim_data_orig.transpose(tuple(self.__n_dim_sort_order_orig_s2f))
         except ValueError:
@@ -210,6 +239,33 @@ class USIDataset(h5py.Dataset):
             self.n_dim_labels = self.__orig_n_dim_labs.tolist()
             self.n_dim_sizes = self.__orig_n_dim_sizes.tolist()
 
+    def __get_lazy_n_dim_form(self):
+        """
+        Reshapes the lazily loaded dataset to its N-dimensional form with the
+        dimensions arranged as they appear in the ancillary datasets. Uses the
+        sizes and sort order of the dimensions instead of reading the
+        ancillary datasets again as :func:`~pyUSID.io.hdf_utils.reshape_to_n_dims` would
+
+        Returns
+        -------
+        n_dim_data : :class:`dask.array.core.Array`
+            N-dimensional form of the dataset
+        """
+        if np.prod(self.__orig_pos_dim_sizes) != self.shape[0] or \
+                np.prod(self.__orig_spec_dim_sizes) != self.shape[1]:
+            raise ValueError('Product of dimension sizes does not match with the shape of the main dataset')
+        num_pos_dims = len(self.__pos_sort_order)
+        # numpy reshapes correctly when the dimensions are arranged from slowest to fastest
+        sorted_shape = np.append(self.__orig_pos_dim_sizes[self.__pos_sort_order][::-1],
+                                 self.__orig_spec_dim_sizes[self.__spec_sort_order][::-1])
+        n_dim_data = self.__lazy_2d.reshape(tuple(sorted_shape.tolist()))
+        # Axis at which each dimension (in the order of the ancillary datasets) now lies
+        swap_axes = [num_pos_dims - 1 - np.argwhere(self.__pos_sort_order == dim).squeeze()
+                     for dim in range(num_pos_dims)]
+        swap_axes += [num_pos_dims + len(self.__spec_sort_order) - 1 - np.argwhere(self.__spec_sort_order == dim).squeeze()
+                      for dim in range(len(self.__spec_sort_order))]
+        return n_dim_data.transpose(tuple(int(axis) for axis in swap_axes))
+
     def __set_n_dim_view(self):
         """
         Sets the current view of the N-dimensional form of the dataset
@@ -387,6 +443,11 @@ class USIDataset(h5py.Dataset):
         success : bool
             Always True
         """
+        if not lazy and self.__pos_regular and self.__spec_regular:
+            data_slice = self.__slice_regular(slice_dict)
+            if data_slice is not None:
+                return data_slice, True
+
         nd_slice = []
 
         for dim_name in self.n_dim_labels:
@@ -404,6 +465,150 @@ class USIDataset(h5py.Dataset):
 
         return sliced_dset, True
 
+    def __read_hyperslabs(self, positions, steps):
+        """
+        Reads the provided positions and spectroscopic steps of the dataset
+        as a few contiguous hyperslabs. Steps separated by at most
+        MAX_HYPERSLAB_GAP unrequested steps and positions separated by at most
+        MAX_POSITION_GAP_BYTES of unrequested data are read within the same
+        hyperslab and discarded afterwards
+
+        Parameters
+        ----------
+        positions : :class:`numpy.ndarray`
+            Sorted, unique indices of positions
+        steps : :class:`numpy.ndarray`
+            Sorted, unique indices of spectroscopic steps
+
+        Returns
+        -------
+        data : :class:`numpy.ndarray`
+            2D array of shape (positions, steps)
+        """
+        positions = np.asarray(positions, dtype=np.int64).ravel()
+        steps = np.asarray(steps, dtype=np.int64).ravel()
+        if positions.size == 0 or steps.size == 0:
+            return np.zeros((positions.size, steps.size), dtype=self.dtype)
+        step_runs = np.split(steps, np.flatnonzero(np.diff(steps) > MAX_HYPERSLAB_GAP + 1) + 1)
+        # Bytes read for each position, including the unrequested steps within the runs
+        row_bytes = sum([int(run[-1] - run[0]) + 1 for run in step_runs]) * self.dtype.itemsize
+        max_pos_gap = MAX_POSITION_GAP_BYTES // max(1, row_bytes)
+        pos_runs = np.split(positions, np.flatnonzero(np.diff(positions) > max_pos_gap + 1) + 1)
+
+        data = np.empty((positions.size, steps.size), dtype=self.dtype)
+        pos_offset = 0
+        for pos_run in pos_runs:
+            first_pos, last_pos = int(pos_run[0]), int(pos_run[-1]) + 1
+            step_offset = 0
+            for run in step_runs:
+                first_step, last_step = int(run[0]), int(run[-1]) + 1
+                block = super(USIDataset, self).__getitem__((slice(first_pos, last_pos),
+                                                             slice(first_step, last_step)))
+                if pos_run.size < last_pos - first_pos:
+                    block = block[pos_run - first_pos]
+                if run.size < last_step - first_step:
+                    block = block[:, run - first_step]
+                data[pos_offset: pos_offset + pos_run.size, step_offset: step_offset + run.size] = block
+                step_offset += run.size
+            pos_offset += pos_run.size
+        return data
+
+    def __check_regular(self, flat_pos, flat_spec):
+        """
+        Compares the indices of up to REGULAR_SPOT_CHECKS of the provided
+        positions and spectroscopic steps against those expected of regular
+        ancillary datasets. Slicing falls back to searching the ancillary
+        datasets if these were modified after this object was created
+
+        Parameters
+        ----------
+        flat_pos : :class:`numpy.ndarray`
+            Sorted, unique indices of positions
+        flat_spec : :class:`numpy.ndarray`
+            Sorted, unique indices of spectroscopic steps
+
+        Returns
+        -------
+        bool
+            True if the sampled entries match the expected indices
+        """
+        for is_spec, entries in [(False, flat_pos), (True, flat_spec)]:
+            if entries.size == 0:
+                continue
+            picks = np.unique(np.linspace(0, entries.size - 1, num=min(entries.size, REGULAR_SPOT_CHECKS),
+                                          dtype=np.int64))
+            picks = entries[picks]
+            if is_spec:
+                sizes, strides = self.__orig_spec_dim_sizes, self.__spec_strides
+                h5_inds = self.h5_spec_inds
+            else:
+                sizes, strides = self.__orig_pos_dim_sizes, self.__pos_strides
+                h5_inds = self.h5_pos_inds
+            if picks[-1] >= h5_inds.shape[int(is_spec)]:
+                actual = None
+            elif is_spec:
+                actual = h5_inds[:, picks.tolist()]
+            else:
+                actual = np.transpose(h5_inds[picks.tolist()])
+            expected = (picks[np.newaxis, :] // strides[:, np.newaxis]) % sizes[:, np.newaxis]
+            if actual is None or not np.array_equal(actual, expected):
+                warn('{} Indices of {} no longer match its dimensions. Searching them when slicing instead'
+                     ''.format('Spectroscopic' if is_spec else 'Position', self.name))
+                self.__pos_regular = False
+                self.__spec_regular = False
+                return False
+        return True
+
+    def __slice_regular(self, slice_dict):
+        """
+        Slices the N-dimensional form of the dataset without reshaping the
+        entire dataset. Only applicable when both ancillary datasets are
+        regular, in which case the positions and spectroscopic steps within
+        the slice are computed from the strides of the dimensions and only
+        these are read from the file
+
+        Parameters
+        ----------
+        slice_dict : dict
+            Dictionary of array-likes. for any dimension one needs to slice
+
+        Returns
+        -------
+        data_slice : :class:`numpy.ndarray` or None
+            Slice of the dataset, identical to that of the N-dimensional form.
+            None if the ancillary datasets are no longer regular
+        """
+        num_pos_dims = len(self.pos_dim_labels)
+        orig_pos_labels = list(self.__orig_pos_dim_labels)
+        orig_spec_labels = list(self.__orig_spec_dim_labels)
+        dim_inds = [[], []]
+        strides = [[], []]
+        slice_shape = []
+        for axis, (dim_name, dim_size) in enumerate(zip(self.n_dim_labels, self.n_dim_sizes)):
+            val = slice_dict.get(dim_name, slice(None))
+            if isinstance(val, tuple):
+                val = list(val)
+            inds = np.arange(dim_size)[val]
+            if np.ndim(inds) > 0:
+                # Integers drop the dimension, just as when indexing the N-dimensional form
+                slice_shape.append(np.size(inds))
+            if axis < num_pos_dims:
+                dim_inds[0].append(inds)
+                strides[0].append(self.__pos_strides[orig_pos_labels.index(dim_name)])
+            else:
+                dim_inds[1].append(inds)
+                strides[1].append(self.__spec_strides[orig_spec_labels.index(dim_name)])
+
+        flat_pos = get_flat_indices(strides[0], dim_inds[0]).ravel()
+        flat_spec = get_flat_indices(strides[1], dim_inds[1]).ravel()
+        positions, pos_order = np.unique(flat_pos, return_inverse=True)
+        steps, spec_order = np.unique(flat_spec, return_inverse=True)
+        if not self.__check_regular(positions, steps):
+            return None
+
+        data = self.__read_hyperslabs(positions, steps)
+        return data[pos_order][:, spec_order].reshape(slice_shape)
+
     def slice(self, slice_dict, ndim_form=True, as_scalar=False, verbose=False, lazy=False):
         """
         Slice the dataset based on an input dictionary of 'str': slice pairs.
@@ -470,12 +675,7 @@ class USIDataset(h5py.Dataset):
         if lazy:
             data_slice = raw_2d[pos_slice[:, 0], :][:, spec_slice[:, 0]]
         else:
-            if len(pos_slice) <= len(spec_slice):
-                # Fewer final positions than spectra
-                data_slice = np.atleast_2d(raw_2d[pos_slice[:, 0], :])[:, spec_slice[:, 0]]
-            else:
-                # Fewer final spectral points compared to positions
-                data_slice = np.atleast_2d(raw_2d[:, spec_slice[:, 0]])[pos_slice[:, 0], :]
+            data_slice = self.__read_hyperslabs(pos_slice[:, 0], spec_slice[:, 0])
 
         if verbose:
             print('data_slice of shape: {} and type: {} after slicing'
@@ -488,8 +688,11 @@ class USIDataset(h5py.Dataset):
         if verbose:
             print('data_slice of shape: {} after squeezing'.format(data_slice.shape))
 
-        pos_inds = self.h5_pos_inds[pos_slice, :]
-        spec_inds = self.h5_spec_inds[:, spec_slice].reshape([self.h5_spec_inds.shape[0], -1])
+        # Read the span of the selected entries once rather than selecting each of them in the file
+        pos_entries, spec_entries = pos_slice[:, 0], spec_slice[:, 0]
+        pos_inds = self.h5_pos_inds[pos_entries.min(): pos_entries.max() + 1][pos_entries - pos_entries.min()]
+        spec_inds = self.h5_spec_inds[:, spec_entries.min(): spec_entries.max() + 1][:, spec_entries -
+                                                                                     spec_entries.min()]
         if verbose:
             print('Sliced position indices:')
             print(pos_inds)
@@ -597,6 +800,16 @@ class USIDataset(h5py.Dataset):
 
             n_dim_slices_sizes[key] = len(val)
 
+        if self.__pos_regular and self.__spec_regular:
+            # Flat indices are affine functions of the indices of the dimensions
+            pos_slice = get_flat_indices(self.__pos_strides,
+                                         [n_dim_slices[pos_lab] for pos_lab in self.__orig_pos_dim_labels])
+            spec_slice = get_flat_indices(self.__spec_strides,
+                                          [n_dim_slices[spec_lab] for spec_lab in self.__orig_spec_dim_labels])
+            pos_slice, spec_slice = np.unique(pos_slice), np.unique(spec_slice)
+            if self.__check_regular(pos_slice, spec_slice):
+                return np.expand_dims(pos_slice, axis=1), np.expand_dims(spec_slice, axis=1)
+
         # Build the list of position slice indices
         for pos_ind, pos_lab in enumerate(self.__orig_pos_dim_labels):
             # n_dim_slices[pos_lab] = np.isin(self.h5_pos_inds[:, pos_ind], n_dim_slices[pos_lab])
@@ -1195,93 +1408,203 @@ class USIDataset(h5py.Dataset):
 
         return reduced_nd, USIDataset(h5_red_main)
 
-    def to_csv(self, output_path=None, force=False):
+    def __get_output_path(self, output_path, extension, force, zarr_group=False):
         """
-        Output this USIDataset and position + spectroscopic values to a csv file.
-        This should ideally be limited to small datasets only
+        Returns the path that this dataset should be exported to after
+        removing any existing file at that path
 
         Parameters
         ----------
-        output_path : str, optional
-            path that the output file should be written to.
-            By default, the file will be written to the same directory as the HDF5 file
-        force : bool, optional
-            Whether or not to force large dataset to be written to CSV. Default = False
+        output_path : str
+            Path provided by the user. If None, the file will be named after this dataset and
+            placed in the same directory as the HDF5 file
+        extension : str
+            Extension of the exported file, such as '.csv'
+        force : bool
+            Whether or not to overwrite an existing file at output_path
+        zarr_group : bool, optional. Default = False
+            Whether or not an existing directory at output_path may be removed
+            when ``force`` is True. Only directories holding a Zarr group are
+            ever removed
 
         Returns
         -------
-        output_file: str
-
-        Author - Daniel Streater, Suhas Somnath
+        output_path : str
+            Path to write to
         """
         if not isinstance(force, bool):
             raise TypeError('force should be a bool')
 
-        if self.dtype.itemsize * self.size / (1024 ** 2) > 15:
-            if force:
-                print('Note - the CSV file can be (much) larger than 100 MB')
-            else:
-                print('CSV file will not be written since the CSV file could be several 100s of MB large.\n'
-                      'If you still want the file to be written, add the keyword argument "force=True"\n'
-                      'We recommend that you save the data as a .npy or .npz file using numpy.dump')
-                return
-
         if output_path is not None:
             if not isinstance(output_path, str):
                 raise TypeError('output_path should be a string with a valid path for the output file')
         else:
             parent_folder, file_name = os.path.split(self.file.filename)
-            csv_name = file_name[:file_name.rfind('.')] + self.name.replace('/', '-') + '.csv'
-            output_path = os.path.join(parent_folder, csv_name)
+            out_name = file_name[:file_name.rfind('.')] + self.name.replace('/', '-') + extension
+            output_path = os.path.join(parent_folder, out_name)
 
         if os.path.exists(output_path):
-            if force:
-                os.remove(output_path)
-            else:
+            if not force:
                 raise FileExistsError('A file of the following name already exists. Set "force=True" to overwrite.\n'
                                       'File path: ' + output_path)
+            if not os.path.isdir(output_path):
+                os.remove(output_path)
+            elif zarr_group and os.path.isfile(os.path.join(output_path, '.zgroup')):
+                shutil.rmtree(output_path)
+            else:
+                raise IsADirectoryError('Only existing files or Zarr groups can be overwritten. The following '
+                                        'directory was not removed:\n' + output_path)
+
+        return output_path
+
+    def to_csv(self, output_path=None, force=False):
+        """
+        Output this USIDataset and position + spectroscopic values to a csv file.
+        The dataset is read, formatted, and written a block of positions at a
+        time so that datasets of any size can be written within bounded memory
+
+        Parameters
+        ----------
+        output_path : str, optional
+            path that the output file should be written to.
+            By default, the file will be written to the same directory as the HDF5 file
+        force : bool, optional
+            Whether or not to overwrite an existing file at output_path. Default = False
+
+        Returns
+        -------
+        output_file: str
 
-        header = ''
-        for spec_vals_for_dim in self.h5_spec_vals:
-            # create one line of the header for each of the spectroscopic dimensions
-            header += ','.join(str(item) for item in spec_vals_for_dim) + '\n'
-        # Add a dashed-line separating the spec vals from the data
-        header += ','.join(
-            '--------------------------------------------------------------' for _ in self.h5_spec_vals[0])
+        Author - Daniel Streater, Suhas Somnath
+        """
+        if self.dtype.names is not None:
+            raise TypeError('Datasets with compound data types cannot be written to CSV. Consider writing '
+                            'individual fields via numpy.savetxt instead')
 
-        # Write the contents to a temporary file
-        np.savetxt('temp.csv', self, delimiter=',', header=header, comments='')
+        output_path = self.__get_output_path(output_path, '.csv', force)
 
         """
-        Create the spectral and position labels for the dataset in string form then
-        create the position value array in string form, right-strip the last comma from the
-        string to deliver the correct number of values, append all of the labels and values together,
-        save the data and header to a temporary csv output
+        The first few columns hold the names and values of the position dimensions. The remaining columns hold the
+        values of the spectroscopic dimensions (one row per dimension), a dashed line, and then the data itself
         """
-        # First few lines will have the spectroscopic dimension names + units
-        spec_dim_labels = ''
-        for dim_desc in self.spec_dim_descriptors:
-            spec_dim_labels += ','.join('' for _ in self.pos_dim_labels) + str(dim_desc) + ',\n'
+        # First few rows will have the spectroscopic dimension names + units alongside their values
+        left_header = [','.join('' for _ in self.pos_dim_labels) + str(dim_desc) + ','
+                       for dim_desc in self.spec_dim_descriptors]
+        right_header = [','.join(str(item) for item in spec_vals_for_dim)
+                        for spec_vals_for_dim in self.h5_spec_vals[()]]
+        # Next row will have the position dimension names alongside a dashed-line separating the spec vals from the data
+        left_header.append(','.join(pos_dim for pos_dim in self.pos_dim_descriptors) + ',')
+        right_header.append(','.join('--------------------------------------------------------------'
+                                     for _ in range(self.shape[1])))
+
+        # Same formatting as numpy.savetxt() but applied to entire rows at a time
+        is_complex = np.iscomplexobj(np.zeros(0, dtype=self.dtype))
+        val_fmt = ' (%.18e+%.18ej)' if is_complex else '%.18e'
+        row_fmt = ','.join([val_fmt] * self.shape[1])
+
+        # Each value takes up about 25 characters once formatted
+        rows_per_block = get_rows_per_block(self, 25 * row_fmt.count('%'), 16 * 1024 ** 2)
+
+        with open(output_path, 'w') as out_file:
+            for left_line, right_line in zip(left_header, right_header):
+                out_file.write(left_line + right_line + '\n')
+
+            for start in range(0, self.shape[0], rows_per_block):
+                stop = min(self.shape[0], start + rows_per_block)
+                data = super(USIDataset, self).__getitem__(slice(start, stop))
+                if is_complex:
+                    data = np.stack([data.real, data.imag], axis=-1).reshape(data.shape[0], -1)
+                pos_vals = self.h5_pos_vals[start: stop]
+                lines = []
+                for pos_vals_in_row, data_row in zip(pos_vals, data.tolist()):
+                    line = ','.join(str(item) for item in pos_vals_in_row) + ',' + row_fmt % tuple(data_row)
+                    lines.append(line.replace('+-', '-') if is_complex else line)
+                out_file.write('\n'.join(lines) + '\n')
+
+        print('Successfully wrote this dataset to: ' + output_path)
+
+        return output_path
 
-        # Next line will have the position dimension names
-        pos_labels = ','.join(pos_dim for pos_dim in self.pos_dim_descriptors) + ',\n'
+    def to_arrow(self, output_path=None, force=False, max_mem_mb=1024, cores=None):
+        """
+        Output this USIDataset to an Apache Arrow IPC (Feather v2) file with one row per element of this dataset.
+        The position and spectroscopic values of each element are written as columns alongside the data.
+        Units and labels are preserved as metadata. Requires pyarrow.
+        See :func:`~pyUSID.io.export_utils.write_arrow` for details
 
-        # Finally, the remaining rows will have the position values themselves
-        pos_values = ''
-        for pos_vals_in_row in self.h5_pos_vals:
-            pos_values += ','.join(str(item) for item in pos_vals_in_row) + ',\n'
-        pos_values = pos_values.rstrip('\n')
+        Parameters
+        ----------
+        output_path : str, optional
+            path that the output file should be written to.
+            By default, the file will be written to the same directory as the HDF5 file
+        force : bool, optional
+            Whether or not to overwrite an existing file at output_path. Default = False
+        max_mem_mb : uint, optional
+            Upper limit on the memory used for converting blocks of this dataset in megabytes. Default = 1024
+        cores : uint, optional
+            Number of blocks converted in parallel. Default - all but one of the available cores
 
-        # Now put together all the rows for the first few columns:
-        output = spec_dim_labels + pos_labels + pos_values
+        Returns
+        -------
+        output_file: str
+        """
+        output_path = self.__get_output_path(output_path, '.arrow', force)
+        write_arrow(self, output_path, file_format='arrow', max_mem_bytes=int(max_mem_mb * 1024 ** 2), cores=cores)
+        print('Successfully wrote this dataset to: ' + output_path)
+        return output_path
 
-        left_dset = output.splitlines()
+    def to_parquet(self, output_path=None, force=False, max_mem_mb=1024, cores=None):
+        """
+        Output this USIDataset to a Parquet file with one row per element of this dataset.
+        The position and spectroscopic values of each element are written as columns alongside the data.
+        Units and labels are preserved as metadata. Requires pyarrow.
+        See :func:`~pyUSID.io.export_utils.write_arrow` for details
 
-        with open('temp.csv', 'r+') as in_file, open(output_path, 'w') as out_file:
-            for left_line, right_line in zip(left_dset, in_file):
-                out_file.write(left_line + right_line)
+        Parameters
+        ----------
+        output_path : str, optional
+            path that the output file should be written to.
+            By default, the file will be written to the same directory as the HDF5 file
+        force : bool, optional
+            Whether or not to overwrite an existing file at output_path. Default = False
+        max_mem_mb : uint, optional
+            Upper limit on the memory used for converting blocks of this dataset in megabytes. Default = 1024
+        cores : uint, optional
+            Number of blocks converted in parallel. Default - all but one of the available cores
 
-        os.remove('temp.csv')
+        Returns
+        -------
+        output_file: str
+        """
+        output_path = self.__get_output_path(output_path, '.parquet', force)
+        write_arrow(self, output_path, file_format='parquet', max_mem_bytes=int(max_mem_mb * 1024 ** 2),
+                    cores=cores)
         print('Successfully wrote this dataset to: ' + output_path)
+        return output_path
+
+    def to_zarr(self, output_path=None, force=False, max_mem_mb=1024, cores=None):
+        """
+        Output this USIDataset along with its position and spectroscopic datasets to a Zarr group.
+        Units and labels are preserved as attributes. Requires zarr.
+        See :func:`~pyUSID.io.export_utils.write_zarr` for details
+
+        Parameters
+        ----------
+        output_path : str, optional
+            path of the directory that the Zarr group should be written to.
+            By default, the group will be written to the same directory as the HDF5 file
+        force : bool, optional
+            Whether or not to overwrite an existing file or Zarr group at output_path. Default = False
+        max_mem_mb : uint, optional
+            Upper limit on the memory used for copying blocks of this dataset in megabytes. Default = 1024
+        cores : uint, optional
+            Number of blocks copied in parallel. Default - all but one of the available cores
 
+        Returns
+        -------
+        output_file: str
+        """
+        output_path = self.__get_output_path(output_path, '.zarr', force, zarr_group=True)
+        write_zarr(self, output_path, max_mem_bytes=int(max_mem_mb * 1024 ** 2), cores=cores)
+        print('Successfully wrote this dataset to: ' + output_path)
         return output_path
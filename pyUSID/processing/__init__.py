@@ -7,10 +7,35 @@ Submodules
 .. autosummary::
     :toctree: _autosummary
 
+    process
+    workers
+    scheduler
+    checkpoint
+    instrumentation
+    fusion
+    sharding
+    status
+    timeouts
+    chunk_cache
+    dask_engine
+    memory
 """
 
 from .process import Process
+from .workers import WorkerPool, SharedArray
+from .scheduler import SharedJobCounter
+from .checkpoint import CheckpointPolicy
+from . import instrumentation
+from .fusion import FusedProcess
+from . import sharding
+from .status import StatusTracker
+from .timeouts import TimeLimitedFunction, TimedOut
+from . import chunk_cache
+from . import dask_engine
+from . import memory
 from sidpy.proc import comp_utils
 from sidpy.proc.comp_utils import parallel_compute
 
-__all__ = ['Process', 'parallel_compute', 'comp_utils']
+__all__ = ['Process', 'WorkerPool', 'SharedArray', 'SharedJobCounter', 'CheckpointPolicy', 'instrumentation', 'FusedProcess',
+           'sharding', 'StatusTracker', 'TimeLimitedFunction', 'TimedOut', 'chunk_cache', 'dask_engine', 'memory',
+           'parallel_compute', 'comp_utils']
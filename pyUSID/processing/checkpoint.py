@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+"""
+:class:`~pyUSID.processing.checkpoint.CheckpointPolicy` - Decides when the results computed by a
+:class:`~pyUSID.processing.process.Process` are flushed to the file and marked as complete
+
+Created on Sun Oct 18 2026
+
+@author: Suhas Somnath, Chris Smith
+"""
+
+from __future__ import division, print_function, unicode_literals, \
+    absolute_import
+import signal
+import threading
+import time as tm
+from numbers import Number
+
+
+class CheckpointPolicy(object):
+    """
+    Decides when the results of the batches computed so far should be
+    flushed to the file and marked as complete in the status dataset.
+    A checkpoint is due once any one of the following conditions is met:
+
+    * a number of batches have been written since the last checkpoint
+    * some time has elapsed since the last checkpoint
+    * one of the specified signals was received since the last checkpoint
+
+    The default policy checkpoints after every batch.
+    """
+
+    def __init__(self, batches=1, seconds=None, signals=None):
+        """
+        Parameters
+        ----------
+        batches : uint, optional. Default = 1
+            Number of batches after which a checkpoint is due. Set to None to
+            only checkpoint based on time or signals
+        seconds : float, optional. Default = None
+            Time in seconds after which a checkpoint is due
+        signals : list of int, optional. Default = None
+            Signals (e.g. ``signal.SIGUSR1``) that make a checkpoint due at
+            the end of the current batch. Job schedulers can send such a
+            signal shortly before preempting a job. Receiving a signal does
+            not stop the computation. Signals can only be handled when
+            computing in the main thread
+        """
+        if batches is not None:
+            if not isinstance(batches, int) or isinstance(batches, bool):
+                raise TypeError('batches should be an integer')
+            if batches < 1:
+                raise ValueError('batches should be at least 1')
+        if seconds is not None:
+            if not isinstance(seconds, Number) or isinstance(seconds, bool):
+                raise TypeError('seconds should be a number')
+            if seconds <= 0:
+                raise ValueError('seconds should be a positive number')
+        if signals is None:
+            signals = []
+        else:
+            if not isinstance(signals, (list, tuple)):
+                signals = [signals]
+            if not all([isinstance(sig_num, int) for sig_num in signals]):
+                raise TypeError('signals should be a list of signal numbers')
+            signals = list(signals)
+        if batches is None and seconds is None and len(signals) == 0:
+            raise ValueError('At least one of batches, seconds, or signals should be provided')
+
+        self.batches = batches
+        self.seconds = seconds
+        self.signals = signals
+        self.__batches_since = 0
+        self.__last_time = tm.time()
+        self.__signal_received = False
+        self.__prev_handlers = dict()
+
+    @property
+    def is_collective(self):
+        """
+        Whether or not all MPI ranks computing the same number of batches
+        would reach checkpoints together. This is not the case when
+        checkpoints depend on time or signals
+
+        Returns
+        -------
+        bool
+        """
+        return self.seconds is None and len(self.signals) == 0
+
+    def __handle_signal(self, sig_num, frame):
+        self.__signal_received = True
+
+    def start(self):
+        """
+        Starts the clock and starts listening for the signals. Call this
+        before computing the first batch
+        """
+        self.reset()
+        if len(self.signals) == 0 or \
+                threading.current_thread() is not threading.main_thread():
+            return
+        for sig_num in self.signals:
+            self.__prev_handlers[sig_num] = signal.signal(sig_num, self.__handle_signal)
+
+    def stop(self):
+        """
+        Restores the handlers of the signals. Call this once computation has
+        finished or was interrupted
+        """
+        for sig_num, handler in self.__prev_handlers.items():
+            signal.signal(sig_num, handler)
+        self.__prev_handlers = dict()
+
+    def batch_completed(self):
+        """
+        Registers that a batch was written and checks whether a checkpoint is
+        due
+
+        Returns
+        -------
+        bool
+            Whether or not a checkpoint is due
+        """
+        self.__batches_since += 1
+        if self.__signal_received:
+            return True
+        if self.batches is not None and self.__batches_since >= self.batches:
+            return True
+        return self.seconds is not None and tm.time() - self.__last_time >= self.seconds
+
+    def reset(self):
+        """
+        Registers that a checkpoint was just made
+        """
+        self.__batches_since = 0
+        self.__last_time = tm.time()
+        self.__signal_received = False
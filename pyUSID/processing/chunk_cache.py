@@ -0,0 +1,200 @@
+# -*- coding: utf-8 -*-
+"""
+Utilities for sizing the HDF5 raw data chunk cache to the batches of positions read and written by a
+:class:`~pyUSID.processing.process.Process`
+
+Created on Sun Oct 18 2026
+
+@author: Suhas Somnath, Chris Smith
+"""
+
+from __future__ import division, print_function, unicode_literals, \
+    absolute_import
+import numpy as np
+import h5py
+
+__all__ = ['DEFAULT_CACHE_NBYTES', 'get_chunks_per_row', 'get_cache_nbytes', 'get_cache_nslots',
+           'get_chunk_cache_settings', 'get_chunk_cache', 'get_chunk_rows']
+
+DEFAULT_CACHE_NBYTES = 1024 ** 2
+"""
+Size in bytes of the chunk cache that HDF5 allots to each dataset by default
+"""
+
+
+def _next_prime(num):
+    """
+    Returns the smallest prime number greater than or equal to the provided
+    number
+
+    Parameters
+    ----------
+    num : uint
+        Number to start from
+
+    Returns
+    -------
+    uint
+        Prime number
+    """
+    num = max(2, int(num))
+    while True:
+        if num == 2 or (num % 2 == 1 and all(num % div for div in range(3, int(num ** 0.5) + 1, 2))):
+            return num
+        num += 1
+
+
+def get_chunks_per_row(shape, chunks):
+    """
+    Returns the number of chunks spanned by the data of a single position
+
+    Parameters
+    ----------
+    shape : tuple of uint
+        Shape of the dataset. The first dimension is that of positions
+    chunks : tuple of uint
+        Shape of each chunk of the dataset
+
+    Returns
+    -------
+    uint
+        Number of chunks
+    """
+    return int(np.prod([int(np.ceil(size / chunk)) for size, chunk in zip(shape[1:], chunks[1:])]))
+
+
+def get_cache_nbytes(shape, chunks, itemsize, rows_per_batch):
+    """
+    Returns the size of the chunk cache needed to hold every chunk touched by
+    a batch of positions. Batches read or write entire rows, so every chunk
+    along the other dimensions is touched. One more row of chunks is included
+    for batches that start or end within a chunk
+
+    Parameters
+    ----------
+    shape : tuple of uint
+        Shape of the dataset. The first dimension is that of positions
+    chunks : tuple of uint
+        Shape of each chunk of the dataset
+    itemsize : uint
+        Size of each element of the dataset in bytes
+    rows_per_batch : uint
+        Maximum number of positions in each batch
+
+    Returns
+    -------
+    nbytes : uint
+        Size of the chunk cache in bytes
+    chunk_nbytes : uint
+        Size of each chunk in bytes
+    """
+    chunk_nbytes = int(np.prod(chunks)) * int(itemsize)
+    chunks_per_row = get_chunks_per_row(shape, chunks)
+    chunk_rows = min(int(np.ceil(shape[0] / chunks[0])), int(np.ceil(rows_per_batch / chunks[0])) + 1)
+    return chunk_rows * chunks_per_row * chunk_nbytes, chunk_nbytes
+
+
+def get_cache_nslots(nbytes, chunk_nbytes):
+    """
+    Returns the number of slots in the hash table of the chunk cache. HDF5
+    recommends a prime number about 100 times the number of chunks that fit
+    within the cache
+
+    Parameters
+    ----------
+    nbytes : uint
+        Size of the chunk cache in bytes
+    chunk_nbytes : uint
+        Size of each chunk in bytes
+
+    Returns
+    -------
+    nslots : uint
+        Number of slots
+    """
+    return _next_prime(min(2 ** 24, max(521, 100 * (int(nbytes) // max(1, int(chunk_nbytes))))))
+
+
+def get_chunk_cache_settings(h5_dset, rows_per_batch, max_nbytes=None):
+    """
+    Returns the chunk cache settings that allow each chunk of the dataset to
+    be decompressed (or compressed) only once when the dataset is read or
+    written in batches of positions. The settings can be passed on to
+    :class:`h5py.File` when opening the file containing the dataset. Note
+    that HDF5 only applies these settings to datasets that are not already
+    open
+
+    Parameters
+    ----------
+    h5_dset : :class:`h5py.Dataset`
+        Dataset with one row per position
+    rows_per_batch : uint
+        Maximum number of positions in each batch
+    max_nbytes : uint, optional
+        Upper limit on the size of the cache in bytes, such as the memory
+        budget available for the batch. The cache always holds at least one
+        chunk
+
+    Returns
+    -------
+    settings : dict
+        'rdcc_nbytes', 'rdcc_nslots', and 'rdcc_w0' for the dataset. None if
+        the dataset is not chunked
+    """
+    if not isinstance(h5_dset, h5py.Dataset):
+        raise TypeError('h5_dset should be a h5py.Dataset object')
+    if h5_dset.chunks is None:
+        return None
+    nbytes, chunk_nbytes = get_cache_nbytes(h5_dset.shape, h5_dset.chunks, h5_dset.dtype.itemsize,
+                                            rows_per_batch)
+    nbytes = max(nbytes, DEFAULT_CACHE_NBYTES)
+    if max_nbytes is not None:
+        nbytes = min(nbytes, max(int(max_nbytes), chunk_nbytes))
+    nslots = get_cache_nslots(nbytes, chunk_nbytes)
+    # Chunks are read or written entirely before moving onto the next. Such chunks should be evicted first while
+    # partially written chunks at the ends of batches are retained for the next batch
+    return {'rdcc_nbytes': int(nbytes), 'rdcc_nslots': int(nslots), 'rdcc_w0': 1.0}
+
+
+def get_chunk_cache(h5_dset):
+    """
+    Returns the chunk cache settings that HDF5 is actually using for the
+    provided dataset
+
+    Parameters
+    ----------
+    h5_dset : :class:`h5py.Dataset`
+        Dataset of interest
+
+    Returns
+    -------
+    settings : dict
+        'rdcc_nbytes', 'rdcc_nslots', and 'rdcc_w0' for the dataset
+    """
+    if not isinstance(h5_dset, h5py.Dataset):
+        raise TypeError('h5_dset should be a h5py.Dataset object')
+    nslots, nbytes, w0 = h5_dset.id.get_access_plist().get_chunk_cache()
+    return {'rdcc_nbytes': int(nbytes), 'rdcc_nslots': int(nslots), 'rdcc_w0': float(w0)}
+
+
+def get_chunk_rows(positions, h5_dset):
+    """
+    Returns the indices of the rows of chunks that contain the provided
+    positions
+
+    Parameters
+    ----------
+    positions : array-like
+        Sorted indices of positions
+    h5_dset : :class:`h5py.Dataset`
+        Chunked dataset with one row per position
+
+    Returns
+    -------
+    :class:`numpy.ndarray`
+        Sorted, unique indices of rows of chunks. Empty if the dataset is not
+        chunked
+    """
+    if h5_dset.chunks is None:
+        return np.zeros(0, dtype=np.int64)
+    return np.unique(np.asarray(positions, dtype=np.int64) // h5_dset.chunks[0])
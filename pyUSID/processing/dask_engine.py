@@ -0,0 +1,221 @@
+# -*- coding: utf-8 -*-
+"""
+Utilities for computing the batches of a :class:`~pyUSID.processing.process.Process` as a Dask graph and streaming
+the results back as and when blocks are computed. Blocks are computed by the threaded scheduler of Dask unless a
+:class:`dask.distributed.Client` is provided, in which case each task reads its batch from the file by path
+
+Created on Sun Oct 18 2026
+
+@author: Suhas Somnath, Chris Smith
+"""
+
+from __future__ import division, print_function, unicode_literals, \
+    absolute_import
+from warnings import warn
+import numpy as np
+import h5py
+import dask
+
+from ..io.hdf_utils import get_contiguous_slices
+
+__all__ = ['get_local_client', 'build_result_blocks', 'stream_blocks']
+
+
+def get_local_client(num_workers=1, memory_limit=None):
+    """
+    Starts a Dask distributed scheduler with workers on this machine. Workers
+    spill data to disk when approaching their memory limit. Pass the client
+    as the ``dask_client`` of a :class:`~pyUSID.processing.process.Process`
+    to compute its batches on these workers and close the client afterwards
+
+    Parameters
+    ----------
+    num_workers : uint, optional. Default = 1
+        Number of worker processes
+    memory_limit : uint, optional
+        Memory limit of each worker in bytes. Default - decided by Dask
+
+    Returns
+    -------
+    client : :class:`dask.distributed.Client`
+        Client connected to the scheduler. None if dask.distributed is not
+        installed, in which case Dask's threaded scheduler should be used
+    """
+    try:
+        from dask.distributed import Client, LocalCluster
+    except ImportError:
+        warn('dask.distributed is not installed. Use the threaded scheduler of Dask instead')
+        return None
+    kwargs = {'n_workers': int(num_workers), 'threads_per_worker': 1}
+    if memory_limit is not None:
+        kwargs['memory_limit'] = int(memory_limit)
+    return Client(LocalCluster(**kwargs))
+
+
+def _read_runs(h5_dset, runs):
+    """
+    Reads runs of consecutive positions from the source dataset
+
+    Parameters
+    ----------
+    h5_dset : :class:`h5py.Dataset`
+        Source dataset with one row per position
+    runs : list of slice
+        Runs of consecutive positions
+
+    Returns
+    -------
+    :class:`numpy.ndarray`
+        Data with one row per position
+    """
+    if len(runs) == 1:
+        return h5_dset[runs[0]]
+    return np.concatenate([h5_dset[run] for run in runs], axis=0)
+
+
+def _compute_block(source, runs, map_func, batched, func_args, func_kwargs):
+    """
+    Reads a batch of positions and applies the map function to it
+
+    Parameters
+    ----------
+    source : :class:`h5py.Dataset` or tuple
+        Source dataset within this process or the path of the file and the
+        name of the dataset, which are opened for reading by the task itself
+    runs : list of slice
+        Runs of consecutive positions in the batch
+    map_func : callable
+        Function to apply
+    batched : bool
+        If True, ``map_func`` is applied to the entire batch. Otherwise,
+        ``map_func`` is applied to each position
+    func_args : list
+        Arguments to the function
+    func_kwargs : dict
+        Keyword arguments to the function
+
+    Returns
+    -------
+    object
+        Results for the batch
+    """
+    if isinstance(source, tuple):
+        file_path, dset_name = source
+        with h5py.File(file_path, mode='r') as h5_file:
+            block = _read_runs(h5_file[dset_name], runs)
+    else:
+        block = _read_runs(source, runs)
+    if batched:
+        return map_func(block, *func_args, **func_kwargs)
+    return [map_func(row, *func_args, **func_kwargs) for row in block]
+
+
+def build_result_blocks(h5_main, batches, func, batched=False, func_args=None, func_kwargs=None, by_path=False):
+    """
+    Builds a Dask graph with one task per batch of positions that reads the
+    batch from the source dataset and applies the map function to it
+
+    Parameters
+    ----------
+    h5_main : :class:`h5py.Dataset`
+        Source dataset with one row per position
+    batches : list of :class:`numpy.ndarray`
+        Sorted indices of positions in each batch. Each batch becomes a block
+    func : callable
+        Function to apply. Must be picklable without any HDF5 objects, such
+        as a module-level or static function, if ``by_path`` is True
+    batched : bool, optional. Default = False
+        If True, ``func`` is applied to each batch. Otherwise, ``func`` is
+        applied to each position
+    func_args : list, optional
+        Arguments to the function
+    func_kwargs : dict, optional
+        Keyword arguments to the function
+    by_path : bool, optional. Default = False
+        If True, each task opens the file containing ``h5_main`` by its path
+        so that the graph can be sent to the (remote) workers of a
+        :class:`dask.distributed.Client`. Otherwise, tasks read from
+        ``h5_main`` directly and must be computed within this process
+
+    Returns
+    -------
+    blocks : list of :class:`dask.delayed.Delayed`
+        Computes to the results for the corresponding batch
+    """
+    if not callable(func):
+        raise TypeError('func should be callable')
+    if not isinstance(h5_main, h5py.Dataset):
+        raise TypeError('h5_main should be a h5py.Dataset object')
+    if len(batches) == 0:
+        return []
+    if func_args is None:
+        func_args = []
+    if func_kwargs is None:
+        func_kwargs = dict()
+    source = (h5_main.file.filename, h5_main.name) if by_path else h5_main
+    compute_block = dask.delayed(_compute_block, pure=False)
+    return [compute_block(source, get_contiguous_slices(positions), func, batched, list(func_args),
+                          dict(func_kwargs)) for positions in batches]
+
+
+def stream_blocks(blocks, client=None, max_in_flight=2, num_workers=1):
+    """
+    Computes the blocks and yields their results as soon as they are
+    available. Only a few blocks are computed at any given time so that
+    results do not accumulate in memory faster than they are written
+
+    Parameters
+    ----------
+    blocks : list of :class:`dask.delayed.Delayed`
+        Blocks built via :func:`build_result_blocks`
+    client : :class:`dask.distributed.Client`, optional
+        Client connected to the scheduler that will compute the blocks, which
+        should then have been built with ``by_path=True``. By default, the
+        threaded scheduler of Dask is used
+    max_in_flight : uint, optional. Default = 2
+        Maximum number of blocks being computed or awaiting collection
+    num_workers : uint, optional. Default = 1
+        Number of threads used by the threaded scheduler. Ignored if a
+        client is provided
+
+    Yields
+    ------
+    index : uint
+        Index of the block
+    results : object
+        Results for the block. Blocks may complete in any order when a
+        client is provided
+    """
+    max_in_flight = max(1, int(max_in_flight))
+    if client is None:
+        for start in range(0, len(blocks), max_in_flight):
+            computed = dask.compute(*blocks[start: start + max_in_flight], scheduler='threads',
+                                    num_workers=int(num_workers))
+            for offset, results in enumerate(computed):
+                yield start + offset, results
+        return
+
+    from dask.distributed import as_completed
+    indices = dict()
+
+    def _submit(index):
+        future = client.compute(blocks[index])
+        indices[future.key] = (index, future)
+        return future
+
+    queue = as_completed([_submit(index) for index in range(min(max_in_flight, len(blocks)))])
+    next_index = min(max_in_flight, len(blocks))
+    try:
+        for future in queue:
+            index, _ = indices.pop(future.key)
+            results = future.result()
+            future.release()
+            if next_index < len(blocks):
+                queue.add(_submit(next_index))
+                next_index += 1
+            yield index, results
+    finally:
+        # Interrupted. Nothing else should be computed
+        pending = [future for _, future in indices.values()]
+        if len(pending) > 0:
+            client.cancel(pending)
@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+"""
+:class:`~pyUSID.processing.fusion.FusedProcess` - Computes several processes on the same dataset while reading the
+dataset only once
+
+Created on Sun Oct 18 2026
+
+@author: Suhas Somnath, Chris Smith
+"""
+
+from __future__ import division, print_function, unicode_literals, \
+    absolute_import
+import numpy as np
+
+from .process import Process
+from .status import StatusTracker
+
+
+def _iter_batches(ranges, batch_size):
+    """
+    Yields batches of positions from sorted ranges of positions without
+    expanding all ranges at once
+
+    Parameters
+    ----------
+    ranges : :class:`numpy.ndarray`
+        2D array with the start and stop of each range per row
+    batch_size : uint
+        Maximum number of positions per batch
+
+    Yields
+    ------
+    batch : :class:`numpy.ndarray`
+        Sorted indices of positions
+    """
+    pieces = []
+    size = 0
+    for start, stop in ranges:
+        while start < stop:
+            count = min(stop - start, batch_size - size)
+            pieces.append(np.arange(start, start + count, dtype=np.int64))
+            size += count
+            start += count
+            if size == batch_size:
+                yield np.concatenate(pieces)
+                pieces = []
+                size = 0
+    if size > 0:
+        yield np.concatenate(pieces)
+
+
+class FusedProcess(object):
+    """
+    Runs several :class:`~pyUSID.processing.process.Process` instances that
+    share the same source dataset in a single pass over the source dataset.
+    Each batch of positions is read once and handed to every process, which
+    then computes and writes its results into its own results group and
+    status dataset as usual. This reduces the amount of data read from the
+    file by the number of processes.
+
+    Processes that have already been (partially) computed are returned
+    (resumed) as usual. Each process only computes the positions it still
+    needs. Positions that exceed the ``pixel_timeout`` of a process are
+    retried by that process once all batches have been read.
+    """
+
+    def __init__(self, processes, verbose=False):
+        """
+        Parameters
+        ----------
+        processes : list of :class:`~pyUSID.processing.process.Process`
+            Processes to compute. All processes must operate on the same
+            source dataset
+        verbose : bool, optional. Default = False
+            Whether or not to print debugging statements
+        """
+        if not isinstance(processes, (list, tuple)):
+            raise TypeError('processes should be a list of Process objects')
+        if len(processes) == 0:
+            raise ValueError('At least one Process should be provided')
+        if not all([isinstance(proc, Process) for proc in processes]):
+            raise TypeError('processes should be a list of Process objects')
+
+        h5_main = processes[0].h5_main
+        for proc in processes[1:]:
+            if proc.h5_main.file.filename != h5_main.file.filename or \
+                    proc.h5_main.name != h5_main.name:
+                raise ValueError('All processes should operate on the same source dataset: {}. Found a process '
+                                 'operating on: {}'.format(h5_main.name, proc.h5_main.name))
+        if any([proc.mpi_comm is not None for proc in processes]):
+            raise NotImplementedError('Fusing processes is not yet supported when computing via MPI')
+
+        self.processes = list(processes)
+        self.h5_main = h5_main
+        self.verbose = verbose
+
+    def compute(self, override=False, *args, **kwargs):
+        """
+        Computes all the processes while reading the source dataset only once
+
+        Parameters
+        ----------
+        override : bool, optional. default = False
+            By default, previously computed results will be returned and
+            partially computed results will be resumed. Set to True to force
+            fresh computation of all processes.
+        args : list
+            arguments to the mapped function of every process in the correct
+            order
+        kwargs : dict
+            keyword arguments to the mapped function of every process
+
+        Returns
+        -------
+        h5_results_grps : list of :class:`h5py.Group`
+            Groups containing the results of each process in the same order
+            as the processes
+        """
+        h5_results_grps = [proc._prepare_compute(override=override) for proc in self.processes]
+        active = [ind for ind, h5_grp in enumerate(h5_results_grps) if h5_grp is None]
+        if len(active) == 0:
+            return h5_results_grps
+
+        # Ranges of positions that each active process still needs to compute
+        num_pos = self.h5_main.shape[0]
+        pending = [StatusTracker(num_pos, ranges=self.processes[ind]._get_pending_ranges()) for ind in active]
+        needed_by_any = StatusTracker(num_pos, ranges=np.concatenate([tracker.ranges for tracker in pending],
+                                                                     axis=0))
+        num_needed = needed_by_any.num_completed
+
+        # The data for a batch is shared but each process holds onto its own results
+        batch_size = max(1, min([self.processes[ind]._max_pos_per_read for ind in active]))
+        reader = self.processes[active[0]]
+        if self.verbose:
+            print('Computing {} processes on {} positions in batches of {} positions'
+                  '.'.format(len(active), num_needed, batch_size))
+
+        completed = False
+        num_done = 0
+        try:
+            for batch in _iter_batches(needed_by_any.ranges, batch_size):
+                data = np.asarray(reader._read_positions(batch))
+                for tracker, ind in zip(pending, active):
+                    needed = tracker.contains(batch)
+                    if np.all(needed):
+                        self.processes[ind]._compute_positions(batch, data, *args, **kwargs)
+                    elif np.any(needed):
+                        self.processes[ind]._compute_positions(batch[needed], data[needed], *args, **kwargs)
+                num_done += batch.size
+                print('{}% complete'.format(int(100 * num_done / num_needed)))
+            completed = True
+        finally:
+            # Results already computed should make it to the file even if the computation was interrupted
+            for ind in active:
+                h5_results_grps[ind] = self.processes[ind]._finalize_compute(completed, *args, **kwargs)
+
+        print('Finished computing all processes!')
+        return h5_results_grps
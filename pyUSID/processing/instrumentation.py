@@ -0,0 +1,228 @@
+# -*- coding: utf-8 -*-
+"""
+Utilities for recording and saving per-batch performance statistics of a :class:`~pyUSID.processing.process.Process`
+
+Created on Sun Oct 18 2026
+
+@author: Suhas Somnath, Chris Smith
+"""
+
+from __future__ import division, print_function, unicode_literals, \
+    absolute_import
+import threading
+import time as tm
+import numpy as np
+import psutil
+import h5py
+
+__all__ = ['BATCH_STATS_FIELDS', 'get_rss', 'RSSMonitor', 'new_batch_record',
+           'batch_stats_to_array', 'write_batch_stats']
+
+BATCH_STATS_FIELDS = [('rank', np.uint32),
+                      ('batch', np.uint32),
+                      ('timestamp', np.float64),
+                      ('positions', np.uint64),
+                      ('read_bytes', np.uint64),
+                      ('read_time', np.float64),
+                      ('compute_time', np.float64),
+                      ('write_time', np.float64),
+                      ('flush_time', np.float64),
+                      ('peak_rss', np.uint64),
+                      ('chunks_read', np.uint64),
+                      ('chunks_reread', np.uint64)]
+"""
+Name and data type of each statistic recorded per batch. Times are in
+seconds and sizes in bytes. 'peak_rss' is the largest resident set size of
+the rank and its worker processes sampled while the batch was computed.
+'chunks_reread' counts the chunks of the source dataset that were also read
+by the previous batch of the same rank
+"""
+
+
+def get_rss(include_children=True):
+    """
+    Returns the current resident set size (memory) of this process
+
+    Parameters
+    ----------
+    include_children : bool, optional. Default = True
+        Whether or not to add the resident set size of child processes such
+        as the workers that compute positions in parallel
+
+    Returns
+    -------
+    rss : uint
+        Resident set size in bytes
+    """
+    process = psutil.Process()
+    rss = process.memory_info().rss
+    if include_children:
+        for child in process.children(recursive=True):
+            try:
+                rss += child.memory_info().rss
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                # Worker exited in the meantime
+                pass
+    return int(rss)
+
+
+class RSSMonitor(object):
+    """
+    Samples the resident set size of this process and its children in a
+    background thread to find the peak over an interval, such as the
+    computation of a batch. Unlike the high-water mark reported by the
+    operating system, the peak is not carried over from earlier intervals
+    """
+
+    def __init__(self, interval=0.05, include_children=True):
+        """
+        Parameters
+        ----------
+        interval : float, optional. Default = 0.05
+            Time in seconds between samples
+        include_children : bool, optional. Default = True
+            Whether or not to include the memory of child processes
+        """
+        if not isinstance(interval, (int, float)) or interval <= 0:
+            raise ValueError('interval should be a positive number')
+        self.__interval = interval
+        self.__include_children = include_children
+        self.__peak = 0
+        self.__stop_event = threading.Event()
+        self.__thread = None
+
+    def __sample(self):
+        """
+        Updates the peak resident set size until asked to stop
+        """
+        while not self.__stop_event.wait(self.__interval):
+            self.__peak = max(self.__peak, get_rss(self.__include_children))
+
+    def start(self):
+        """
+        Starts sampling. Any peak found earlier is discarded
+        """
+        if self.__thread is not None:
+            _ = self.stop()
+        self.__peak = get_rss(self.__include_children)
+        self.__stop_event.clear()
+        self.__thread = threading.Thread(target=self.__sample, name='RSSMonitor')
+        self.__thread.daemon = True
+        self.__thread.start()
+
+    def stop(self):
+        """
+        Stops sampling
+
+        Returns
+        -------
+        peak_rss : uint
+            Peak resident set size in bytes since :meth:`start` was called
+        """
+        if self.__thread is not None:
+            self.__stop_event.set()
+            self.__thread.join()
+            self.__thread = None
+        self.__peak = max(self.__peak, get_rss(self.__include_children))
+        return self.__peak
+
+
+def new_batch_record(rank=0, batch=0, positions=0):
+    """
+    Creates a record of statistics for a single batch with all times and
+    sizes set to zero
+
+    Parameters
+    ----------
+    rank : uint, optional. Default = 0
+        MPI rank that computed the batch
+    batch : uint, optional. Default = 0
+        Index of the batch computed by this rank
+    positions : uint, optional. Default = 0
+        Number of positions in the batch
+
+    Returns
+    -------
+    record : dict
+        Statistics keyed by the names in :data:`BATCH_STATS_FIELDS`
+    """
+    record = dict([(name, 0) for name, _ in BATCH_STATS_FIELDS])
+    record.update({'rank': rank, 'batch': batch, 'positions': positions,
+                   'timestamp': tm.time()})
+    return record
+
+
+def batch_stats_to_array(records):
+    """
+    Converts records of batch statistics to a structured array
+
+    Parameters
+    ----------
+    records : list of dict
+        Records of batch statistics created via :func:`new_batch_record`
+
+    Returns
+    -------
+    stats : :class:`numpy.ndarray`
+        1D structured array with one element per record
+    """
+    if not isinstance(records, (list, tuple)):
+        raise TypeError('records should be a list of dictionaries')
+    stats = np.zeros(len(records), dtype=BATCH_STATS_FIELDS)
+    for index, record in enumerate(records):
+        if not isinstance(record, dict):
+            raise TypeError('records should be a list of dictionaries')
+        for name, _ in BATCH_STATS_FIELDS:
+            stats[index][name] = record.get(name, 0)
+    return stats
+
+
+def write_batch_stats(h5_group, records, dset_name='Batch_Stats', comm=None):
+    """
+    Appends records of batch statistics to a dataset within the provided
+    group. The dataset is created if it does not exist already. Statistics
+    from previous (interrupted) computations are thus retained
+
+    Parameters
+    ----------
+    h5_group : :class:`h5py.Group`
+        Group to write the statistics to. Typically the results group
+    records : list of dict
+        Records of batch statistics created via :func:`new_batch_record`
+    dset_name : str, optional. Default = 'Batch_Stats'
+        Name of the dataset
+    comm : :class:`mpi4py.MPI.Comm`, optional
+        MPI communicator. If provided, the records of all ranks are written
+        and all ranks must call this function
+
+    Returns
+    -------
+    h5_stats : :class:`h5py.Dataset`
+        Dataset containing the statistics
+    """
+    if not isinstance(h5_group, (h5py.Group, h5py.File)):
+        raise TypeError('h5_group should be a h5py.Group object')
+    if comm is not None:
+        # Creating and resizing datasets are collective operations. Every rank needs all records
+        records = [record for rank_records in comm.allgather(list(records)) for record in rank_records]
+    stats = batch_stats_to_array(records)
+
+    if dset_name in h5_group.keys():
+        h5_stats = h5_group[dset_name]
+        offset = h5_stats.shape[0]
+        h5_stats.resize((offset + stats.size,))
+        if h5_stats.dtype != stats.dtype:
+            # Written by an earlier version that recorded different statistics
+            prev_stats = np.zeros(stats.size, dtype=h5_stats.dtype)
+            for name in h5_stats.dtype.names:
+                if name in stats.dtype.names:
+                    prev_stats[name] = stats[name]
+            stats = prev_stats
+    else:
+        h5_stats = h5_group.create_dataset(dset_name, shape=(stats.size,),
+                                           maxshape=(None,),
+                                           dtype=BATCH_STATS_FIELDS)
+        offset = 0
+    if stats.size > 0 and (comm is None or comm.Get_rank() == 0):
+        h5_stats[offset:] = stats
+    return h5_stats
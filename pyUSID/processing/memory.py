@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+"""
+Utilities for estimating the memory needed to compute each position in a
+:class:`~pyUSID.processing.process.Process`
+
+Created on Sun Oct 18 2026
+
+@author: Suhas Somnath, Chris Smith
+"""
+
+from __future__ import division, print_function, unicode_literals, \
+    absolute_import
+import tracemalloc
+import numpy as np
+import h5py
+
+__all__ = ['PeakMemory', 'get_results_bytes_per_pos', 'get_max_positions']
+
+
+class PeakMemory(object):
+    """
+    Context manager that measures the peak memory allocated by Python and
+    numpy within its block via :mod:`tracemalloc`. Memory allocated by
+    extensions that bypass the Python allocators is not accounted for
+    """
+
+    def __init__(self):
+        self.peak_bytes = 0
+        self.__started = False
+        self.__baseline = 0
+
+    def __enter__(self):
+        if tracemalloc.is_tracing():
+            if hasattr(tracemalloc, 'reset_peak'):
+                tracemalloc.reset_peak()
+        else:
+            tracemalloc.start()
+            self.__started = True
+        self.__baseline = tracemalloc.get_traced_memory()[0]
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        # Without reset_peak(), an earlier peak of a trace that was already running makes this an overestimate
+        self.peak_bytes = max(0, tracemalloc.get_traced_memory()[1] - self.__baseline)
+        if self.__started:
+            tracemalloc.stop()
+            self.__started = False
+        return False
+
+
+def get_results_bytes_per_pos(h5_dsets):
+    """
+    Returns the number of bytes of results written for each position
+
+    Parameters
+    ----------
+    h5_dsets : list of :class:`h5py.Dataset`
+        Results datasets with one row per position
+
+    Returns
+    -------
+    nbytes : uint
+        Bytes per position across all datasets
+    """
+    nbytes = 0
+    for h5_dset in h5_dsets:
+        if not isinstance(h5_dset, h5py.Dataset):
+            raise TypeError('h5_dsets should be a list of h5py.Dataset objects')
+        nbytes += int(np.prod(h5_dset.shape[1:])) * h5_dset.dtype.itemsize
+    return nbytes
+
+
+def get_max_positions(mem_bytes, bytes_per_pos, fixed_bytes=0):
+    """
+    Returns the number of positions that fit within the memory budget
+
+    Parameters
+    ----------
+    mem_bytes : uint
+        Memory budget in bytes
+    bytes_per_pos : uint
+        Bytes needed for each position
+    fixed_bytes : uint, optional. Default = 0
+        Bytes needed regardless of the number of positions, such as the
+        intermediates of a map function applied to one position at a time
+
+    Returns
+    -------
+    max_pos : uint
+        Maximum number of positions. At least 1
+    """
+    if bytes_per_pos <= 0:
+        raise ValueError('bytes_per_pos should be a positive number')
+    return max(1, int(np.floor((mem_bytes - fixed_bytes) / bytes_per_pos)))
@@ -9,27 +9,94 @@ Created on 7/17/16 10:08 AM
 
 from __future__ import division, unicode_literals, print_function, \
     absolute_import
+import sys
+import copy
+import inspect
+from math import gcd
 import numpy as np
 import psutil
 import time as tm
 import h5py
+import joblib
+import dask.array as da
 from warnings import warn
 from numbers import Number
 from multiprocessing import cpu_count
+from concurrent.futures import ThreadPoolExecutor
 
 from sidpy.proc.comp_utils import parallel_compute, get_MPI, \
     group_ranks_by_socket, get_available_memory
-from sidpy.base.num_utils import integers_to_slices
 from sidpy.base.string_utils import validate_single_string_arg, format_time, \
     format_size
 from sidpy.hdf.hdf_utils import write_simple_attrs, lazy_load_array
 
-from ..io.hdf_utils import check_if_main, check_for_old
+from ..io.hdf_utils import check_if_main, check_for_old, register_results_group, get_contiguous_slices
 from ..io.usi_data import USIDataset
+from .workers import WorkerPool, SharedArray
+from .scheduler import SharedJobCounter, get_epochs_due
+from .checkpoint import CheckpointPolicy
+from .instrumentation import RSSMonitor, new_batch_record, write_batch_stats
+from .sharding import ResultShard, get_per_position_dset_names, merge_shards
+from .status import StatusTracker, TIMED_OUT
+from .timeouts import HAS_TIMERS, TimeLimitedFunction, TimedOut
+from .chunk_cache import get_chunk_cache_settings, get_chunk_cache, get_chunk_rows, get_chunks_per_row
+from .dask_engine import build_result_blocks, stream_blocks
+from .memory import PeakMemory, get_results_bytes_per_pos, get_max_positions
 
 # TODO: internalize as many attributes as possible. Expose only those that will be required by the user
 
 
+def _get_chunk_grid(chunk_rows, max_rows):
+    """
+    Returns the number of positions that batches should be multiples of in
+    order to not split the chunks of any of the datasets
+
+    Parameters
+    ----------
+    chunk_rows : list of uint
+        Number of positions per chunk of each dataset in decreasing order of
+        priority
+    max_rows : uint
+        Maximum number of positions per batch
+
+    Returns
+    -------
+    grid : uint
+        Least common multiple of the number of positions per chunk of as many
+        datasets as possible without exceeding ``max_rows``
+    """
+    grid = 1
+    for rows in chunk_rows:
+        candidate = grid * int(rows) // gcd(grid, int(rows))
+        if candidate <= max_rows:
+            grid = candidate
+    return grid
+
+
+def _get_nbytes(obj):
+    """
+    Estimates the number of bytes occupied by the provided object, such as
+    the results of a computation
+
+    Parameters
+    ----------
+    obj : object
+        Array, list / tuple of arrays, number, or any other object
+
+    Returns
+    -------
+    nbytes : uint
+        Approximate size of the object in bytes
+    """
+    if isinstance(obj, (list, tuple)):
+        return sum([_get_nbytes(item) for item in obj])
+    if hasattr(obj, 'nbytes'):
+        return int(obj.nbytes)
+    if isinstance(obj, Number):
+        return np.asarray(obj).nbytes
+    return sys.getsizeof(obj)
+
+
 class Process(object):
     """
     An abstract class for formulating scientific problems as computational problems. This class handles the tedious,
@@ -39,7 +106,12 @@ class Process(object):
 
     def __init__(self, h5_main, process_name, parms_dict=None, cores=None,
                  max_mem_mb=4*1024, mem_multiplier=1.0, lazy=False,
-                 h5_target_group=None, verbose=False):
+                 h5_target_group=None, verbose=False, pipelined=False,
+                 backend='joblib', scheduler='static',
+                 checkpoint_interval=None, checkpoint_policy=None,
+                 instrument=False, save_stats=False, shard_results=False,
+                 merge_shards='virtual', pixel_timeout=None,
+                 retry_timeout=None, dask_client=None, dry_run=False):
         """
         Parameters
         ----------
@@ -60,7 +132,11 @@ class Process(object):
             for the source dataset. A value greater than 1 would account for
             the size of results datasets as well. For example, if the result
             dataset is the same size and precision as the source dataset,
-            the multiplier will be 2 (1 for source, 1 for result)
+            the multiplier will be 2 (1 for source, 1 for result).
+            Once the results datasets are created, compute() replaces this
+            estimate with the sizes of the source and results datasets and
+            the memory measured while computing a few positions. A value
+            greater than 1 then serves as a lower bound for this estimate
         lazy : bool, optional. Default = False
             If True, read_data_chunk and write_results_chunk will operate on
             dask arrays. If False - everything will be in numpy.
@@ -71,6 +147,155 @@ class Process(object):
             parent group containing `h5_main`
         verbose : bool, Optional, default = False
             Whether or not to print debugging statements
+        pipelined : bool, optional. Default = False
+            If True, the data for the next batch of positions will be read
+            on a background I/O thread while the current batch is being
+            computed and the results of the previous batch will be written
+            via a write-behind queue on the same thread. The number of
+            positions per batch is reduced such that the (up to) three
+            batches in flight together stay within the memory budget.
+            Note that :meth:`_write_results_chunk` will be called on a
+            shallow copy of this object in this mode and should therefore
+            only write to the HDF5 file
+        backend : str, optional. Default = 'joblib'
+            How :meth:`_unit_computation` maps :meth:`_map_function` to the
+            positions in each batch. Options are:
+
+            * 'joblib' - a fresh pool of workers is started for every batch
+              via :func:`sidpy.proc.comp_utils.parallel_compute`
+            * 'pool' - a single :class:`~pyUSID.processing.workers.WorkerPool`
+              is kept alive for the entire call to :meth:`compute`. The map
+              function and its arguments are sent to the workers only once.
+              Recommended when the dataset is processed in many small batches
+            * 'shared' - like 'pool' but the data for each batch is read
+              directly into shared memory and the workers write their results
+              into a preallocated shared array. Only ranges of positions are
+              sent to the workers, so nothing is pickled per position. The
+              results returned by the map function for each position must be
+              numbers or arrays of a fixed shape. ``self._results`` will be a
+              :class:`numpy.ndarray` with one row per position
+            * 'threads' - the map function is applied to the positions in each
+              batch by a pool of threads within this process. Nothing is
+              pickled or copied and the batch is shared by all threads, so the
+              memory budget is not divided among the cores. Recommended when
+              the map function spends most of its time in calls that release
+              the GIL such as NumPy / SciPy FFTs or linear algebra
+            * 'dask' - all batches are computed as a single Dask graph that
+              reads the source dataset via
+              :func:`sidpy.hdf.hdf_utils.lazy_load_array` and applies the map
+              function (batched if implemented) to each batch. The graph is
+              computed by Dask's threaded scheduler with ``cores`` threads
+              unless ``dask_client`` is provided. The results of each batch
+              are written to the results datasets with the usual bookkeeping
+              as soon as they are available. :meth:`_unit_computation` is not
+              used. Not available in the MPI context
+        scheduler : str, optional. Default = 'static'
+            How the remaining positions are distributed among MPI ranks.
+            Ignored when not operating in an MPI context. Options are:
+
+            * 'static' - each rank is assigned an equal, contiguous range of
+              positions before the computation starts
+            * 'dynamic' - ranks claim one batch at a time from a queue shared
+              by all ranks (via a :class:`~pyUSID.processing.scheduler.SharedJobCounter`)
+              until no positions remain. Recommended when the computational
+              cost varies across positions or ranks run on unequal hardware.
+              Since ranks compute different numbers of batches, the queue is
+              divided into epochs of (number of ranks) x (batches per
+              checkpoint of ``checkpoint_policy``) batches and all ranks
+              checkpoint together once every rank has moved past an epoch
+        checkpoint_interval : float, optional. Default = None
+            Desired time in seconds between successive checkpoints (batches
+            written to the file). If provided, the number of positions per
+            batch is adapted after every batch using the measured time taken
+            to compute and write each position and the measured size of the
+            results per position such that a batch takes roughly this long.
+            The number of positions per batch never exceeds what fits within
+            the memory budget. By default, batches are sized by memory alone.
+            Under MPI, ranks adapt their batches independently and therefore
+            cannot checkpoint together after each batch. Use the 'dynamic'
+            scheduler to checkpoint at the epochs of the shared queue.
+            Otherwise, results are only flushed once all ranks have finished
+        checkpoint_policy : :class:`~pyUSID.processing.checkpoint.CheckpointPolicy`, optional
+            Decides when the results written so far are flushed to the file.
+            Positions are marked as completed in the status dataset only once
+            their results have been flushed. By default, the file is flushed
+            after every batch. Under MPI, policies based on time or signals
+            are only applied once all ranks have finished computing
+        instrument : bool, optional. Default = False
+            If True, statistics such as the number of bytes read and the time
+            spent reading, computing, writing and flushing as well as the
+            peak memory usage are recorded for each batch in
+            ``self.batch_stats``. See
+            :data:`~pyUSID.processing.instrumentation.BATCH_STATS_FIELDS`.
+            In the pipelined mode, read and write times are those spent on the
+            background I/O thread
+        save_stats : bool, optional. Default = False
+            If True (and ``instrument`` is True), the statistics of all batches
+            (across all ranks) are appended to a dataset named 'Batch_Stats'
+            within the results group once the computation has finished
+        shard_results : bool, optional. Default = False
+            If True, each MPI rank writes its results into its own compressed
+            HDF5 file (shard) placed next to the file containing the results
+            group instead of writing into the results datasets directly.
+            Writing is thus independent of other ranks and the results can be
+            compressed, which is not possible with parallel HDF5. All
+            :class:`h5py.Dataset` attributes of this object that point to
+            datasets with one row per position in the results group are
+            pointed to the corresponding datasets in the shard while
+            computing. The index of the shard holding each position is
+            recorded in a dataset named 'shard_index' within the results
+            group. Once all positions have been computed, the shards are
+            merged into the results group as specified by ``merge_shards``
+        merge_shards : str, optional. Default = 'virtual'
+            How shards are merged into the results group. Options are:
+
+            * 'virtual' - the results datasets are replaced by HDF5 virtual
+              datasets that read from the compressed shards. The shard files
+              must be kept alongside the file containing the results
+            * 'copy' - the results are copied into the results datasets and
+              the shards are deleted
+        pixel_timeout : float, optional. Default = None
+            Time budget in seconds for computing any single position via
+            :meth:`~pyUSID.processing.process.Process._map_function`.
+            Positions exceeding this budget are interrupted, marked with a
+            value of 2 in the status dataset and left out of the batch so that
+            a few pathological positions do not stall the computation. These
+            positions are retried in a separate pass once all other positions
+            have been computed. :meth:`_write_results_chunk` should then
+            write to the positions returned by
+            :meth:`_get_pixels_in_current_batch`, which excludes positions that
+            timed out. Positions are interrupted via the SIGALRM signal, so
+            this is not available on platforms without interval timers
+            (Windows) and :meth:`compute` must be called from the main thread
+            when computing serially. Not available with the 'threads' and
+            'shared' backends and ignored if :meth:`_map_batch` is implemented.
+            By default, positions are not timed
+        retry_timeout : float, optional. Default = None
+            Time budget in seconds for each position in the pass that retries
+            positions that timed out. Positions that time out again remain
+            marked as such and the results group remains partially computed
+            so that they can be retried later. By default, the retried
+            positions are computed without any time limit. Ignored if
+            ``pixel_timeout`` is not provided
+        dask_client : :class:`dask.distributed.Client`, optional
+            Client connected to the Dask scheduler (possibly spanning several
+            nodes, see :func:`~pyUSID.processing.dask_engine.get_local_client`)
+            that will compute the batches when using the 'dask' backend. Each
+            task opens the file containing the source dataset by its path, so
+            the workers must be able to read the file while this process has
+            it open, which may require disabling HDF5 file locking
+            (HDF5_USE_FILE_LOCKING=FALSE). :meth:`_map_function` (or
+            :meth:`_map_batch`) must be a staticmethod
+        dry_run : bool, optional. Default = False
+            If True, :meth:`compute` computes a few positions via
+            :meth:`_estimate_compute_time_per_pixel` before sizing the
+            batches so that the peak memory allocated per position (e.g.
+            intermediates) is accounted for. Always done if
+            ``checkpoint_interval`` is provided since the time per position
+            is then needed. Skipped if neither :meth:`_map_function` nor
+            :meth:`_map_batch` nor :meth:`_estimate_compute_time_per_pixel`
+            is implemented, such as when only :meth:`_unit_computation` is
+            overridden
 
         Attributes
         ----------
@@ -111,7 +336,23 @@ class Process(object):
             Whether or not this (child) class has implemented the
             self._get_existing_datasets() function
         self.__bytes_per_pos : uint
-            Number of bytes used by one position of the source dataset
+            Number of bytes used by one position of the source dataset, and,
+            once compute() has begun, its results and intermediates
+        self.__mem_multiplier : float
+            Lower bound on the bytes per position relative to the source
+            dataset, as provided by the user
+        self.__fixed_bytes : uint
+            Bytes needed by each worker regardless of the number of positions
+            in the batch, such as the intermediates of _map_function
+        self.__auto_max_pos : uint
+            Value of self._max_pos_per_read last set from the memory model.
+            Any other value was set by the user and is only ever lowered
+        self.__dry_run : tuple
+            Peak bytes allocated and number of positions computed by the last
+            call to _estimate_compute_time_per_pixel(). None if not measured
+        self.__dry_run_requested : bool
+            Whether or not compute() should measure a few positions even
+            without a checkpoint interval
         self.mpi_comm : :class:`mpi4py.MPI.COMM_WORLD`
             MPI communicator. None if not running in an MPI context
         self.mpi_rank: uint
@@ -138,6 +379,101 @@ class Process(object):
             positions.
         self.__pixels_in_batch : array-like
             The positions being computed on by the current compute worker
+        self.__pipelined : bool
+            Whether or not reading, computing and writing are overlapped
+        self.__io_pool : :class:`concurrent.futures.ThreadPoolExecutor`
+            Single background thread that performs all HDF5 reads and writes
+            when operating in the pipelined mode. None otherwise
+        self.__prefetched : tuple
+            Start and end indices (within self.__compute_jobs), the shared
+            memory buffer (if any) and the :class:`concurrent.futures.Future`
+            of the batch being prefetched
+        self.__pending_write : :class:`concurrent.futures.Future`
+            Write-behind task for the most recently computed batch
+        self.__backend : str
+            Backend used for mapping the map function to each batch
+        self.__worker_pool : :class:`~pyUSID.processing.workers.WorkerPool`
+            Pool of workers that persists across batches when using the
+            'pool' or 'shared' backends. None otherwise
+        self.__shared_inputs : list of :class:`~pyUSID.processing.workers.SharedArray`
+            Buffers in shared memory that the data for batches are read into
+            when using the 'shared' backend. Batches alternate between two
+            buffers in the pipelined mode
+        self.__data_buffer : :class:`~pyUSID.processing.workers.SharedArray`
+            Buffer holding the data for the current batch
+        self.__shared_output : :class:`~pyUSID.processing.workers.SharedArray`
+            Buffer in shared memory that the workers write results into
+        self.__num_batches_read : uint
+            Number of batches read thus far in this call to compute()
+        self.__scheduler : str
+            How positions are distributed among MPI ranks
+        self.__job_counter : :class:`~pyUSID.processing.scheduler.SharedJobCounter`
+            Counter shared by all ranks from which batches are claimed when
+            using the 'dynamic' scheduler. None otherwise
+        self.__epoch_size : uint
+            Number of positions in the shared queue between collective
+            checkpoints when using the 'dynamic' scheduler. None otherwise
+        self.__epochs_flushed : uint
+            Number of collective checkpoints made at the end of epochs
+        self.__checkpoint_interval : float
+            Desired time in seconds between successive checkpoints. None if
+            batches are sized by memory alone
+        self.__max_mem_per_worker : float
+            Number of bytes of memory available to each worker
+        self.__checkpoint_policy : :class:`~pyUSID.processing.checkpoint.CheckpointPolicy`
+            Decides when the results written so far are flushed to the file
+        self.__unflushed_pixels : list
+            Positions in each batch that have been written to the file since
+            the last checkpoint but are not yet marked as completed
+        self.batch_stats : list
+            Statistics recorded for each batch computed by this rank in the
+            most recent call to compute(). Each record is a dictionary, so
+            the list can be passed directly to :class:`pandas.DataFrame`
+        self.__instrument : bool
+            Whether or not statistics are recorded for each batch
+        self.__save_stats : bool
+            Whether or not to write the statistics to the results group
+        self.__batch_record : dict
+            Statistics for the current batch
+        self.__rss_monitor : :class:`~pyUSID.processing.instrumentation.RSSMonitor`
+            Samples the memory used while each batch is computed. None
+            unless ``instrument`` is True
+        self.__shard_results : bool
+            Whether or not results are written to a shard per rank
+        self.__merge_mode : str
+            How shards are merged into the results group
+        self.__shard : :class:`~pyUSID.processing.sharding.ResultShard`
+            Shard that this rank writes results into. None if not sharding
+        self.__sharded_attrs : dict
+            Datasets in the results group and their names, keyed by the names
+            of the attributes of this object that pointed to them before
+            being pointed to the datasets in the shard
+        self.__h5_shard_index : :class:`h5py.Dataset`
+            Index of the shard holding the results for each position
+        self.__status_tracker : :class:`~pyUSID.processing.status.StatusTracker`
+            Ranges of positions that have been computed. Kept in sync with the
+            status dataset and persisted alongside it
+        self.__pos_per_chunk : uint
+            Number of positions that batches and the ranges of positions per
+            rank are aligned to such that chunks of the source and results
+            datasets are not split between batches
+        self.__prev_chunk_rows : :class:`numpy.ndarray`
+            Indices of the rows of chunks of the source dataset read by the
+            previous batch
+        self.__pixel_timeout : float
+            Time budget for computing any single position
+        self.__retry_timeout : float
+            Time budget for any single position when retrying positions that
+            timed out
+        self.__active_timeout : float
+            Time budget that currently applies. Differs from the time budget
+            per position while retrying positions that timed out
+        self.__timed_out_tracker : :class:`~pyUSID.processing.status.StatusTracker`
+            Ranges of positions whose computation timed out
+        self.__retrying : bool
+            Whether or not positions that timed out are being retried
+        self.__dask_client : :class:`dask.distributed.Client`
+            Client for the Dask scheduler provided by the user
         """
 
         if h5_main.file.mode != 'r+':
@@ -235,6 +571,14 @@ class Process(object):
         self.__socket_master_rank = 0
         self._max_pos_per_read = None
         self.__bytes_per_pos = None
+        self.__max_mem_per_worker = None
+        self.__mem_multiplier = 1.0
+        self.__fixed_bytes = 0
+        self.__auto_max_pos = None
+        self.__dry_run = None
+        if not isinstance(dry_run, bool):
+            raise TypeError('dry_run should be a bool')
+        self.__dry_run_requested = dry_run
 
         # Now have to be careful here since the below properties are a function of the MPI rank
         self.__start_pos = None
@@ -243,6 +587,110 @@ class Process(object):
         self.__pixels_in_batch = None
         self.__compute_jobs = None
 
+        if not isinstance(pipelined, bool):
+            raise TypeError('pipelined should be a bool')
+        self.__pipelined = pipelined
+        self.__io_pool = None
+        self.__prefetched = None
+        self.__pending_write = None
+
+        backend = validate_single_string_arg(backend, 'backend')
+        if backend not in ['joblib', 'pool', 'shared', 'threads', 'dask']:
+            raise ValueError("backend should be one of: 'joblib', 'pool', 'shared', 'threads', 'dask'. "
+                             "Provided value: {}".format(backend))
+        if backend == 'dask' and self.mpi_comm is not None:
+            raise ValueError("The 'dask' backend cannot be used in the MPI context")
+        if dask_client is not None:
+            if backend != 'dask':
+                raise ValueError("dask_client can only be used with the 'dask' backend")
+            if not hasattr(dask_client, 'compute'):
+                raise TypeError('dask_client should be a dask.distributed.Client object')
+            map_name = '_map_batch' if self._map_batch_implemented() else '_map_function'
+            if not isinstance(inspect.getattr_static(type(self), map_name), staticmethod):
+                raise TypeError('{} should be a staticmethod so that it can be sent to the workers of dask_client '
+                                'without the HDF5 datasets held by this object'.format(map_name))
+        self.__backend = backend
+        self.__dask_client = dask_client
+        self.__worker_pool = None
+        self.__shared_inputs = []
+        self.__data_buffer = None
+        self.__shared_output = None
+        self.__num_batches_read = 0
+
+        scheduler = validate_single_string_arg(scheduler, 'scheduler')
+        if scheduler not in ['static', 'dynamic']:
+            raise ValueError("scheduler should be one of: 'static', 'dynamic'. "
+                             "Provided value: {}".format(scheduler))
+        self.__scheduler = scheduler
+        self.__job_counter = None
+        self.__epoch_size = None
+        self.__epochs_flushed = 0
+
+        if checkpoint_interval is not None:
+            if not isinstance(checkpoint_interval, Number) or isinstance(checkpoint_interval, bool):
+                raise TypeError('checkpoint_interval should be a number')
+            if checkpoint_interval <= 0:
+                raise ValueError('checkpoint_interval should be a positive number of seconds')
+            checkpoint_interval = float(checkpoint_interval)
+        self.__checkpoint_interval = checkpoint_interval
+        if checkpoint_interval is not None and self.mpi_comm is not None and scheduler == 'static':
+            warn('Ranks adapting their batches to checkpoint_interval cannot checkpoint together with the static '
+                 'scheduler. Results will only be flushed once all ranks have finished. Use scheduler="dynamic" '
+                 'to checkpoint periodically')
+
+        if checkpoint_policy is None:
+            checkpoint_policy = CheckpointPolicy()
+        elif not isinstance(checkpoint_policy, CheckpointPolicy):
+            raise TypeError('checkpoint_policy should be a CheckpointPolicy object')
+        self.__checkpoint_policy = checkpoint_policy
+        # Shared with the copies that write batches in the pipelined mode. Only modify in place
+        self.__unflushed_pixels = []
+
+        for arg_val, arg_name in zip([instrument, save_stats], ['instrument', 'save_stats']):
+            if not isinstance(arg_val, bool):
+                raise TypeError('{} should be a bool'.format(arg_name))
+        self.__instrument = instrument
+        self.__save_stats = save_stats
+        self.batch_stats = []
+        # Statistics are always gathered since this is cheap but only retained if requested
+        self.__batch_record = new_batch_record()
+        self.__rss_monitor = RSSMonitor() if instrument else None
+
+        if not isinstance(shard_results, bool):
+            raise TypeError('shard_results should be a bool')
+        merge_shards = validate_single_string_arg(merge_shards, 'merge_shards')
+        if merge_shards not in ['virtual', 'copy']:
+            raise ValueError("merge_shards should be one of: 'virtual', 'copy'. "
+                             "Provided value: {}".format(merge_shards))
+        self.__shard_results = shard_results
+        self.__merge_mode = merge_shards
+        self.__shard = None
+        self.__sharded_attrs = dict()
+        self.__h5_shard_index = None
+        self.__status_tracker = None
+        self.__pos_per_chunk = 1
+        self.__prev_chunk_rows = np.zeros(0, dtype=np.int64)
+
+        for arg_val, arg_name in zip([pixel_timeout, retry_timeout], ['pixel_timeout', 'retry_timeout']):
+            if arg_val is None:
+                continue
+            if not isinstance(arg_val, Number) or isinstance(arg_val, bool):
+                raise TypeError('{} should be a number'.format(arg_name))
+            if arg_val <= 0:
+                raise ValueError('{} should be a positive number of seconds'.format(arg_name))
+        if pixel_timeout is not None and backend in ['threads', 'shared', 'dask']:
+            raise ValueError("pixel_timeout is not supported by the '{}' backend".format(backend))
+        if pixel_timeout is not None and not HAS_TIMERS:
+            raise NotImplementedError('pixel_timeout requires interval timers, which are not available on this '
+                                      'platform')
+        self.__pixel_timeout = pixel_timeout
+        self.__retry_timeout = retry_timeout
+        self.__active_timeout = pixel_timeout
+        self.__timed_out_tracker = None
+        self.__retrying = False
+        if pixel_timeout is not None and self._map_batch_implemented():
+            warn('pixel_timeout is ignored since positions are computed in batches via _map_batch()')
+
         # Determining the max size of the data that can be put into memory
         # all ranks go through this and they need to have this value any
         self._set_memory_and_cores(cores=cores, man_mem_limit=max_mem_mb,
@@ -290,7 +738,11 @@ class Process(object):
         Sets the start and end indices for each MPI rank
         """
         # First figure out what positions need to be computed
-        self.__compute_jobs = np.where(self._h5_status_dset[()] == 0)[0]
+        if self.__pixel_timeout is None:
+            self.__compute_jobs = self.__status_tracker.remaining()
+        else:
+            # Positions that timed out are retried after all others have been computed
+            self.__compute_jobs = self.__status_tracker.remaining(exclude=self.__timed_out_tracker)
         if self.verbose and self.mpi_rank == 0:
             if len(self.__compute_jobs) > 100:
                 print('Among the {} positions in this dataset, {} positions '
@@ -301,6 +753,19 @@ class Process(object):
                 print('Among the {} positions in this dataset, the following '
                       'positions need to be computed: {}'
                       '.'.format(self.h5_main.shape[0], self.__compute_jobs))
+        self.__set_chunk_grid()
+        self.__check_chunk_caches()
+
+        if self.mpi_comm is not None and self.__scheduler == 'dynamic':
+            # Every rank may claim any batch. Batches are claimed via the shared counter as and when needed
+            self.__job_counter = SharedJobCounter(self.mpi_comm)
+            self.__start_pos = 0
+            self.__end_pos = 0
+            self.__rank_end_pos = self.__compute_jobs.size
+            if self.verbose and self.mpi_rank == 0:
+                print('Ranks will dynamically claim batches of the {} (remaining) positions in this dataset'
+                      '.'.format(self.__compute_jobs.size))
+            return
 
         # integer division
         pos_per_rank = self.__compute_jobs.size // self.mpi_size
@@ -311,10 +776,15 @@ class Process(object):
         # The start and end indices now correspond to the indices in the incomplete jobs rather than the h5 dataset
         self.__start_pos = self.mpi_rank * pos_per_rank
         self.__rank_end_pos = (self.mpi_rank + 1) * pos_per_rank
-        self.__end_pos = int(min(self.__rank_end_pos, self.__start_pos + self._max_pos_per_read))
         if self.mpi_rank == self.mpi_size - 1:
             # Force the last rank to go to the end of the dataset
             self.__rank_end_pos = self.__compute_jobs.size
+        elif self.__pos_per_chunk <= pos_per_rank:
+            # Ranks should not share chunks. Only the end is snapped here since the previous rank snaps the start
+            self.__rank_end_pos = self.__snap_to_chunks(self.__rank_end_pos)
+        if self.mpi_rank > 0 and self.__pos_per_chunk <= pos_per_rank:
+            self.__start_pos = self.__snap_to_chunks(self.__start_pos)
+        self.__end_pos = int(min(self.__rank_end_pos, self.__start_pos + self._max_pos_per_read))
 
         if self.verbose:
             print('Rank {} will read positions {} to {} of {}'.format(self.mpi_rank, self.__start_pos,
@@ -330,11 +800,20 @@ class Process(object):
         -------
 
         """
-        chosen_pos = np.random.randint(0, high=self.h5_main.shape[0]-1, size=5)
-        t0 = tm.time()
-        _ = parallel_compute(self.h5_main[chosen_pos, :], self._map_function, cores=1,
-                             lengthy_computation=False, func_args=args, func_kwargs=kwargs, verbose=False)
-        return (tm.time() - t0) / len(chosen_pos)
+        # h5py requires the positions to be unique and sorted
+        chosen_pos = np.unique(np.random.randint(0, high=self.h5_main.shape[0]-1, size=5))
+        data = self.h5_main[chosen_pos, :]
+        # The peak memory also feeds the memory model used to size batches
+        with PeakMemory() as peak:
+            t0 = tm.time()
+            if self._map_batch_implemented():
+                _ = self._map_batch(data, *args, **kwargs)
+            else:
+                _ = parallel_compute(data, self._map_function, cores=1,
+                                     lengthy_computation=False, func_args=args, func_kwargs=kwargs, verbose=False)
+            t_elapsed = tm.time() - t0
+        self.__dry_run = (peak.peak_bytes, len(chosen_pos))
+        return t_elapsed / len(chosen_pos)
 
     def _get_pixels_in_current_batch(self):
         """
@@ -347,6 +826,38 @@ class Process(object):
         """
         return self.__pixels_in_batch
 
+    def _write_to_positions(self, h5_dset, values, positions=None):
+        """
+        Writes the provided values into the rows of the dataset corresponding to the provided positions. Runs of
+        consecutive positions are written as contiguous slices rather than slow point selections. Use this function
+        within :meth:`~pyUSID.processing.process.Process._write_results_chunk`
+
+        Parameters
+        ----------
+        h5_dset : :class:`h5py.Dataset`
+            Dataset with one row per position in the source dataset
+        values : array-like
+            Values with one entry per position along the first axis. These will be reshaped to the shape of the rows
+            in `h5_dset` if necessary
+        positions : array-like, optional
+            Sorted indices of the positions to write into. Default - positions in the current batch
+        """
+        if not isinstance(h5_dset, h5py.Dataset):
+            raise TypeError('h5_dset should be a h5py.Dataset object')
+        if positions is None:
+            positions = self._get_pixels_in_current_batch()
+        positions = np.asarray(positions)
+        values = np.asarray(values)
+        if values.shape[0] != positions.size:
+            raise ValueError('Provided {} values for {} positions'.format(values.shape[0], positions.size))
+        values = values.reshape((positions.size,) + tuple(h5_dset.shape[1:]))
+
+        offset = 0
+        for curr_slice in get_contiguous_slices(positions):
+            num_pos = curr_slice.stop - curr_slice.start
+            h5_dset[curr_slice] = values[offset: offset + num_pos]
+            offset += num_pos
+
     def test(self, **kwargs):
         """
         Tests the process on a subset (for example a pixel) of the whole data. The class can be re-instantiated with
@@ -421,7 +932,7 @@ class Process(object):
 
                 # ##### ACTUAL COMPLETENESS TEST HERE #########
 
-                completed_positions = np.sum(status_dset[()])
+                completed_positions = StatusTracker.load(status_dset).num_completed
 
                 if self.verbose and self.mpi_rank == 0:
                     print('{} has results that are {} % complete'
@@ -644,12 +1155,16 @@ class Process(object):
         # Remember that multiple processes (either via MPI or joblib) will share this socket
         # This makes logical sense but there's always too much free memory and the
         # cores are starved.
-        max_mem_per_worker = max_mem_bytes / (self._cores * self.__ranks_on_socket)
+        num_workers = self._cores * self.__ranks_on_socket
+        if self.__backend == 'threads':
+            # Threads work on the same batch in the memory of this rank
+            num_workers = self.__ranks_on_socket
+        max_mem_per_worker = max_mem_bytes / num_workers
+        self.__max_mem_per_worker = max_mem_per_worker
         if self.verbose and self.mpi_rank == self.__socket_master_rank:
             print('Rank {}: Each of the {} workers on this socket are allowed '
                   'to use {} of RAM'
-                  '.'.format(self.mpi_rank,
-                             self._cores * self.__ranks_on_socket,
+                  '.'.format(self.mpi_rank, num_workers,
                              format_size(max_mem_per_worker)))
 
         # Now calculate the number of positions OF RAW DATA ONLY that can be
@@ -661,11 +1176,14 @@ class Process(object):
         # Now multiply this with a factor that takes into account the expected
         # sizes of the results (Final and intermediate) datasets.
         self.__bytes_per_pos *= mem_multiplier
+        self.__mem_multiplier = mem_multiplier
+        self.__fixed_bytes = 0
         if self.verbose and self.mpi_rank == 0 and mem_multiplier > 1:
             print('Each position of the source and results dataset(s) is {} '
                   'large.'.format(format_size(self.__bytes_per_pos)))
 
         self._max_pos_per_read = int(np.floor(max_mem_per_worker / self.__bytes_per_pos))
+        self.__auto_max_pos = self._max_pos_per_read
 
         if self.verbose and self.mpi_rank == self.__socket_master_rank:
             title = 'SOURCE dataset only'
@@ -694,13 +1212,544 @@ class Process(object):
         """
         raise NotImplementedError('Please override the _unit_function specific to your process')
 
+    @staticmethod
+    def _map_batch(*args, **kwargs):
+        """
+        The function that manipulates the data for several positions at once. Implement this function instead of
+        :meth:`~pyUSID.processing.process.Process._map_function` when the computation per position is only a few
+        vectorizable numpy operations so that the overhead of calling a python function per position is avoided.
+        If implemented, this function is used by :meth:`~pyUSID.processing.process.Process._unit_computation`
+        instead of :meth:`~pyUSID.processing.process.Process._map_function`. The data for the current batch is split
+        into one contiguous block per CPU core.
+
+        Parameters
+        ----------
+        args : list
+            arguments to the function in the correct order. The first argument is a 2D array with one row of data
+            per position
+        kwargs : dict
+            keyword arguments to the function
+
+        Returns
+        -------
+        array-like
+            Results with one entry per position (row) along the first axis
+        """
+        raise NotImplementedError('Please override the _map_batch specific to your process')
+
+    def _map_batch_implemented(self):
+        """
+        Checks whether this (child) class has implemented
+        :meth:`~pyUSID.processing.process.Process._map_batch`
+
+        Returns
+        -------
+        bool
+            Whether or not the batched map function should be used
+        """
+        return getattr(type(self), '_map_batch') is not Process._map_batch
+
+    def __get_batch_size(self):
+        """
+        Returns the number of positions that should be computed per batch
+
+        Returns
+        -------
+        batch_size : uint
+            Maximum number of positions per batch
+        """
+        max_pos_per_read = self._max_pos_per_read
+        if self.__pipelined:
+            # Batches being written, computed, and prefetched share the budget
+            max_pos_per_read = max(1, max_pos_per_read // 3)
+        if max_pos_per_read >= self.__pos_per_chunk:
+            # Batches of whole chunks
+            max_pos_per_read -= max_pos_per_read % self.__pos_per_chunk
+        return int(max_pos_per_read)
+
+    def __set_chunk_grid(self):
+        """
+        Sets the number of positions that batches are aligned to based on the
+        chunks of the source dataset and those of the datasets that results
+        are written to. The source dataset takes priority if the chunks of all
+        datasets cannot be aligned within a single batch
+        """
+        h5_dsets = [self.h5_main] + self.__get_results_dsets()
+        chunk_rows = [h5_dset.chunks[0] for h5_dset in h5_dsets if h5_dset.chunks is not None]
+        self.__pos_per_chunk = 1
+        self.__pos_per_chunk = _get_chunk_grid(chunk_rows, self.__get_batch_size())
+        if self.verbose and self.mpi_rank == 0 and self.__pos_per_chunk > 1:
+            print('Batches will be aligned to chunks of {} positions'.format(self.__pos_per_chunk))
+
+    def __get_results_dsets(self):
+        """
+        Returns the datasets with one row per position that results are
+        written to
+
+        Returns
+        -------
+        h5_dsets : list of :class:`h5py.Dataset`
+            Datasets in the shard if sharding, in the results group otherwise
+        """
+        if self.__shard is not None:
+            return [self.__shard.datasets[name] for name in sorted(self.__shard.datasets.keys())]
+        if self.h5_results_grp is None:
+            return []
+        dset_names = get_per_position_dset_names(self.h5_results_grp, self.h5_main.shape[0],
+                                                 exclude=[self._status_dset_name, 'shard_index', 'Batch_Stats'])
+        return [self.h5_results_grp[name] for name in dset_names]
+
+    def __check_chunk_caches(self):
+        """
+        Compares the chunk cache that HDF5 uses for the source and results
+        datasets against the cache needed to hold all chunks touched by a
+        batch. HDF5 only applies chunk cache settings when a dataset is first
+        opened, so the settings of datasets that are already open cannot be
+        changed. The settings that would avoid decompressing (or compressing)
+        the same chunks repeatedly are reported instead
+
+        Returns
+        -------
+        deficits : dict
+            Recommended chunk cache settings keyed by the names of the
+            datasets whose chunk cache is too small
+        """
+        deficits = dict()
+        batch_size = self.__get_batch_size()
+        for h5_dset in [self.h5_main] + self.__get_results_dsets():
+            settings = get_chunk_cache_settings(h5_dset, batch_size, max_nbytes=self.__max_mem_per_worker)
+            if settings is None:
+                continue
+            current = get_chunk_cache(h5_dset)
+            if current['rdcc_nbytes'] < settings['rdcc_nbytes']:
+                deficits[h5_dset.name] = settings
+                if self.verbose and self.mpi_rank == 0:
+                    print('Chunk cache of {} ({}) cannot hold the chunks touched by each batch ({}). Chunks will be '
+                          'decompressed repeatedly. Open the file via h5py.File(..., rdcc_nbytes={}, '
+                          'rdcc_nslots={}, rdcc_w0={}) to avoid this'
+                          '.'.format(h5_dset.name, format_size(current['rdcc_nbytes']),
+                                     format_size(settings['rdcc_nbytes']), settings['rdcc_nbytes'],
+                                     settings['rdcc_nslots'], settings['rdcc_w0']))
+            elif self.verbose and self.mpi_rank == 0:
+                print('Chunk cache of {} ({}) can hold the chunks touched by each batch'
+                      '.'.format(h5_dset.name, format_size(current['rdcc_nbytes'])))
+        return deficits
+
+    def __snap_to_chunks(self, end_pos):
+        """
+        Moves the boundary between two batches (or ranks) back to the closest
+        boundary between chunks
+
+        Parameters
+        ----------
+        end_pos : uint
+            Index within self.__compute_jobs where the batch would end
+
+        Returns
+        -------
+        end_pos : uint
+            Index within self.__compute_jobs of the first position of the
+            chunk containing the position at ``end_pos``. ``end_pos`` is
+            returned unchanged if the chunk starts before this position's
+            batch (or range of positions)
+        """
+        if self.__pos_per_chunk <= 1 or end_pos <= 0 or end_pos >= self.__compute_jobs.size:
+            return end_pos
+        start_pos = max(0, end_pos - self.__pos_per_chunk)
+        chunk_ids = self.__compute_jobs[start_pos: end_pos + 1] // self.__pos_per_chunk
+        breaks = np.flatnonzero(np.diff(chunk_ids)) + 1
+        if breaks.size == 0:
+            return end_pos
+        return start_pos + int(breaks[-1])
+
+    def __get_max_pos_by_memory(self, results_bytes_per_pos=0):
+        """
+        Returns the number of positions whose source data and results fit
+        within the memory budget of each worker
+
+        Parameters
+        ----------
+        results_bytes_per_pos : uint, optional. Default = 0
+            Measured number of bytes of results per position
+
+        Returns
+        -------
+        max_pos : uint
+            Maximum number of positions per batch
+        """
+        raw_bytes_per_pos = self.h5_main.dtype.itemsize * self.h5_main.shape[1]
+        bytes_per_pos = max(self.__bytes_per_pos, raw_bytes_per_pos + results_bytes_per_pos)
+        return get_max_positions(self.__max_mem_per_worker, bytes_per_pos, fixed_bytes=self.__fixed_bytes)
+
+    def __apply_memory_model(self, *args, **kwargs):
+        """
+        Sizes the batches using the bytes per position of the source and
+        results datasets and the peak memory allocated while computing a few
+        positions via _estimate_compute_time_per_pixel()
+
+        Returns
+        -------
+        time_per_pos : float
+            Time in seconds taken to compute one position by a single worker.
+            None if the dry run was not performed
+        """
+        raw_bytes_per_pos = self.h5_main.dtype.itemsize * self.h5_main.shape[1]
+        results_bytes_per_pos = get_results_bytes_per_pos(self.__get_results_dsets())
+
+        time_per_pos = None
+        intermediate_bytes_per_pos = 0
+        fixed_bytes = 0
+        self.__dry_run = None
+        if self.h5_main.shape[0] > 1 and self.__should_dry_run():
+            time_per_pos = self._estimate_compute_time_per_pixel(*args, **kwargs)
+        if self.__dry_run is not None:
+            peak_bytes, num_pos = self.__dry_run
+            if self._map_batch_implemented():
+                # Intermediates of batched computations scale with the number of positions
+                intermediate_bytes_per_pos = peak_bytes / num_pos
+            else:
+                # Positions are computed one at a time so each worker only ever holds one set of intermediates
+                fixed_bytes = peak_bytes
+                if self.__backend == 'threads':
+                    fixed_bytes *= self._cores
+
+        bytes_per_pos = raw_bytes_per_pos + results_bytes_per_pos + intermediate_bytes_per_pos
+        if self.__mem_multiplier > 1:
+            bytes_per_pos = max(bytes_per_pos, raw_bytes_per_pos * self.__mem_multiplier)
+        self.__bytes_per_pos = bytes_per_pos
+        self.__fixed_bytes = fixed_bytes
+
+        max_pos = self.__get_max_pos_by_memory()
+        if self._max_pos_per_read != self.__auto_max_pos:
+            # Set by the user. Only lowered if it would exceed the memory budget
+            max_pos = min(self._max_pos_per_read, max_pos)
+        self._max_pos_per_read = max_pos
+        self.__auto_max_pos = max_pos
+
+        if self.verbose and self.mpi_rank == 0:
+            print('Each position needs {} for the source, {} for the results, and {} for intermediates. Each '
+                  'worker also needs {} regardless of batch size'
+                  '.'.format(format_size(raw_bytes_per_pos), format_size(results_bytes_per_pos),
+                             format_size(intermediate_bytes_per_pos), format_size(fixed_bytes)))
+            print('Rank {}: Workers will read up to {} positions per batch'
+                  '.'.format(self.mpi_rank, self._max_pos_per_read))
+        return time_per_pos
+
+    def __should_dry_run(self):
+        """
+        Checks whether a few positions should be computed before sizing the
+        batches. The dry run calls the map function, which may be expensive
+        or have side effects, so it is only performed if requested or needed
+        for the checkpoint interval and if the map function is implemented
+
+        Returns
+        -------
+        bool
+            Whether or not to call _estimate_compute_time_per_pixel()
+        """
+        if not self.__dry_run_requested and self.__checkpoint_interval is None:
+            return False
+        cls = type(self)
+        return self._map_batch_implemented() or cls._map_function is not Process._map_function or \
+            cls._estimate_compute_time_per_pixel is not Process._estimate_compute_time_per_pixel
+
+    def __adapt_batch_size(self, time_per_pos, results_bytes_per_pos):
+        """
+        Resizes the batches such that computing and writing a batch takes
+        about as long as the desired checkpoint interval without exceeding the
+        memory budget
+
+        Parameters
+        ----------
+        time_per_pos : float
+            Measured time in seconds taken to compute and write one position
+        results_bytes_per_pos : uint
+            Measured number of bytes of results per position
+        """
+        max_pos = self.__get_max_pos_by_memory(results_bytes_per_pos)
+        if self.__pipelined:
+            # __get_batch_size() will divide the budget among the batches in flight
+            max_pos *= 3
+        if time_per_pos > 0:
+            target_pos = int(np.ceil(self.__checkpoint_interval / time_per_pos))
+            if self.__pipelined:
+                target_pos *= 3
+            max_pos = min(max_pos, target_pos)
+        self._max_pos_per_read = max(1, max_pos)
+        if self.verbose:
+            print('Rank {} - will compute up to {} positions per batch to checkpoint every {}'
+                  '.'.format(self.mpi_rank, self.__get_batch_size(),
+                             format_time(self.__checkpoint_interval)))
+
+    def __checkpoints_per_batch(self):
+        """
+        Checks whether the checkpoint policy can be applied after every
+        batch. Flushing is a collective operation in MPI, so this is only
+        possible if all ranks compute the same number of batches and reach
+        checkpoints together
+
+        Returns
+        -------
+        bool
+            Whether or not checkpoints can be made in between batches
+        """
+        if self.mpi_comm is None:
+            return True
+        if self.__retrying:
+            # Ranks may retry different numbers of positions
+            return False
+        return self.__job_counter is None and self.__checkpoint_interval is None and \
+            self.__checkpoint_policy.is_collective
+
+    def __get_batch_start(self, start_pos):
+        """
+        Returns the index within self.__compute_jobs where the next batch for
+        this rank starts
+
+        Parameters
+        ----------
+        start_pos : uint
+            Index within self.__compute_jobs where the previous batch ended
+
+        Returns
+        -------
+        start_pos : uint
+            Index within self.__compute_jobs where the next batch starts. This
+            is beyond self.__rank_end_pos if no positions remain
+        """
+        if self.__job_counter is None:
+            return start_pos
+        # Claim the next batch from the queue shared by all ranks
+        start_pos = self.__job_counter.fetch_and_add(self.__get_batch_size())
+        self.__checkpoint_epochs(get_epochs_due(start_pos, self.__compute_jobs.size, self.__epoch_size))
+        return start_pos
+
+    def __set_epoch_size(self):
+        """
+        Sets the number of positions in the shared queue between collective
+        checkpoints when using the 'dynamic' scheduler. All ranks must call
+        this function since they need to agree on the size
+        """
+        self.__epochs_flushed = 0
+        if self.__job_counter is None:
+            self.__epoch_size = None
+            return
+        batches = self.__checkpoint_policy.batches
+        batches = 1 if batches is None else batches
+        # Batch sizes may differ across ranks
+        batch_size = min(self.mpi_comm.allgather(self.__get_batch_size()))
+        self.__epoch_size = max(1, batch_size * batches * self.mpi_size)
+        if self.verbose and self.mpi_rank == 0:
+            print('Ranks will checkpoint together after every {} positions in the queue'
+                  '.'.format(self.__epoch_size))
+
+    def __checkpoint_epochs(self, epochs_due):
+        """
+        Makes collective checkpoints until this rank has made the provided
+        number of checkpoints. Each call to ``__checkpoint()`` is matched by
+        the other ranks once they move past the same epoch
+
+        Parameters
+        ----------
+        epochs_due : uint
+            Number of checkpoints that should have been made thus far
+        """
+        if self.__epochs_flushed >= epochs_due:
+            return
+        # Results of batches still being written should be flushed too
+        self.__finish_pending_write()
+        while self.__epochs_flushed < epochs_due:
+            self.__checkpoint()
+            self.__epochs_flushed += 1
+
+    def __get_batch_end(self, start_pos):
+        """
+        Returns the index within self.__compute_jobs until which the batch
+        starting at ``start_pos`` extends
+
+        Parameters
+        ----------
+        start_pos : uint
+            Index within self.__compute_jobs where the batch starts
+
+        Returns
+        -------
+        end_pos : uint
+            Index within self.__compute_jobs where the batch ends
+        """
+        end_pos = int(min(self.__rank_end_pos, start_pos + self.__get_batch_size()))
+        if self.__job_counter is not None or end_pos >= self.__rank_end_pos:
+            # Batches claimed from the shared queue are of a fixed size
+            return end_pos
+        snapped_pos = self.__snap_to_chunks(end_pos)
+        if snapped_pos <= start_pos:
+            # The batch is smaller than a chunk
+            return end_pos
+        return snapped_pos
+
+    def __timed_read(self, pixels, out=None):
+        """
+        Reads the data for the requested positions and measures how long
+        this took. See :meth:`__read_pixels`
+
+        Parameters
+        ----------
+        pixels : array-like
+            Sorted indices of positions in the source dataset
+        out : :class:`numpy.ndarray`, optional
+            Array to read the data into
+
+        Returns
+        -------
+        data : :class:`numpy.ndarray` or :class:`dask.array.core.Array`
+            Data for the requested positions
+        read_time : float
+            Time in seconds spent reading the data
+        """
+        t_start = tm.time()
+        data = self.__read_pixels(pixels, out=out)
+        return data, tm.time() - t_start
+
+    def __read_pixels(self, pixels, out=None):
+        """
+        Reads the data for the requested positions from the source dataset.
+        This does not modify any attribute and can safely be called from the
+        background I/O thread
+
+        Parameters
+        ----------
+        pixels : :class:`numpy.ndarray`
+            1D array of unsigned integers denoting the positions to read
+        out : :class:`numpy.ndarray`, optional
+            Array with one row per position to read the data into. Ignored
+            when reading lazily
+
+        Returns
+        -------
+        data : :class:`numpy.ndarray` or :class:`dask.array.core.Array`
+            Data for the requested positions
+        """
+        # h5py treats integer arrays as slow point selections. Read contiguous runs as hyperslabs instead
+        slices = get_contiguous_slices(pixels)
+
+        # Reading as Dask array to minimize memory copies when restructuring in child classes
+        if self.__lazy:
+            main_dset = lazy_load_array(self.h5_main)
+            if len(slices) == 1:
+                return main_dset[slices[0], :]
+            return da.concatenate([main_dset[curr_slice, :] for curr_slice in slices], axis=0)
+
+        if len(slices) == 1 and out is None:
+            return self.h5_main[slices[0], :]
+
+        data = out
+        if data is None:
+            data = np.empty((len(pixels), self.h5_main.shape[1]), dtype=self.h5_main.dtype)
+        offset = 0
+        for curr_slice in slices:
+            num_pos = curr_slice.stop - curr_slice.start
+            self.h5_main.read_direct(data, source_sel=np.s_[curr_slice, :],
+                                     dest_sel=np.s_[offset: offset + num_pos, :])
+            offset += num_pos
+        return data
+
+    def __get_shared_input(self, num_pos, index=None, row_shape=None, dtype=None):
+        """
+        Returns the buffer in shared memory that the data for the next batch
+        should be read into when using the 'shared' backend. The buffer is
+        (re)allocated if necessary
+
+        Parameters
+        ----------
+        num_pos : uint
+            Number of positions in the next batch
+        index : uint, optional
+            Index of the buffer. By default, successive batches alternate
+            between two buffers in the pipelined mode
+        row_shape : tuple, optional
+            Shape of the data for each position. Default - that of the source dataset
+        dtype : :class:`numpy.dtype`, optional
+            Data type. Default - that of the source dataset
+
+        Returns
+        -------
+        buffer : :class:`~pyUSID.processing.workers.SharedArray`
+            Buffer with at least ``num_pos`` rows. None if not using the
+            'shared' backend or reading lazily
+        """
+        if self.__backend != 'shared':
+            return None
+        if index is None:
+            if self.__lazy:
+                return None
+            # The batch being computed and the batch being prefetched need separate buffers
+            index = self.__num_batches_read % (2 if self.__pipelined else 1)
+            self.__num_batches_read += 1
+        if row_shape is None:
+            row_shape = self.h5_main.shape[1:]
+        if dtype is None:
+            dtype = self.h5_main.dtype
+        while len(self.__shared_inputs) <= index:
+            self.__shared_inputs.append(None)
+        buffer = self.__shared_inputs[index]
+        if buffer is None or buffer.shape[0] < num_pos or buffer.shape[1:] != tuple(row_shape) or \
+                buffer.dtype != dtype:
+            if buffer is not None:
+                buffer.close()
+            buffer = SharedArray((max(num_pos, self.__get_batch_size()),) + tuple(row_shape), dtype)
+            self.__shared_inputs[index] = buffer
+        return buffer
+
+    @staticmethod
+    def __get_buffer_view(buffer, num_pos):
+        """
+        Returns the leading rows of the buffer
+
+        Parameters
+        ----------
+        buffer : :class:`~pyUSID.processing.workers.SharedArray`
+            Buffer in shared memory. May be None
+        num_pos : uint
+            Number of rows
+
+        Returns
+        -------
+        :class:`numpy.ndarray`
+            View of the leading rows. None if no buffer was provided
+        """
+        if buffer is None:
+            return None
+        return buffer.array[:num_pos]
+
+    def __release_shared_arrays(self):
+        """
+        Releases all buffers in shared memory
+        """
+        # Views of the buffers would prevent the memory from being released
+        self.data = None
+        if self.__shared_output is not None and isinstance(self._results, np.ndarray) and \
+                np.may_share_memory(self._results, self.__shared_output.array):
+            self._results = self._results.copy()
+        for buffer in self.__shared_inputs + [self.__shared_output]:
+            if buffer is not None:
+                buffer.close()
+        self.__shared_inputs = []
+        self.__data_buffer = None
+        self.__shared_output = None
+
     def _read_data_chunk(self):
         """
         Reads a chunk of data for the intended computation into memory
         """
-        if self.__start_pos < self.__rank_end_pos:
-            self.__end_pos = int(min(self.__rank_end_pos, self.__start_pos + self._max_pos_per_read))
+        prefetched = None
+        if self.__prefetched is not None:
+            self.__start_pos, self.__end_pos, self.__data_buffer, prefetched = self.__prefetched
+            self.__prefetched = None
+        else:
+            self.__start_pos = self.__get_batch_start(self.__start_pos)
+            self.__end_pos = self.__get_batch_end(self.__start_pos)
 
+        if self.__start_pos < self.__rank_end_pos:
             # DON'T DIRECTLY apply the start and end indices anymore to the h5 dataset. Find out what it means first
             self.__pixels_in_batch = self.__compute_jobs[self.__start_pos: self.__end_pos]
 
@@ -719,20 +1768,65 @@ class Process(object):
                                      format_size(bytes_this_read * tot_workers)
                                      ))
 
-            # Reading as Dask array to minimize memory copies when restructuring in child classes
-            if self.__lazy:
-                main_dset = lazy_load_array(self.h5_main)
+            # A new dictionary (rather than an updated one) so that batches still being written keep their records
+            self.__batch_record = new_batch_record(rank=self.mpi_rank, batch=len(self.batch_stats),
+                                                   positions=len(self.__pixels_in_batch))
+            if self.__instrument:
+                self.batch_stats.append(self.__batch_record)
+            self.__record_chunk_reads()
+
+            if prefetched is None:
+                self.__data_buffer = self.__get_shared_input(len(self.__pixels_in_batch))
+                self.data, read_time = self.__timed_read(self.__pixels_in_batch,
+                                                         out=self.__get_buffer_view(self.__data_buffer,
+                                                                                    len(self.__pixels_in_batch)))
             else:
-                main_dset = self.h5_main
-
-            self.data = main_dset[self.__pixels_in_batch, :]
+                self.data, read_time = prefetched.result()
+            self.__batch_record['read_time'] = read_time
+            self.__batch_record['read_bytes'] = _get_nbytes(self.data)
             # DON'T update the start position
 
+            if self.__io_pool is not None:
+                next_start = self.__get_batch_start(self.__end_pos)
+                if next_start < self.__rank_end_pos:
+                    # Read the next batch in the background while this one is being computed
+                    next_end = self.__get_batch_end(next_start)
+                    next_buffer = self.__get_shared_input(next_end - next_start)
+                    self.__prefetched = (next_start, next_end, next_buffer,
+                                         self.__io_pool.submit(self.__timed_read,
+                                                               self.__compute_jobs[next_start: next_end],
+                                                               out=self.__get_buffer_view(next_buffer,
+                                                                                          next_end - next_start)))
+
         else:
             if self.verbose:
                 print('Rank {} - Finished reading all data!'.format(self.mpi_rank))
             self.data = None
 
+    def __record_chunk_reads(self):
+        """
+        Records the number of chunks of the source dataset that the current
+        batch reads and how many of these were also read by the previous
+        batch. The latter are decompressed again unless they are retained
+        within the chunk cache
+        """
+        if self.h5_main.chunks is None:
+            return
+        chunk_rows = get_chunk_rows(self.__pixels_in_batch, self.h5_main)
+        shared_rows = np.intersect1d(chunk_rows, self.__prev_chunk_rows, assume_unique=True)
+        self.__prev_chunk_rows = chunk_rows
+        chunks_per_row = get_chunks_per_row(self.h5_main.shape, self.h5_main.chunks)
+        self.__batch_record['chunks_read'] = chunk_rows.size * chunks_per_row
+        self.__batch_record['chunks_reread'] = shared_rows.size * chunks_per_row
+        if self.verbose and shared_rows.size > 0:
+            cache_nbytes = get_chunk_cache(self.h5_main)['rdcc_nbytes']
+            chunk_nbytes = int(np.prod(self.h5_main.chunks)) * self.h5_main.dtype.itemsize
+            retained = cache_nbytes >= shared_rows.size * chunks_per_row * chunk_nbytes
+            print('Rank {} - {} of the {} chunks read by this batch were also read by the previous batch and '
+                  '{}'.format(self.mpi_rank, shared_rows.size * chunks_per_row, chunk_rows.size * chunks_per_row,
+                              'are expected to be in the chunk cache' if retained else
+                              'will be decompressed again since the chunk cache is too small'))
+
     def _write_results_chunk(self):
         """
         Writes the computed results into appropriate datasets.
@@ -743,6 +1837,149 @@ class Process(object):
         # This line can remain as is
         raise NotImplementedError('Please override the _set_results specific to your process')
 
+    def __write_batch(self):
+        """
+        Writes the results of the current batch to the file and makes a
+        checkpoint if the checkpoint policy says so
+        """
+        if self.__active_timeout is not None and isinstance(self._results, list):
+            timed_out = np.array([isinstance(result, TimedOut) for result in self._results], dtype=bool)
+            if np.any(timed_out):
+                self.__mark_timed_out(self.__pixels_in_batch[timed_out])
+                # Rebinding rather than modifying since the computing thread may already be onto the next batch
+                self._results = [result for result, late in zip(self._results, timed_out) if not late]
+                self.__pixels_in_batch = self.__pixels_in_batch[~timed_out]
+                if self.__pixels_in_batch.size == 0:
+                    return
+
+        t_start = tm.time()
+        self._write_results_chunk()
+        self.__batch_record['write_time'] = tm.time() - t_start
+
+        # Child classes don't even have to worry about flushing. Process will do it.
+        if self.__checkpoints_per_batch():
+            self.__unflushed_pixels.append(self.__pixels_in_batch)
+            if self.__checkpoint_policy.batch_completed():
+                self.__checkpoint()
+        elif self.__epoch_size is not None and not self.__retrying:
+            # Flushed together with the other ranks at the end of the epoch. See __checkpoint_epochs()
+            self.__unflushed_pixels.append(self.__pixels_in_batch)
+        else:
+            # Flushing is collective in MPI. Ranks computing different numbers of batches flush only once they are
+            # done. 'last_pixel' attribute will be updated later
+            self.__mark_completed(self.__pixels_in_batch)
+
+    def __mark_completed(self, pixels):
+        """
+        Marks the provided positions as computed in the status dataset
+
+        Parameters
+        ----------
+        pixels : array-like
+            Sorted indices of positions in the source dataset
+        """
+        # Setting each section to 1 independently
+        for curr_slice in get_contiguous_slices(pixels):
+            self._h5_status_dset[curr_slice] = 1
+            if self.__shard is not None:
+                self.__h5_shard_index[curr_slice] = self.__shard.index
+        self.__status_tracker.mark(pixels)
+
+    def __mark_timed_out(self, pixels):
+        """
+        Marks the provided positions as timed out in the status dataset so
+        that they are retried later
+
+        Parameters
+        ----------
+        pixels : array-like
+            Sorted indices of positions in the source dataset
+        """
+        for curr_slice in get_contiguous_slices(pixels):
+            self._h5_status_dset[curr_slice] = TIMED_OUT
+        self.__timed_out_tracker.mark(pixels)
+        if self.verbose:
+            print('Rank {} - {} positions timed out and will be retried later'.format(self.mpi_rank, len(pixels)))
+
+    def __get_num_timed_out(self):
+        """
+        Returns the number of positions that timed out and have not been
+        computed since
+
+        Returns
+        -------
+        uint
+            Number of positions
+        """
+        positions = self.__timed_out_tracker.positions()
+        return int(np.sum(~self.__status_tracker.contains(positions)))
+
+    def __flush(self):
+        """
+        Flushes the file(s) containing the source and results datasets
+        """
+        if self.__shard is not None:
+            self.__shard.flush()
+        self.h5_main.file.flush()
+        if self.h5_results_grp is not None and self.h5_results_grp.file != self.h5_main.file:
+            self.h5_results_grp.file.flush()
+
+    def __checkpoint(self):
+        """
+        Flushes the results of all batches written since the last checkpoint
+        and only then marks these positions as computed. The status of these
+        positions is written to the file along with the next flush so a
+        position is never marked as computed without its results
+        """
+        t_start = tm.time()
+        self.__flush()
+        if len(self.__unflushed_pixels) > 0:
+            # Batches written since the last checkpoint are often adjacent and can be marked together
+            self.__mark_completed(np.unique(np.concatenate(self.__unflushed_pixels)))
+            if self.mpi_comm is None:
+                self.__status_tracker.save(self._h5_status_dset)
+            # Leaving in this provision that will allow restarting of processes
+            if self.mpi_size == 1 and not self.__retrying:
+                self.h5_results_grp.attrs['last_pixel'] = self.__end_pos
+            del self.__unflushed_pixels[:]
+        if self.mpi_comm is None and self.__pixel_timeout is not None:
+            self.__timed_out_tracker.save(self._h5_status_dset, value=TIMED_OUT)
+        self.__checkpoint_policy.reset()
+        self.__batch_record['flush_time'] += tm.time() - t_start
+
+    def __write_behind(self):
+        """
+        Waits for the previous batch to be written and queues the writing of
+        the current batch on the background I/O thread
+        """
+        self.__finish_pending_write()
+        # The next batch rebinds (rather than modifies) data, results and positions, so a shallow copy suffices
+        snapshot = copy.copy(self)
+        self.__pending_write = self.__io_pool.submit(snapshot.__write_batch)
+
+    def __finish_pending_write(self):
+        """
+        Blocks until the queued write (if any) has completed. Any exception
+        raised while writing is raised here
+        """
+        if self.__pending_write is not None:
+            pending_write, self.__pending_write = self.__pending_write, None
+            pending_write.result()
+
+    def __stop_io_thread(self):
+        """
+        Discards prefetched data and shuts down the background I/O thread
+        after it has finished all queued writes
+        """
+        if self.__io_pool is None:
+            return
+        if self.__prefetched is not None:
+            self.__prefetched[-1].cancel()
+            self.__prefetched = None
+        self.__io_pool.shutdown(wait=True)
+        self.__io_pool = None
+        self.__pending_write = None
+
     def _create_results_datasets(self):
         """
         Process specific call that will write the h5 group, guess dataset, corresponding spectroscopic datasets and also
@@ -776,6 +2013,80 @@ class Process(object):
                 if completed_pixels > 0:
                     self._h5_status_dset[:completed_pixels] = 1
 
+        self.__status_tracker = StatusTracker.load(self._h5_status_dset)
+        self.__timed_out_tracker = StatusTracker.load(self._h5_status_dset, value=TIMED_OUT)
+        if self.mpi_comm is not None:
+            # Ranks mark positions independently. Until they combine their ranges, the status dataset is the reference
+            StatusTracker.invalidate(self._h5_status_dset)
+
+    def __open_shard(self):
+        """
+        Opens (or reopens when resuming) the shard that this rank writes
+        results into and points the attributes of this object at the
+        datasets within the shard
+        """
+        shard_index_name = 'shard_index'
+        if shard_index_name in self.h5_results_grp.keys():
+            self.__h5_shard_index = self.h5_results_grp[shard_index_name]
+        else:
+            self.__h5_shard_index = self.h5_results_grp.create_dataset(shard_index_name, dtype=np.int32,
+                                                                       shape=(self.h5_main.shape[0],),
+                                                                       fillvalue=-1)
+        dset_names = get_per_position_dset_names(self.h5_results_grp, self.h5_main.shape[0],
+                                                 exclude=[self._status_dset_name, shard_index_name,
+                                                          'Batch_Stats'])
+        self.__shard = ResultShard(self.h5_results_grp, self.mpi_rank, dset_names,
+                                   rows_per_batch=self.__get_batch_size())
+        if self.verbose:
+            print('Rank {} - writing results for datasets: {} to shard: {}'.format(self.mpi_rank, dset_names,
+                                                                                  self.__shard.path))
+
+        for attr_name, attr_val in list(vars(self).items()):
+            if not isinstance(attr_val, h5py.Dataset) or attr_val.file != self.h5_results_grp.file:
+                continue
+            for name in dset_names:
+                if attr_val.name == self.h5_results_grp[name].name:
+                    self.__sharded_attrs[attr_name] = (attr_val, name)
+                    setattr(self, attr_name, self.__shard.datasets[name])
+
+    def __close_shard(self, h5_dsets=None):
+        """
+        Closes the shard and points the attributes of this object back at the
+        datasets in the results group
+
+        Parameters
+        ----------
+        h5_dsets : dict, optional
+            Datasets in the results group keyed by name that replaced the
+            original datasets when merging shards
+        """
+        if self.__shard is None:
+            return
+        self.__shard.close()
+        self.__shard = None
+        for attr_name, (h5_dset, name) in self.__sharded_attrs.items():
+            if h5_dsets is not None:
+                h5_dset = USIDataset(h5_dsets[name]) if isinstance(h5_dset, USIDataset) else h5_dsets[name]
+            setattr(self, attr_name, h5_dset)
+        self.__sharded_attrs.clear()
+
+    def __merge_results_shards(self):
+        """
+        Merges the shards of all ranks into the results group. All ranks must
+        call this once all positions have been computed and checkpointed
+        """
+        if self.__shard is None:
+            return
+        dset_names = list(self.__shard.datasets.keys())
+        # Shards must be closed before they can be read by other ranks or via virtual datasets
+        self.__shard.close()
+        if self.mpi_comm is not None:
+            self.mpi_comm.barrier()
+        h5_dsets = merge_shards(self.h5_results_grp, dset_names, self.__h5_shard_index[()],
+                                mode=self.__merge_mode, comm=self.mpi_comm)
+        self.__close_shard(h5_dsets=h5_dsets)
+        self.__h5_shard_index = None
+
     def _write_source_dset_provenance(self):
         """
         Writes path of HDF5 file and path of h5_main to the results group
@@ -804,10 +2115,516 @@ class Process(object):
         if self.verbose and self.mpi_rank == 0:
             print("Rank {} at Process class' default _unit_computation() that "
                   "will call parallel_compute()".format(self.mpi_rank))
-        self._results = parallel_compute(self.data, self._map_function, cores=self._cores,
-                                         lengthy_computation=False,
-                                         func_args=args, func_kwargs=kwargs,
-                                         verbose=self.verbose)
+        if self._map_batch_implemented():
+            self._results = self.__compute_in_blocks(args, kwargs)
+        elif self.__backend == 'pool':
+            self._results = self.__get_worker_pool(self.__get_map_function(), args,
+                                                   kwargs).map(self.data)
+        elif self.__backend == 'shared':
+            self._results = self.__compute_shared(self._map_function, False, args, kwargs)
+        else:
+            self._results = parallel_compute(self.data, self.__get_map_function(), cores=self._cores,
+                                             lengthy_computation=False,
+                                             func_args=args, func_kwargs=kwargs,
+                                             verbose=self.verbose,
+                                             joblib_backend=self.__get_joblib_backend())
+
+    def __compute_in_blocks(self, func_args, func_kwargs):
+        """
+        Splits the data for this batch into one contiguous block per CPU core
+        and maps :meth:`~pyUSID.processing.process.Process._map_batch` to
+        these blocks
+
+        Parameters
+        ----------
+        func_args : list
+            Arguments to the batched map function
+        func_kwargs : dict
+            Keyword arguments to the batched map function
+
+        Returns
+        -------
+        results : :class:`numpy.ndarray`
+            Results with one entry per position in this batch
+        """
+        num_blocks = max(1, min(self._cores, self.data.shape[0]))
+        if num_blocks == 1:
+            blocks = [self.data]
+        else:
+            blocks = np.array_split(self.data, num_blocks, axis=0)
+
+        if self.verbose:
+            print('Rank {} mapping batched function to {} blocks of positions'
+                  '.'.format(self.mpi_rank, len(blocks)))
+
+        if self.__backend == 'shared':
+            return self.__compute_shared(self._map_batch, True, func_args, func_kwargs)
+        if self.__backend == 'pool':
+            results = self.__get_worker_pool(self._map_batch, func_args,
+                                             func_kwargs).map(blocks)
+        elif num_blocks == 1:
+            results = [self._map_batch(blocks[0], *func_args, **func_kwargs)]
+        else:
+            results = joblib.Parallel(n_jobs=num_blocks, backend=self.__get_joblib_backend())(
+                joblib.delayed(self._map_batch)(block, *func_args, **func_kwargs) for block in blocks)
+
+        for block, block_results in zip(blocks, results):
+            if np.ndim(block_results) == 0:
+                raise TypeError('_map_batch should return an array-like with one result per position')
+            if len(block_results) != block.shape[0]:
+                raise ValueError('_map_batch returned {} results for a block of {} positions'
+                                 '.'.format(len(block_results), block.shape[0]))
+
+        return np.concatenate([np.asarray(block_results) for block_results in results], axis=0)
+
+    def __get_joblib_backend(self):
+        """
+        Returns the joblib backend that corresponds to the backend of this
+        process
+
+        Returns
+        -------
+        str
+            'threading' for the 'threads' backend, 'multiprocessing' otherwise
+        """
+        if self.__backend == 'threads':
+            return 'threading'
+        return 'multiprocessing'
+
+    def __compute_shared(self, func, batched, func_args, func_kwargs):
+        """
+        Maps the function to the data for this batch in shared memory and
+        collects the results written by the workers into shared memory
+
+        Parameters
+        ----------
+        func : callable
+            Function to map to the data
+        batched : bool
+            Whether the function operates on several positions at once
+        func_args : list
+            Arguments to the function
+        func_kwargs : dict
+            Keyword arguments to the function
+
+        Returns
+        -------
+        results : :class:`numpy.ndarray`
+            Results with one row per position in this batch
+        """
+        num_pos = self.data.shape[0]
+        data_buffer = self.__data_buffer
+        if data_buffer is None or not np.may_share_memory(self.data, data_buffer.array):
+            # Data was read lazily or replaced after reading. Copy it into a separate buffer once
+            data = np.asarray(self.data)
+            data_buffer = self.__get_shared_input(num_pos, index=2, row_shape=data.shape[1:],
+                                                  dtype=data.dtype)
+            data_buffer.array[:num_pos] = data
+
+        if self.__shared_output is None or self.__shared_output.shape[0] < num_pos:
+            if self.__shared_output is None:
+                # Learn the shape and type of the results from the first position
+                if batched:
+                    first = np.asarray(func(data_buffer.array[:1], *func_args, **func_kwargs))
+                    if first.ndim == 0:
+                        raise TypeError('_map_batch should return an array-like with one result per position')
+                    first = first[0]
+                else:
+                    first = np.asarray(func(data_buffer.array[0], *func_args, **func_kwargs))
+                if first.dtype == object:
+                    raise TypeError("The 'shared' backend requires results that are numbers or arrays of a fixed "
+                                    "shape. Please use another backend")
+                shape, dtype = first.shape, first.dtype
+            else:
+                shape, dtype = self.__shared_output.shape[1:], self.__shared_output.dtype
+                self.__shared_output.close()
+            self.__shared_output = SharedArray((max(num_pos, self.__get_batch_size()),) + shape, dtype)
+
+        self.__get_worker_pool(func, func_args, func_kwargs).map_shared(data_buffer, self.__shared_output,
+                                                                        num_rows=num_pos, batched=batched)
+        results = self.__shared_output.array[:num_pos]
+        if self.__pipelined:
+            # The results will be written in the background while the next batch overwrites the shared memory
+            results = results.copy()
+        return results
+
+    def __get_map_function(self):
+        """
+        Returns the function that the default
+        :meth:`~pyUSID.processing.process.Process._unit_computation` maps to
+        the data
+
+        Returns
+        -------
+        func : callable
+            Batched map function if implemented, the per-position map function
+            otherwise. The per-position map function is limited to the time
+            budget per position if one was provided
+        """
+        if self._map_batch_implemented():
+            return self._map_batch
+        if self.__active_timeout is not None:
+            return TimeLimitedFunction(self._map_function, self.__active_timeout)
+        return self._map_function
+
+    def __get_worker_pool(self, func, func_args, func_kwargs):
+        """
+        Returns the persistent pool of workers for the provided function and
+        arguments. The pool is only (re)started if it does not already exist
+        or was started for a different function or arguments
+
+        Parameters
+        ----------
+        func : callable
+            Function to map to the data
+        func_args : list
+            Arguments to the function
+        func_kwargs : dict
+            Keyword arguments to the function
+
+        Returns
+        -------
+        worker_pool : :class:`~pyUSID.processing.workers.WorkerPool`
+            Pool of workers ready to map the function
+        """
+        if self.__worker_pool is not None and \
+                not self.__worker_pool.matches(func, func_args, func_kwargs):
+            self.__worker_pool.close()
+            self.__worker_pool = None
+        if self.__worker_pool is None:
+            self.__worker_pool = WorkerPool(func, cores=self._cores,
+                                            func_args=func_args,
+                                            func_kwargs=func_kwargs,
+                                            verbose=self.verbose and self.mpi_rank == 0)
+        return self.__worker_pool
+
+    def __stop_worker_pool(self, interrupted=False):
+        """
+        Shuts down the persistent pool of workers if one was started
+
+        Parameters
+        ----------
+        interrupted : bool, optional. Default = False
+            If True, the workers are terminated immediately instead of being
+            allowed to finish any pending work
+        """
+        if self.__worker_pool is None:
+            return
+        if interrupted:
+            self.__worker_pool.terminate()
+        else:
+            self.__worker_pool.close()
+        self.__worker_pool = None
+
+    def _prepare_compute(self, override=False):
+        """
+        Prepares for computing by returning previously computed results or by
+        creating (or resuming from) the results and status datasets
+
+        Parameters
+        ----------
+        override : bool, optional. default = False
+            By default, previously computed results will be returned and
+            partially computed results will be resumed. Set to True to force
+            fresh computation.
+
+        Returns
+        -------
+        h5_results_grp : :class:`h5py.Group`
+            Group containing previously computed results. None if positions
+            remain to be computed
+        """
+        if not override:
+            if len(self.duplicate_h5_groups) > 0:
+                if self.mpi_rank == 0:
+                    print('Returned previously computed results at ' + self.duplicate_h5_groups[-1].name)
+                self.h5_results_grp = self.duplicate_h5_groups[-1]
+                return self.duplicate_h5_groups[-1]
+            elif len(self.partial_h5_groups) > 0 and self.h5_results_grp is None:
+                if self.mpi_rank == 0:
+                    print('Resuming computation in group: ' + self.partial_h5_groups[-1].name)
+                self.use_partial_computation()
+
+        resuming = False
+        if self.h5_results_grp is None:
+            # starting fresh
+            if self.verbose and self.mpi_rank == 0:
+                print('Creating HDF5 group and datasets to hold results')
+            self._create_results_datasets()
+            self._write_source_dset_provenance()
+            # Allows future instances to find these results without comparing every parameter
+            register_results_group(self.h5_results_grp, self.parms_dict)
+        else:
+            # resuming from previous checkpoint
+            resuming = True
+            self._get_existing_datasets()
+
+        self.__create_compute_status_dataset()
+        # Results of an interrupted computation may still point at a closed shard
+        self.__close_shard()
+        if self.__shard_results:
+            self.__open_shard()
+
+        if resuming and self.mpi_rank == 0:
+            percent_complete = int(self.__status_tracker.percent_complete)
+            print('Resuming computation. {}% completed already'.format(percent_complete))
+
+        self.__num_batches_read = 0
+        self.__prev_chunk_rows = np.zeros(0, dtype=np.int64)
+        del self.__unflushed_pixels[:]
+        self.__checkpoint_policy.start()
+        self.batch_stats = []
+        return None
+
+    def _get_pending_ranges(self):
+        """
+        Returns the ranges of positions that remain to be computed. Call this
+        after :meth:`_prepare_compute`
+
+        Returns
+        -------
+        ranges : :class:`numpy.ndarray`
+            2D array with the start and stop of each range per row
+        """
+        return self.__status_tracker.remaining_ranges()
+
+    def _read_positions(self, positions):
+        """
+        Reads the data for the provided positions from the source dataset as
+        efficiently as possible
+
+        Parameters
+        ----------
+        positions : array-like
+            Sorted indices of positions in the source dataset
+
+        Returns
+        -------
+        data : :class:`numpy.ndarray` or :class:`dask.array.core.Array`
+            Data with one row per position
+        """
+        return self.__read_pixels(np.asarray(positions))
+
+    def _compute_positions(self, positions, data, *args, **kwargs):
+        """
+        Computes and writes the results for the provided positions using data
+        that was read elsewhere, for example by a
+        :class:`~pyUSID.processing.fusion.FusedProcess`. The file is
+        checkpointed according to the checkpoint policy. Call this only
+        between :meth:`_prepare_compute` and :meth:`_finalize_compute`
+
+        Parameters
+        ----------
+        positions : array-like
+            Sorted indices of positions in the source dataset
+        data : :class:`numpy.ndarray`
+            Data with one row per position
+        args : list
+            arguments to the mapped function in the correct order
+        kwargs : dict
+            keyword arguments to the mapped function
+        """
+        positions = np.asarray(positions)
+        if len(positions) != data.shape[0]:
+            raise ValueError('Data for {} positions provided for {} positions'
+                             '.'.format(data.shape[0], len(positions)))
+        if self.__lazy and isinstance(data, np.ndarray):
+            data = da.from_array(data, chunks=data.shape)
+        self.data = data
+        self.__begin_batch(positions, _get_nbytes(data))
+
+        self.__start_rss_monitor()
+        t_start = tm.time()
+        self._unit_computation(*args, **kwargs)
+        self.__batch_record['compute_time'] = tm.time() - t_start
+        self.__stop_rss_monitor()
+        self.__write_batch()
+
+    def __begin_batch(self, positions, read_bytes):
+        """
+        Starts the bookkeeping for a batch of positions whose data was read
+        outside of :meth:`_read_data_chunk`
+
+        Parameters
+        ----------
+        positions : :class:`numpy.ndarray`
+            Sorted indices of positions in the source dataset
+        read_bytes : uint
+            Number of bytes read for the batch
+        """
+        self.__pixels_in_batch = positions
+        # Legacy 'last_pixel' attribute assumes that positions are computed in order
+        self.__end_pos = int(positions[-1]) + 1
+        self.__batch_record = new_batch_record(rank=self.mpi_rank, batch=len(self.batch_stats),
+                                               positions=len(positions))
+        self.__batch_record['read_bytes'] = read_bytes
+        if self.__instrument:
+            self.batch_stats.append(self.__batch_record)
+
+    def __start_rss_monitor(self):
+        """
+        Starts sampling the memory used by this rank and its workers if
+        statistics are recorded
+        """
+        if self.__rss_monitor is not None:
+            self.__rss_monitor.start()
+
+    def __stop_rss_monitor(self):
+        """
+        Stops sampling the memory and records the peak for the current batch
+        """
+        if self.__rss_monitor is not None:
+            self.__batch_record['peak_rss'] = self.__rss_monitor.stop()
+
+    def __compute_with_dask(self, *args, **kwargs):
+        """
+        Computes all remaining batches as a single Dask graph and writes the
+        results of each batch as soon as they are available
+
+        Parameters
+        ----------
+        args : list
+            arguments to the mapped function in the correct order
+        kwargs : dict
+            keyword arguments to the mapped function
+        """
+        batches = []
+        start_pos = self.__start_pos
+        while start_pos < self.__rank_end_pos:
+            end_pos = self.__get_batch_end(start_pos)
+            batches.append(self.__compute_jobs[start_pos: end_pos])
+            start_pos = end_pos
+        if len(batches) == 0:
+            return
+
+        batched = self._map_batch_implemented()
+        # Checked to be a staticmethod in __init__ if a client was provided
+        func = self._map_batch if batched else self._map_function
+        client = self.__dask_client
+        if client is not None:
+            # Tasks open the file themselves and should see everything written thus far
+            self.h5_main.file.flush()
+        blocks = build_result_blocks(self.h5_main, batches, func, batched=batched, func_args=list(args),
+                                     func_kwargs=kwargs, by_path=client is not None)
+
+        if self.verbose:
+            print('Rank {} - computing {} batches of up to {} positions via Dask'
+                  '.'.format(self.mpi_rank, len(batches), self.__get_batch_size()))
+
+        row_bytes = self.h5_main.shape[1] * self.h5_main.dtype.itemsize
+        num_written = 0
+        t_start = tm.time()
+        self.__start_rss_monitor()
+        try:
+            # Results of a few batches at most are held in memory at any given time
+            for index, results in stream_blocks(blocks, client=client, max_in_flight=2 * self._cores,
+                                                num_workers=self._cores):
+                positions = batches[index]
+                self.__begin_batch(positions, len(positions) * row_bytes)
+                # Dask overlaps reading and computing. This is the time spent waiting for this batch
+                self.__batch_record['compute_time'] = tm.time() - t_start
+                self.__stop_rss_monitor()
+                self._results = results
+                self.__write_batch()
+                num_written += len(positions)
+                if self.verbose or self.mpi_rank == 0:
+                    print('Rank {} - {}% complete'.format(self.mpi_rank,
+                                                          int(100 * num_written / self.__compute_jobs.size)))
+                t_start = tm.time()
+                self.__start_rss_monitor()
+        finally:
+            if self.__rss_monitor is not None:
+                _ = self.__rss_monitor.stop()
+
+    def __retry_timed_out(self, *args, **kwargs):
+        """
+        Computes the positions that timed out once more, now with the time
+        budget for retries. All ranks must call this function
+
+        Parameters
+        ----------
+        args : list
+            arguments to the mapped function in the correct order
+        kwargs : dict
+            keyword arguments to the mapped function
+        """
+        if self.__pixel_timeout is None:
+            return
+        positions = self.__timed_out_tracker.positions()
+        positions = positions[~self.__status_tracker.contains(positions)]
+        if positions.size == 0:
+            return
+        if self.mpi_rank == 0:
+            print('Retrying {} positions that timed out'.format(positions.size))
+        # All ranks know all positions that timed out since the trackers were combined
+        positions = np.array_split(positions, self.mpi_size)[self.mpi_rank]
+
+        self.__timed_out_tracker.clear()
+        self.__active_timeout = self.__retry_timeout
+        self.__retrying = True
+        completed = False
+        try:
+            for start in range(0, positions.size, self._max_pos_per_read):
+                batch = positions[start: start + self._max_pos_per_read]
+                self._compute_positions(batch, self._read_positions(batch), *args, **kwargs)
+            completed = True
+        finally:
+            self.__active_timeout = self.__pixel_timeout
+            self.__retrying = False
+            self.__stop_worker_pool(interrupted=not completed)
+            if self.mpi_comm is None:
+                self.__checkpoint()
+                self.__flush()
+
+        if self.mpi_comm is not None:
+            self.__checkpoint()
+            self.__status_tracker.save(self._h5_status_dset, comm=self.mpi_comm)
+            self.__timed_out_tracker.save(self._h5_status_dset, comm=self.mpi_comm, value=TIMED_OUT)
+            self.__flush()
+            self.mpi_comm.barrier()
+
+    def _finalize_compute(self, completed=True, *args, **kwargs):
+        """
+        Retries positions that timed out, releases workers and shared memory,
+        flushes the results computed via :meth:`_compute_positions` to the
+        file and marks them as completed
+
+        Parameters
+        ----------
+        completed : bool, optional. Default = True
+            Whether or not all positions have been computed. Set to False if
+            the computation was interrupted
+        args : list
+            arguments to the mapped function in the correct order
+        kwargs : dict
+            keyword arguments to the mapped function
+
+        Returns
+        -------
+        h5_results_grp : :class:`h5py.Group`
+            Group containing the results
+        """
+        if completed:
+            self.__retry_timed_out(*args, **kwargs)
+        self.__stop_worker_pool(interrupted=not completed)
+        self.__checkpoint_policy.stop()
+        self.__release_shared_arrays()
+        self.__checkpoint()
+        if completed and self.__instrument and self.__save_stats:
+            _ = write_batch_stats(self.h5_results_grp, self.batch_stats)
+        if completed and self.__pixel_timeout is not None:
+            num_timed_out = self.__get_num_timed_out()
+            if num_timed_out > 0:
+                print('{} positions timed out even when retried. Call compute() again to retry these '
+                      'positions'.format(num_timed_out))
+                completed = False
+        if completed:
+            self.h5_results_grp.attrs['last_pixel'] = self.h5_main.shape[0]
+            self.__merge_results_shards()
+        else:
+            self.__close_shard()
+        self.__flush()
+        return self.h5_results_grp
 
     def compute(self, override=False, *args, **kwargs):
         """
@@ -891,35 +2708,12 @@ class Process(object):
                 """
                 return self.__count
 
-        if not override:
-            if len(self.duplicate_h5_groups) > 0:
-                if self.mpi_rank == 0:
-                    print('Returned previously computed results at ' + self.duplicate_h5_groups[-1].name)
-                self.h5_results_grp = self.duplicate_h5_groups[-1]
-                return self.duplicate_h5_groups[-1]
-            elif len(self.partial_h5_groups) > 0 and self.h5_results_grp is None:
-                if self.mpi_rank == 0:
-                    print('Resuming computation in group: ' + self.partial_h5_groups[-1].name)
-                self.use_partial_computation()
+        h5_duplicate_grp = self._prepare_compute(override=override)
+        if h5_duplicate_grp is not None:
+            return h5_duplicate_grp
 
-        resuming = False
-        if self.h5_results_grp is None:
-            # starting fresh
-            if self.verbose and self.mpi_rank == 0:
-                print('Creating HDF5 group and datasets to hold results')
-            self._create_results_datasets()
-            self._write_source_dset_provenance()
-        else:
-            # resuming from previous checkpoint
-            resuming = True
-            self._get_existing_datasets()
-
-        self.__create_compute_status_dataset()
-
-        if resuming and self.mpi_rank == 0:
-            percent_complete = int(100 * len(np.where(self._h5_status_dset[()] == 1)[0]) /
-                                   self._h5_status_dset.shape[0])
-            print('Resuming computation. {}% completed already'.format(percent_complete))
+        # Needs the results datasets. Must precede the assignment of positions since batches are aligned to chunks
+        time_per_pix = self.__apply_memory_model(*args, **kwargs)
 
         self.__assign_job_indices()
 
@@ -945,78 +2739,145 @@ class Process(object):
             print('Rank: {} - with nothing loaded has {} free memory'
                   ''.format(self.mpi_rank, format_size(get_available_memory())))
 
-        self._read_data_chunk()
-
-        if self.mpi_comm is not None:
-            self.mpi_comm.barrier()
-
-        if self.verbose and self.mpi_rank == self.__socket_master_rank:
-            print('Rank: {} - with only raw data loaded has {} free memory'
-                  ''.format(self.mpi_rank, format_size(get_available_memory())))
-
-        while self.data is not None:
-
-            num_jobs_in_batch = self.__end_pos - self.__start_pos
-
-            t_start_1 = tm.time()
-
-            self._unit_computation(*args, **kwargs)
-
-            comp_time = np.round(tm.time() - t_start_1, decimals=2)  # in seconds
-            time_per_pix = comp_time / num_jobs_in_batch
-            compute_times.put(time_per_pix)
+        completed = False
+        try:
+            if self.__backend in ['pool', 'shared']:
+                # Start the workers before the I/O thread so that they are not forked while it holds any locks
+                _ = self.__get_worker_pool(self.__get_map_function(), args, kwargs)
+            if self.__pipelined:
+                self.__io_pool = ThreadPoolExecutor(max_workers=1)
+
+            if self.__checkpoint_interval is not None and time_per_pix is not None:
+                # Size the first batch using the dry run. Subsequent batches will use measured times
+                self.__adapt_batch_size(time_per_pix / self._cores, 0)
+            self.__set_epoch_size()
+
+            if self.__backend == 'dask':
+                # Batches are read, computed, and written as Dask computes them. Nothing remains for the loop below
+                self.__compute_with_dask(*args, **kwargs)
+                self.data = None
+            else:
+                self._read_data_chunk()
 
-            if self.verbose:
-                print('Rank {} - computed chunk in {} or {} per pixel. Average: {} per pixel'
-                      '.'.format(self.mpi_rank, format_time(comp_time), format_time(time_per_pix),
-                                 format_time(compute_times.get_mean())))
+            if self.mpi_comm is not None:
+                self.mpi_comm.barrier()
 
-            # Ranks can become memory starved. Check memory usage - raw data + results in memory at this point
             if self.verbose and self.mpi_rank == self.__socket_master_rank:
-                print('Rank: {} - now holding onto raw data + results has {} free memory'
+                print('Rank: {} - with only raw data loaded has {} free memory'
                       ''.format(self.mpi_rank, format_size(get_available_memory())))
 
-            t_start_2 = tm.time()
-            self._write_results_chunk()
+            while self.data is not None:
 
-            # NOW, update the positions. Users are NOT allowed to touch start and end pos
-            self.__start_pos = self.__end_pos
-            # Leaving in this provision that will allow restarting of processes
-            if self.mpi_size == 1:
-                self.h5_results_grp.attrs['last_pixel'] = self.__end_pos
-            # Child classes don't even have to worry about flushing. Process will do it.
-            self.h5_main.file.flush()
+                num_jobs_in_batch = self.__end_pos - self.__start_pos
 
-            dump_time = np.round(tm.time() - t_start_2, decimals=2)
-            write_times.put(dump_time / num_jobs_in_batch)
+                self.__start_rss_monitor()
+                t_start_1 = tm.time()
 
-            if self.verbose:
-                print('Rank {} - wrote its {} pixel chunk in {}'.format(self.mpi_rank,
-                                                                        num_jobs_in_batch,
-                                                                        format_time(dump_time)))
+                self._unit_computation(*args, **kwargs)
 
-            time_remaining = (self.__rank_end_pos - self.__end_pos) * \
-                             (compute_times.get_mean() + write_times.get_mean())
+                comp_time = tm.time() - t_start_1  # in seconds
+                self.__batch_record['compute_time'] = comp_time
+                self.__stop_rss_monitor()
+                time_per_pix = comp_time / num_jobs_in_batch
+                compute_times.put(time_per_pix)
 
-            if self.verbose or self.mpi_rank == 0:
-                percent_complete = int(100 * (self.__end_pos - orig_rank_start) /
-                                       (self.__rank_end_pos - orig_rank_start))
-                print('Rank {} - {}% complete. Time remaining: {}'.format(self.mpi_rank, percent_complete,
-                                                                          format_time(time_remaining)))
+                if self.verbose:
+                    print('Rank {} - computed chunk in {} or {} per pixel. Average: {} per pixel'
+                          '.'.format(self.mpi_rank, format_time(comp_time), format_time(time_per_pix),
+                                     format_time(compute_times.get_mean())))
 
-            # All ranks should mark the pixels for this batch as completed. 'last_pixel' attribute will be updated later
-            # Setting each section to 1 independently
-            for curr_slice in integers_to_slices(self.__pixels_in_batch):
-                self._h5_status_dset[curr_slice] = 1
+                # Ranks can become memory starved. Check memory usage - raw data + results in memory at this point
+                if self.verbose and self.mpi_rank == self.__socket_master_rank:
+                    print('Rank: {} - now holding onto raw data + results has {} free memory'
+                          ''.format(self.mpi_rank, format_size(get_available_memory())))
 
-            self._read_data_chunk()
+                t_start_2 = tm.time()
+                # In the pipelined mode, this is only the time spent waiting for the previous batch to be written
+                if self.__io_pool is None:
+                    self.__write_batch()
+                else:
+                    self.__write_behind()
+
+                # NOW, update the positions. Users are NOT allowed to touch start and end pos
+                self.__start_pos = self.__end_pos
+
+                dump_time = tm.time() - t_start_2
+                write_times.put(dump_time / num_jobs_in_batch)
+
+                if self.__checkpoint_interval is not None:
+                    self.__adapt_batch_size(compute_times.get_mean() + write_times.get_mean(),
+                                            _get_nbytes(self._results) / num_jobs_in_batch)
+
+                if self.verbose:
+                    print('Rank {} - wrote its {} pixel chunk in {}'.format(self.mpi_rank,
+                                                                            num_jobs_in_batch,
+                                                                            format_time(dump_time)))
+
+                time_remaining = (self.__rank_end_pos - self.__end_pos) * \
+                                 (compute_times.get_mean() + write_times.get_mean())
+                if self.__job_counter is not None:
+                    # Remaining positions will be shared by all ranks
+                    time_remaining /= self.mpi_size
+
+                if self.verbose or self.mpi_rank == 0:
+                    percent_complete = int(100 * (self.__end_pos - orig_rank_start) /
+                                           (self.__rank_end_pos - orig_rank_start))
+                    print('Rank {} - {}% complete. Time remaining: {}'.format(self.mpi_rank, percent_complete,
+                                                                              format_time(time_remaining)))
+
+                self._read_data_chunk()
+
+            self.__finish_pending_write()
+            completed = True
+        finally:
+            # Results already computed should make it to the file even if the computation was interrupted
+            self.__stop_io_thread()
+            self.__stop_worker_pool(interrupted=not completed)
+            self.__release_shared_arrays()
+            self.__checkpoint_policy.stop()
+            if self.mpi_comm is None:
+                self.__checkpoint()
+                # Ensure that the status of the positions also lands in the file
+                self.__flush()
+            if not completed:
+                self.__close_shard()
 
         if self.verbose:
             print('Rank {} - Finished computing all jobs!'.format(self.mpi_rank))
 
+        # Collective operations that all ranks reach only once no batches remain
+        if self.__job_counter is not None:
+            self.__job_counter.free()
+            self.__job_counter = None
+            self.__epoch_size = None
+        if self.mpi_comm is not None:
+            self.__checkpoint()
+            self.__status_tracker.save(self._h5_status_dset, comm=self.mpi_comm)
+            if self.__pixel_timeout is not None:
+                self.__timed_out_tracker.save(self._h5_status_dset, comm=self.mpi_comm, value=TIMED_OUT)
+        self.__flush()
+
         if self.mpi_comm is not None:
             self.mpi_comm.barrier()
 
+        self.__retry_timed_out(*args, **kwargs)
+        # Includes the statistics of the batches that were retried
+        if self.__instrument and self.__save_stats:
+            _ = write_batch_stats(self.h5_results_grp, self.batch_stats, comm=self.mpi_comm)
+            self.__flush()
+        if self.__pixel_timeout is not None:
+            num_timed_out = self.__get_num_timed_out()
+            if num_timed_out > 0:
+                # Shards are only merged once every position has been computed
+                self.__close_shard()
+                if self.mpi_rank == 0:
+                    print('{} positions timed out even when retried. Call compute() again to retry these '
+                          'positions'.format(num_timed_out))
+                return self.h5_results_grp
+
+        self.__merge_results_shards()
+        self.__flush()
+
         if self.mpi_rank == 0:
             print('Finished processing the entire dataset!')
 
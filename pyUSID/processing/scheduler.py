@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+"""
+:class:`~pyUSID.processing.scheduler.SharedJobCounter` - A counter shared by all MPI ranks that enables dynamic
+scheduling of batches of positions
+
+Created on Sun Oct 18 2026
+
+@author: Suhas Somnath, Chris Smith
+"""
+
+from __future__ import division, print_function, unicode_literals, \
+    absolute_import
+import numpy as np
+
+__all__ = ['SharedJobCounter', 'get_epochs_due']
+
+
+class SharedJobCounter(object):
+    """
+    An integer counter that lives in the memory of rank 0 and is atomically
+    incremented by any rank via one-sided MPI communication (fetch-and-add).
+    Ranks use this counter to claim the next batch of jobs from a queue that
+    is shared by all ranks such that faster ranks simply claim more batches.
+    No rank needs to act as a dispenser.
+
+    Notes
+    -----
+    Creating and freeing the counter are collective operations. Claiming
+    jobs is not.
+    """
+
+    def __init__(self, comm, start=0):
+        """
+        Parameters
+        ----------
+        comm : :class:`mpi4py.MPI.Comm`
+            Communicator containing all ranks that share the counter
+        start : uint, optional. Default = 0
+            Initial value of the counter
+        """
+        from mpi4py import MPI
+
+        if not isinstance(comm, MPI.Comm):
+            raise TypeError('comm should be a mpi4py.MPI.Comm object')
+        if not isinstance(start, (int, np.integer)):
+            raise TypeError('start should be an integer')
+
+        self.__mpi = MPI
+        self.__comm = comm
+        self.__buffer = None
+        if comm.Get_rank() == 0:
+            self.__buffer = np.array([start], dtype=np.int64)
+        self.__win = MPI.Win.Create(self.__buffer,
+                                    disp_unit=np.dtype(np.int64).itemsize,
+                                    comm=comm)
+        # Nobody should claim jobs before every rank has joined the window
+        comm.barrier()
+
+    def fetch_and_add(self, increment):
+        """
+        Atomically increments the counter and returns its previous value
+
+        Parameters
+        ----------
+        increment : uint
+            Value to add to the counter. For example - number of jobs to claim
+
+        Returns
+        -------
+        value : int
+            Value of the counter before the increment. For example - index of
+            the first job claimed by this call
+        """
+        if self.__win is None:
+            raise ValueError('This counter has already been freed')
+        increment = np.array([increment], dtype=np.int64)
+        value = np.zeros(1, dtype=np.int64)
+        self.__win.Lock(0, self.__mpi.LOCK_SHARED)
+        self.__win.Fetch_and_op(increment, value, 0, 0, self.__mpi.SUM)
+        self.__win.Unlock(0)
+        return int(value[0])
+
+    def free(self):
+        """
+        Releases the memory window. All ranks must call this function
+        """
+        if self.__win is None:
+            return
+        self.__win.Free()
+        self.__win = None
+
+
+def get_epochs_due(start, num_jobs, epoch_size):
+    """
+    Returns the number of collective checkpoints that a rank should have made
+    before computing the batch that starts at the provided job. The shared
+    queue of jobs is divided into epochs of a fixed number of jobs. A rank
+    joins the checkpoint at the end of an epoch once it claims a batch from a
+    later epoch or finds the queue empty. Every rank therefore makes the same
+    number of checkpoints regardless of how many batches it claims
+
+    Parameters
+    ----------
+    start : uint
+        Index of the first job of the claimed batch. At least ``num_jobs``
+        if the queue is empty
+    num_jobs : uint
+        Total number of jobs in the queue
+    epoch_size : uint
+        Number of jobs in each epoch
+
+    Returns
+    -------
+    uint
+        Number of checkpoints
+    """
+    if epoch_size < 1:
+        raise ValueError('epoch_size should be at least 1')
+    if num_jobs < 1:
+        return 0
+    return int(min(start, num_jobs - 1) // epoch_size)
@@ -0,0 +1,243 @@
+# -*- coding: utf-8 -*-
+"""
+:class:`~pyUSID.processing.sharding.ResultShard` - A separate file per MPI rank that results are written to before
+being merged into the results group
+
+Created on Sun Oct 18 2026
+
+@author: Suhas Somnath, Chris Smith
+"""
+
+from __future__ import division, print_function, unicode_literals, \
+    absolute_import
+import os
+import posixpath
+import numpy as np
+import h5py
+from ..io.hdf_utils import get_contiguous_slices
+from .chunk_cache import DEFAULT_CACHE_NBYTES, get_cache_nbytes, get_cache_nslots
+
+__all__ = ['ResultShard', 'get_shard_path', 'get_per_position_dset_names', 'merge_shards']
+
+
+def get_shard_path(h5_results_grp, index):
+    """
+    Returns the path of the file for a given shard of the results group. The
+    shard is placed next to the file containing the results group
+
+    Parameters
+    ----------
+    h5_results_grp : :class:`h5py.Group`
+        Results group
+    index : uint
+        Index of the shard. Typically the MPI rank that writes to it
+
+    Returns
+    -------
+    shard_path : str
+        Absolute path of the shard file
+    """
+    file_path = os.path.abspath(h5_results_grp.file.filename)
+    stem = os.path.splitext(file_path)[0]
+    grp_name = h5_results_grp.name.strip('/').replace('/', '_')
+    return '{}_{}_shard_{}.h5'.format(stem, grp_name, index)
+
+
+def get_per_position_dset_names(h5_results_grp, num_pos, exclude=None):
+    """
+    Returns the names of datasets within the results group that hold one row
+    of results per position of the source dataset. Ancillary datasets are not
+    included
+
+    Parameters
+    ----------
+    h5_results_grp : :class:`h5py.Group`
+        Results group
+    num_pos : uint
+        Number of positions in the source dataset
+    exclude : list of str, optional
+        Names of datasets to exclude such as the status dataset
+
+    Returns
+    -------
+    dset_names : list of str
+        Names of the datasets
+    """
+    if exclude is None:
+        exclude = []
+    dset_names = []
+    for name, obj in h5_results_grp.items():
+        if not isinstance(obj, h5py.Dataset) or name in exclude:
+            continue
+        if name.startswith('Position_') or name.startswith('Spectroscopic_'):
+            continue
+        if len(obj.shape) > 0 and obj.shape[0] == num_pos:
+            dset_names.append(name)
+    return sorted(dset_names)
+
+
+class ResultShard(object):
+    """
+    A separate HDF5 file, written by a single MPI rank, containing datasets
+    that mirror the per-position datasets of the results group. Since each
+    shard is written by only one rank, the datasets can be chunked and
+    compressed, which is not possible when writing in parallel.
+    Existing shards are reopened so that a resumed computation retains the
+    results written previously.
+    """
+
+    def __init__(self, h5_results_grp, index, dset_names, compression='gzip', rows_per_batch=None):
+        """
+        Parameters
+        ----------
+        h5_results_grp : :class:`h5py.Group`
+            Results group
+        index : uint
+            Index of the shard. Typically the MPI rank that writes to it
+        dset_names : list of str
+            Names of the datasets within the results group to mirror
+        compression : str, optional. Default = 'gzip'
+            Compression filter for the datasets in the shard
+        rows_per_batch : uint, optional
+            Maximum number of positions written at a time. If provided, the
+            chunk cache of the shard is sized to hold all chunks touched by
+            such a batch so that chunks are compressed only once
+        """
+        if not isinstance(h5_results_grp, h5py.Group):
+            raise TypeError('h5_results_grp should be a h5py.Group object')
+        if not isinstance(index, (int, np.integer)) or index < 0:
+            raise TypeError('index should be a non-negative integer')
+        self.index = int(index)
+        self.path = get_shard_path(h5_results_grp, self.index)
+
+        chunks = dict()
+        cache_nbytes, chunk_nbytes = DEFAULT_CACHE_NBYTES, 1
+        for name in dset_names:
+            h5_dset = h5_results_grp[name]
+            # A few positions per chunk so that batches only touch the chunks they need
+            row_bytes = max(1, int(np.prod(h5_dset.shape[1:])) * h5_dset.dtype.itemsize)
+            rows_per_chunk = int(max(1, min(h5_dset.shape[0], (256 * 1024) // row_bytes)))
+            chunks[name] = (rows_per_chunk,) + h5_dset.shape[1:]
+            if rows_per_batch is not None:
+                dset_nbytes, dset_chunk_nbytes = get_cache_nbytes(h5_dset.shape, chunks[name],
+                                                                  h5_dset.dtype.itemsize, rows_per_batch)
+                cache_nbytes = max(cache_nbytes, dset_nbytes)
+                chunk_nbytes = max(chunk_nbytes, dset_chunk_nbytes)
+        # Every dataset in the file gets a cache of this size. Fully written chunks are evicted first
+        self.h5_file = h5py.File(self.path, mode='a', rdcc_nbytes=cache_nbytes,
+                                 rdcc_nslots=get_cache_nslots(cache_nbytes, chunk_nbytes), rdcc_w0=1.0)
+
+        self.datasets = dict()
+        for name in dset_names:
+            h5_dset = h5_results_grp[name]
+            if name in self.h5_file:
+                self.datasets[name] = self.h5_file[name]
+                continue
+            self.datasets[name] = self.h5_file.create_dataset(name, shape=h5_dset.shape, dtype=h5_dset.dtype,
+                                                              chunks=chunks[name], compression=compression)
+
+    def flush(self):
+        """
+        Flushes the shard file
+        """
+        if self.h5_file is not None:
+            self.h5_file.flush()
+
+    def close(self):
+        """
+        Closes the shard file
+        """
+        if self.h5_file is None:
+            return
+        self.h5_file.close()
+        self.h5_file = None
+        self.datasets = dict()
+
+
+def merge_shards(h5_results_grp, dset_names, shard_index, mode='virtual', comm=None):
+    """
+    Stitches the results written to shards back into the datasets of the
+    results group. All MPI ranks must call this function with the same
+    arguments. The shards must have been closed beforehand.
+
+    Parameters
+    ----------
+    h5_results_grp : :class:`h5py.Group`
+        Results group
+    dset_names : list of str
+        Names of the datasets within the results group that were sharded
+    shard_index : :class:`numpy.ndarray`
+        Index of the shard holding the results for each position. Negative
+        values denote positions that were not written to any shard
+    mode : str, optional. Default = 'virtual'
+        How to merge the shards:
+
+        * 'virtual' - each dataset is replaced by an HDF5 virtual dataset
+          that maps the rows of each position to the shard holding them.
+          The (compressed) shard files must be kept next to the results file.
+          If some positions were not written to any shard (for example,
+          computed before sharding was enabled), the original dataset is
+          retained as '<name>_unsharded' and these rows map to it instead
+        * 'copy' - the results are copied from the shards into the existing
+          datasets. The shard files are deleted afterwards
+    comm : :class:`mpi4py.MPI.Comm`, optional
+        MPI communicator. If provided, the shards are copied by different
+        ranks in the 'copy' mode and all ranks must call this function
+
+    Returns
+    -------
+    h5_dsets : dict
+        Merged datasets keyed by name
+    """
+    if mode not in ['virtual', 'copy']:
+        raise ValueError("mode should be one of: 'virtual', 'copy'. Provided value: {}".format(mode))
+    shard_index = np.asarray(shard_index)
+    shards = [int(index) for index in np.unique(shard_index) if index >= 0]
+    runs = dict([(index, get_contiguous_slices(np.where(shard_index == index)[0])) for index in shards])
+    unsharded_runs = get_contiguous_slices(np.where(shard_index < 0)[0])
+    shard_paths = dict([(index, get_shard_path(h5_results_grp, index)) for index in shards])
+
+    rank, size = (0, 1) if comm is None else (comm.Get_rank(), comm.Get_size())
+
+    h5_dsets = dict()
+    for name in dset_names:
+        h5_dset = h5_results_grp[name]
+        if mode == 'copy':
+            for index in shards[rank::size]:
+                with h5py.File(shard_paths[index], mode='r') as h5_shard:
+                    for run in runs[index]:
+                        h5_dset[run] = h5_shard[name][run]
+            h5_dsets[name] = h5_dset
+            continue
+
+        # Object references to ancillary datasets, units etc. need to be carried over
+        attrs = dict([(key, val) for key, val in h5_dset.attrs.items()])
+        shape, dtype = h5_dset.shape, h5_dset.dtype
+        fill_value = h5_dset.fillvalue
+        layout = h5py.VirtualLayout(shape=shape, dtype=dtype)
+        for index in shards:
+            # Relative to the results file so that both can be moved together
+            source = h5py.VirtualSource(os.path.basename(shard_paths[index]), '/' + name, shape=shape)
+            for run in runs[index]:
+                layout[run] = source[run]
+        if len(unsharded_runs) > 0:
+            unsharded_name = '{}_unsharded'.format(name)
+            h5_results_grp.move(name, unsharded_name)
+            # '.' denotes the file containing the virtual dataset
+            source = h5py.VirtualSource('.', posixpath.join(h5_results_grp.name, unsharded_name), shape=shape)
+            for run in unsharded_runs:
+                layout[run] = source[run]
+        else:
+            del h5_results_grp[name]
+        h5_dset = h5_results_grp.create_virtual_dataset(name, layout, fillvalue=fill_value)
+        for key, val in attrs.items():
+            h5_dset.attrs[key] = val
+        h5_dsets[name] = h5_dset
+
+    if mode == 'copy':
+        if comm is not None:
+            comm.barrier()
+        for index in shards[rank::size]:
+            if os.path.exists(shard_paths[index]):
+                os.remove(shard_paths[index])
+    return h5_dsets
@@ -0,0 +1,456 @@
+# -*- coding: utf-8 -*-
+"""
+:class:`~pyUSID.processing.status.StatusTracker` - Keeps track of the positions that have been computed as compact
+ranges
+
+Created on Sun Oct 18 2026
+
+@author: Suhas Somnath, Chris Smith
+"""
+
+from __future__ import division, print_function, unicode_literals, \
+    absolute_import
+import numpy as np
+import h5py
+
+from ..io.hdf_utils import get_contiguous_slices
+
+__all__ = ['StatusTracker', 'PENDING', 'COMPLETED', 'TIMED_OUT', 'RANGES_ATTR', 'TIMED_OUT_RANGES_ATTR',
+           'MAX_PERSISTED_RANGES']
+
+PENDING = 0
+"""
+Value in the status dataset for positions that remain to be computed
+"""
+
+COMPLETED = 1
+"""
+Value in the status dataset for positions whose results have been written
+"""
+
+TIMED_OUT = 2
+"""
+Value in the status dataset for positions whose computation exceeded the time
+budget per position and has to be retried
+"""
+
+RANGES_ATTR = 'completed_ranges'
+"""
+Name of the attribute of the status dataset holding the start and stop of
+each range of computed positions
+"""
+
+TIMED_OUT_RANGES_ATTR = 'timed_out_ranges'
+"""
+Name of the attribute of the status dataset holding the start and stop of
+each range of timed out positions
+"""
+
+_RANGES_ATTRS = {COMPLETED: RANGES_ATTR, TIMED_OUT: TIMED_OUT_RANGES_ATTR}
+
+MAX_PERSISTED_RANGES = 2048
+"""
+Maximum number of ranges persisted in the attributes of the status dataset.
+Attributes are limited to 64 kB in the default HDF5 file format
+"""
+
+
+def _merge_ranges(ranges):
+    """
+    Sorts and merges overlapping or adjacent ranges
+
+    Parameters
+    ----------
+    ranges : :class:`numpy.ndarray`
+        2D array of integers with the start and stop of each range per row
+
+    Returns
+    -------
+    merged : :class:`numpy.ndarray`
+        2D array of sorted, disjoint and non-adjacent ranges
+    """
+    ranges = ranges[ranges[:, 1] > ranges[:, 0]]
+    if ranges.shape[0] < 2:
+        return ranges
+    ranges = ranges[np.argsort(ranges[:, 0], kind='mergesort')]
+    max_stops = np.maximum.accumulate(ranges[:, 1])
+    is_new = np.ones(ranges.shape[0], dtype=bool)
+    is_new[1:] = ranges[1:, 0] > max_stops[:-1]
+    first = np.flatnonzero(is_new)
+    return np.stack([ranges[first, 0], np.maximum.reduceat(ranges[:, 1], first)], axis=1)
+
+
+def _get_ranges_attr(value):
+    """
+    Returns the name of the attribute holding the ranges of positions with the
+    provided value in the status dataset
+
+    Parameters
+    ----------
+    value : uint
+        Value in the status dataset. Either COMPLETED or TIMED_OUT
+
+    Returns
+    -------
+    str
+        Name of the attribute
+    """
+    if value not in _RANGES_ATTRS:
+        raise ValueError('value should be one of: {}. Provided value: {}'.format(sorted(_RANGES_ATTRS.keys()),
+                                                                                 value))
+    return _RANGES_ATTRS[value]
+
+
+def _expand_ranges(ranges):
+    """
+    Converts ranges into the integers they contain
+
+    Parameters
+    ----------
+    ranges : :class:`numpy.ndarray`
+        2D array with the start and stop of each range per row
+
+    Returns
+    -------
+    indices : :class:`numpy.ndarray`
+        Sorted integers within the ranges
+    """
+    lengths = ranges[:, 1] - ranges[:, 0]
+    offsets = np.cumsum(lengths) - lengths
+    return np.arange(np.sum(lengths), dtype=np.int64) + np.repeat(ranges[:, 0] - offsets, lengths)
+
+
+def _get_probes(ranges):
+    """
+    Returns the first, middle, and last integer of each range
+
+    Parameters
+    ----------
+    ranges : :class:`numpy.ndarray`
+        2D array with the start and stop of each range per row
+
+    Returns
+    -------
+    probes : :class:`numpy.ndarray`
+        Sorted, unique integers
+    """
+    ranges = ranges.astype(np.int64)
+    return np.unique(np.concatenate([ranges[:, 0], (ranges[:, 0] + ranges[:, 1] - 1) // 2, ranges[:, 1] - 1]))
+
+
+class StatusTracker(object):
+    """
+    Keeps track of the positions in a dataset that have been computed as a
+    sorted list of ranges of consecutive positions. Since positions are
+    typically computed in large contiguous batches, only a handful of ranges
+    are necessary even for very large datasets. The number of computed and
+    remaining positions is therefore available without scanning the status
+    of every position.
+
+    The ranges are persisted as an attribute of the (legacy) status dataset,
+    which holds one uint8 element per position and remains the reference for
+    other readers. The status dataset is only scanned (in chunks) when the
+    ranges are unavailable or could be stale, such as for results computed
+    by older versions of pyUSID or by an MPI job that was interrupted, or
+    when the ranges disagree with the status dataset
+    """
+
+    def __init__(self, num_pos, ranges=None):
+        """
+        Parameters
+        ----------
+        num_pos : uint
+            Number of positions in the dataset
+        ranges : array-like, optional
+            Start and stop of each range of computed positions
+        """
+        if not isinstance(num_pos, (int, np.integer)) or num_pos < 0:
+            raise TypeError('num_pos should be a non-negative integer')
+        self.num_positions = int(num_pos)
+        self.__ranges = np.zeros((0, 2), dtype=np.int64)
+        self.__num_completed = 0
+        if ranges is not None:
+            self.mark_ranges(ranges)
+
+    @classmethod
+    def from_status_dataset(cls, h5_status, chunk_size=2 ** 24, value=COMPLETED):
+        """
+        Builds the tracker by scanning the status dataset chunk by chunk
+        rather than reading it all at once
+
+        Parameters
+        ----------
+        h5_status : :class:`h5py.Dataset`
+            1D status dataset with a value of 1 for each computed position
+        chunk_size : uint, optional. Default = 2 ** 24
+            Number of positions to read at a time
+        value : uint, optional. Default = COMPLETED
+            Positions with this value in the status dataset are tracked
+
+        Returns
+        -------
+        tracker : :class:`~pyUSID.processing.status.StatusTracker`
+            Tracker for the computed positions
+        """
+        if not isinstance(h5_status, h5py.Dataset):
+            raise TypeError('h5_status should be a h5py.Dataset object')
+        num_pos = h5_status.shape[0]
+        ranges = []
+        for start in range(0, num_pos, chunk_size):
+            block = np.zeros(min(chunk_size, num_pos - start) + 2, dtype=np.int8)
+            block[1:-1] = h5_status[start: start + chunk_size] == value
+            edges = np.diff(block)
+            ranges.append(np.stack([np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)], axis=1) + start)
+        tracker = cls(num_pos)
+        if len(ranges) > 0:
+            tracker.mark_ranges(np.concatenate(ranges, axis=0))
+        return tracker
+
+    @classmethod
+    def load(cls, h5_status, value=COMPLETED):
+        """
+        Returns the tracker persisted in the attributes of the status dataset
+        via :meth:`save`. The status dataset is scanned instead if no ranges
+        were persisted or if they disagree with the status dataset.
+
+        Only the first, middle, and last positions of every range and of
+        every gap between ranges are compared against the status dataset.
+        This catches writers that only update the status dataset as they
+        work through the pending positions in order, such as older versions
+        of pyUSID. Positions changed elsewhere in the status dataset are not
+        detected. Call :meth:`invalidate` before making such changes
+
+        Parameters
+        ----------
+        h5_status : :class:`h5py.Dataset`
+            1D status dataset with one element per position
+        value : uint, optional. Default = COMPLETED
+            Positions with this value in the status dataset are tracked
+
+        Returns
+        -------
+        tracker : :class:`~pyUSID.processing.status.StatusTracker`
+            Tracker for the computed positions
+        """
+        if not isinstance(h5_status, h5py.Dataset):
+            raise TypeError('h5_status should be a h5py.Dataset object')
+        attr_name = _get_ranges_attr(value)
+        if attr_name in h5_status.attrs.keys():
+            tracker = cls(h5_status.shape[0], ranges=h5_status.attrs[attr_name])
+            if tracker.__agrees_with(h5_status, value):
+                return tracker
+        return cls.from_status_dataset(h5_status, value=value)
+
+    def __agrees_with(self, h5_status, value):
+        """
+        Compares the first, middle, and last positions of every tracked range
+        and of every gap between them against the status dataset
+
+        Parameters
+        ----------
+        h5_status : :class:`h5py.Dataset`
+            1D status dataset with one element per position
+        value : uint
+            Value of the tracked positions in the status dataset
+
+        Returns
+        -------
+        bool
+            True if the status dataset agrees at every compared position
+        """
+        probes = _get_probes(np.concatenate([self.__ranges, self.remaining_ranges()], axis=0))
+        if probes.size == 0:
+            return True
+        # Reading the span between probes is much faster than selecting each of them in the file
+        statuses = []
+        for run in np.split(probes, np.flatnonzero(np.diff(probes) > 4096) + 1):
+            statuses.append(h5_status[int(run[0]): int(run[-1]) + 1][run - run[0]])
+        return np.array_equal(np.concatenate(statuses) == value, self.contains(probes))
+
+    @staticmethod
+    def invalidate(h5_status):
+        """
+        Removes the persisted ranges (if any) such that :meth:`load` scans the
+        status dataset instead until :meth:`save` is called again. Use this
+        before positions are marked in the status dataset by writers that do
+        not update the ranges. All MPI ranks must call this function
+
+        Parameters
+        ----------
+        h5_status : :class:`h5py.Dataset`
+            Status dataset
+        """
+        for attr_name in _RANGES_ATTRS.values():
+            if attr_name in h5_status.attrs.keys():
+                del h5_status.attrs[attr_name]
+
+    def save(self, h5_status, comm=None, value=COMPLETED):
+        """
+        Persists the ranges in the attributes of the status dataset. The
+        ranges are not persisted if there are too many of them to fit in an
+        attribute, in which case :meth:`load` falls back to scanning the
+        status dataset
+
+        Parameters
+        ----------
+        h5_status : :class:`h5py.Dataset`
+            Status dataset
+        comm : :class:`mpi4py.MPI.Comm`, optional
+            MPI communicator. If provided, the ranges of all ranks are merged
+            into this tracker before being written and all ranks must call
+            this function
+        value : uint, optional. Default = COMPLETED
+            Value of the tracked positions in the status dataset
+        """
+        if not isinstance(h5_status, h5py.Dataset):
+            raise TypeError('h5_status should be a h5py.Dataset object')
+        attr_name = _get_ranges_attr(value)
+        if comm is not None:
+            self.mark_ranges(np.concatenate(comm.allgather(self.__ranges), axis=0))
+        if self.__ranges.shape[0] > MAX_PERSISTED_RANGES:
+            if attr_name in h5_status.attrs.keys():
+                del h5_status.attrs[attr_name]
+            return
+        # Attributes cannot be empty. An empty range is ignored when loading
+        ranges = self.__ranges if self.__ranges.shape[0] > 0 else np.zeros((1, 2), dtype=np.int64)
+        h5_status.attrs[attr_name] = ranges.astype(np.uint64)
+
+    def mark_ranges(self, ranges):
+        """
+        Marks ranges of positions as computed
+
+        Parameters
+        ----------
+        ranges : array-like
+            2D array with the start and stop of each range per row
+        """
+        ranges = np.asarray(ranges, dtype=np.int64).reshape(-1, 2)
+        if ranges.shape[0] == 0:
+            return
+        if ranges.min() < 0 or ranges.max() > self.num_positions:
+            raise ValueError('Ranges should lie within [0, {}]'.format(self.num_positions))
+        self.__ranges = _merge_ranges(np.concatenate([self.__ranges, ranges], axis=0))
+        self.__num_completed = int(np.sum(self.__ranges[:, 1] - self.__ranges[:, 0]))
+
+    def mark(self, positions):
+        """
+        Marks the provided positions as computed
+
+        Parameters
+        ----------
+        positions : array-like
+            1D array of unique indices of positions
+        """
+        runs = get_contiguous_slices(np.unique(np.asarray(positions, dtype=np.int64)))
+        self.mark_ranges(np.array([[run.start, run.stop] for run in runs], dtype=np.int64).reshape(-1, 2))
+
+    @property
+    def ranges(self):
+        """
+        Start and stop of each range of computed positions
+        """
+        return self.__ranges.copy()
+
+    @property
+    def num_completed(self):
+        """
+        Number of computed positions
+        """
+        return self.__num_completed
+
+    @property
+    def num_remaining(self):
+        """
+        Number of positions that remain to be computed
+        """
+        return self.num_positions - self.__num_completed
+
+    @property
+    def percent_complete(self):
+        """
+        Percentage of positions that have been computed
+        """
+        if self.num_positions == 0:
+            return 100.0
+        return 100.0 * self.__num_completed / self.num_positions
+
+    @property
+    def is_complete(self):
+        """
+        Whether or not all positions have been computed
+        """
+        return self.__num_completed == self.num_positions
+
+    def remaining_ranges(self):
+        """
+        Returns the ranges of positions that remain to be computed
+
+        Returns
+        -------
+        ranges : :class:`numpy.ndarray`
+            2D array with the start and stop of each range per row
+        """
+        bounds = np.concatenate([[0], self.__ranges.ravel(), [self.num_positions]])
+        ranges = bounds.reshape(-1, 2)
+        return ranges[ranges[:, 1] > ranges[:, 0]]
+
+    def remaining(self, exclude=None):
+        """
+        Returns the positions that remain to be computed
+
+        Parameters
+        ----------
+        exclude : :class:`~pyUSID.processing.status.StatusTracker`, optional
+            Positions tracked by this tracker, such as those that timed out,
+            are excluded as well
+
+        Returns
+        -------
+        positions : :class:`numpy.ndarray`
+            Sorted indices of positions
+        """
+        if exclude is None:
+            return _expand_ranges(self.remaining_ranges())
+        if not isinstance(exclude, StatusTracker):
+            raise TypeError('exclude should be a StatusTracker object')
+        combined = StatusTracker(self.num_positions, ranges=np.concatenate([self.__ranges, exclude.ranges], axis=0))
+        return combined.remaining()
+
+    def positions(self):
+        """
+        Returns the tracked (computed) positions
+
+        Returns
+        -------
+        positions : :class:`numpy.ndarray`
+            Sorted indices of positions
+        """
+        return _expand_ranges(self.__ranges)
+
+    def contains(self, positions):
+        """
+        Checks which of the provided positions are tracked (computed)
+
+        Parameters
+        ----------
+        positions : array-like
+            Indices of positions
+
+        Returns
+        -------
+        :class:`numpy.ndarray`
+            Boolean array that is True for tracked positions
+        """
+        positions = np.asarray(positions, dtype=np.int64)
+        index = np.searchsorted(self.__ranges[:, 0], positions, side='right') - 1
+        valid = index >= 0
+        found = np.zeros(positions.shape, dtype=bool)
+        found[valid] = positions[valid] < self.__ranges[index[valid], 1]
+        return found
+
+    def clear(self):
+        """
+        Stops tracking all positions
+        """
+        self.__ranges = np.zeros((0, 2), dtype=np.int64)
+        self.__num_completed = 0
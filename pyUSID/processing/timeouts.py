@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+"""
+:class:`~pyUSID.processing.timeouts.TimeLimitedFunction` - Limits the time spent computing any single position
+
+Created on Sun Oct 18 2026
+
+@author: Suhas Somnath, Chris Smith
+"""
+
+from __future__ import division, print_function, unicode_literals, \
+    absolute_import
+import signal
+import threading
+import time as tm
+from numbers import Number
+
+__all__ = ['HAS_TIMERS', 'TimedOut', 'TimeLimitedFunction']
+
+HAS_TIMERS = hasattr(signal, 'setitimer')
+"""
+Whether this platform supports the interval timers used to limit the time
+spent per call. Not available on Windows
+"""
+
+
+class _PixelTimeout(BaseException):
+    """
+    Raised within the function when its time budget is exhausted. Derived
+    from BaseException so that it is not swallowed by ``except Exception``
+    clauses within the function
+    """
+    pass
+
+
+class TimedOut(object):
+    """
+    Placeholder returned instead of the result for a position whose
+    computation exceeded its time budget
+    """
+
+    def __eq__(self, other):
+        return isinstance(other, TimedOut)
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def __hash__(self):
+        return hash(TimedOut)
+
+    def __repr__(self):
+        return 'TimedOut()'
+
+
+class TimeLimitedFunction(object):
+    """
+    Wraps a function such that calls exceeding a time budget are interrupted
+    and return a :class:`~pyUSID.processing.timeouts.TimedOut` object
+    instead. Calls are interrupted via the SIGALRM signal, so the function
+    can only be called from the main thread of a process on platforms that
+    support interval timers (not Windows). Any handler of SIGALRM and any
+    timer set before a call are restored afterwards. A timer that expires
+    during the call is delivered right after the call. Functions spending a
+    long time within a single call to compiled code are only interrupted
+    once that call returns. Objects of this class can be pickled and sent to
+    worker processes as long as the wrapped function can.
+    """
+
+    def __init__(self, func, timeout):
+        """
+        Parameters
+        ----------
+        func : callable
+            Function to limit
+        timeout : float
+            Time budget per call in seconds
+        """
+        if not callable(func):
+            raise TypeError('func should be callable')
+        if not isinstance(timeout, Number) or isinstance(timeout, bool):
+            raise TypeError('timeout should be a number')
+        if timeout <= 0:
+            raise ValueError('timeout should be a positive number of seconds')
+        if not HAS_TIMERS:
+            raise NotImplementedError('Time limits require interval timers, which are not available on this platform')
+        self.func = func
+        self.timeout = float(timeout)
+
+    def __eq__(self, other):
+        return isinstance(other, TimeLimitedFunction) and self.func == other.func and \
+            self.timeout == other.timeout
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def __hash__(self):
+        return hash((self.func, self.timeout))
+
+    def __call__(self, *args, **kwargs):
+        if threading.current_thread() is not threading.main_thread():
+            raise RuntimeError('Time limits are enforced via signals, which can only be handled in the main thread. '
+                               'Call {} from the main thread of a process'.format(self))
+
+        # Holds the result once the function returns so that a timer expiring before it is disarmed is ignored
+        outcome = {}
+
+        def _on_alarm(signum, frame):
+            if 'result' not in outcome:
+                raise _PixelTimeout()
+
+        t_start = tm.time()
+        prev_handler = signal.signal(signal.SIGALRM, _on_alarm)
+        prev_delay, prev_interval = signal.getitimer(signal.ITIMER_REAL)
+        try:
+            signal.setitimer(signal.ITIMER_REAL, self.timeout)
+            try:
+                outcome['result'] = self.func(*args, **kwargs)
+            finally:
+                signal.setitimer(signal.ITIMER_REAL, 0)
+        except _PixelTimeout:
+            if 'result' not in outcome:
+                return TimedOut()
+        finally:
+            signal.signal(signal.SIGALRM, prev_handler)
+            if prev_delay > 0:
+                # Setting a delay of 0 would disarm rather than fire a timer that expired in the meantime
+                signal.setitimer(signal.ITIMER_REAL, max(prev_delay - (tm.time() - t_start), 1E-6), prev_interval)
+        return outcome['result']
+
+    def __repr__(self):
+        return 'TimeLimitedFunction({!r}, {})'.format(self.func, self.timeout)
@@ -0,0 +1,449 @@
+# -*- coding: utf-8 -*-
+"""
+:class:`~pyUSID.processing.workers.WorkerPool` - A pool of worker processes that is kept alive across several batches
+of computation
+
+:class:`~pyUSID.processing.workers.SharedArray` - A numpy array whose memory is shared with worker processes
+
+Created on Sun Oct 18 2026
+
+@author: Suhas Somnath, Chris Smith
+"""
+
+from __future__ import division, print_function, unicode_literals, \
+    absolute_import
+import os
+import sys
+import tempfile
+import multiprocessing
+import numpy as np
+
+try:
+    from multiprocessing import shared_memory, resource_tracker
+except ImportError:
+    # Python < 3.8. Arrays will be shared via memory-mapped files instead
+    shared_memory = None
+
+# Python >= 3.13 can attach to shared memory without registering it with the resource tracker
+_ATTACH_UNTRACKED = sys.version_info >= (3, 13)
+# The resource tracker is only used for POSIX shared memory
+_TRACKED = shared_memory is not None and os.name == 'posix' and not _ATTACH_UNTRACKED
+
+# Function and constant arguments held by each worker process
+_worker_state = None
+# Shared arrays that the worker process is attached to, keyed by their name
+_attached_arrays = dict()
+# Whether this process shares the resource tracker of the process that allocates the shared arrays
+_shares_tracker = False
+# Names of the shared memory allocated by this process
+_allocated_names = set()
+
+
+def _init_worker(func, func_args, func_kwargs, shares_tracker=False):
+    """
+    Stores the function and its constant arguments within the worker
+    process so that they need not be sent along with every position
+
+    Parameters
+    ----------
+    func : callable
+        Function that will be mapped to the data
+    func_args : list
+        Arguments to the function
+    func_kwargs : dict
+        Keyword arguments to the function
+    shares_tracker : bool, optional. Default = False
+        Whether the worker process shares the resource tracker of the parent
+        process
+    """
+    global _worker_state, _shares_tracker
+    _worker_state = (func, func_args, func_kwargs)
+    _shares_tracker = shares_tracker
+
+
+def _apply_in_worker(item):
+    """
+    Applies the function stored within the worker process to a single item
+
+    Parameters
+    ----------
+    item : object
+        Data for a single position
+
+    Returns
+    -------
+    object
+        Result of the function
+    """
+    func, func_args, func_kwargs = _worker_state
+    return func(item, *func_args, **func_kwargs)
+
+
+def _get_attached_array(descriptor):
+    """
+    Returns the array shared by the parent process for the provided
+    descriptor, attaching to it only if this was not done already
+
+    Parameters
+    ----------
+    descriptor : tuple
+        Descriptor of a :class:`SharedArray`
+
+    Returns
+    -------
+    array : :class:`numpy.ndarray`
+        View of the shared memory
+    """
+    name = descriptor[0]
+    if name not in _attached_arrays:
+        if len(_attached_arrays) > 3:
+            # The parent process has likely moved on to other (larger) arrays
+            for shared_array in _attached_arrays.values():
+                shared_array.close()
+            _attached_arrays.clear()
+        _attached_arrays[name] = SharedArray.attach(descriptor)
+    return _attached_arrays[name].array
+
+
+def _apply_to_shared_rows(task):
+    """
+    Applies the function stored within the worker process to a range of rows
+    of the shared input array and writes the results into the same rows of
+    the shared output array
+
+    Parameters
+    ----------
+    task : tuple
+        Descriptors of the input and output arrays, the first and last rows
+        (exclusive) to compute, and whether the function operates on several
+        rows at once
+    """
+    in_desc, out_desc, start, stop, batched = task
+    func, func_args, func_kwargs = _worker_state
+    _compute_rows(func, func_args, func_kwargs, _get_attached_array(in_desc),
+                  _get_attached_array(out_desc), start, stop, batched)
+
+
+def _compute_rows(func, func_args, func_kwargs, data, out, start, stop,
+                  batched):
+    """
+    Applies the function to a range of rows of the data and writes the
+    results into the same rows of the output array
+
+    Parameters
+    ----------
+    func : callable
+        Function to apply
+    func_args : list
+        Arguments to the function
+    func_kwargs : dict
+        Keyword arguments to the function
+    data : :class:`numpy.ndarray`
+        Input array
+    out : :class:`numpy.ndarray`
+        Output array
+    start : uint
+        First row to compute
+    stop : uint
+        Row (exclusive) until which to compute
+    batched : bool
+        Whether the function operates on several rows at once instead of one
+    """
+    if batched:
+        results = np.asarray(func(data[start: stop], *func_args, **func_kwargs))
+        if results.ndim == 0 or results.shape[0] != stop - start:
+            raise ValueError('The function returned {} results for {} positions'
+                             '.'.format(results.shape[0] if results.ndim > 0 else 1, stop - start))
+        out[start: stop] = results
+    else:
+        for row in range(start, stop):
+            out[row] = func(data[row], *func_args, **func_kwargs)
+
+
+class SharedArray(object):
+    """
+    A numpy array backed by shared memory (or a memory-mapped file for
+    Python < 3.8) that worker processes can attach to by name. Data placed
+    in this array is therefore not copied when handing it off to workers.
+    """
+
+    def __init__(self, shape, dtype, name=None):
+        """
+        Parameters
+        ----------
+        shape : tuple
+            Shape of the array
+        dtype : :class:`numpy.dtype`
+            Data type of the array
+        name : str, optional
+            Name of existing shared memory to attach to. By default, new
+            shared memory is allocated. Use :meth:`attach` instead of
+            providing this argument
+        """
+        self.shape = tuple([int(dim) for dim in shape])
+        self.dtype = np.dtype(dtype)
+        nbytes = max(1, int(np.prod(self.shape)) * self.dtype.itemsize)
+        self.__owner = name is None
+        self.__shm = None
+        if shared_memory is not None:
+            if self.__owner:
+                self.__shm = shared_memory.SharedMemory(create=True, size=nbytes)
+                _allocated_names.add(self.__shm.name)
+            elif _ATTACH_UNTRACKED:
+                self.__shm = shared_memory.SharedMemory(name=name, track=False)
+            else:
+                self.__shm = shared_memory.SharedMemory(name=name)
+                if _TRACKED and not _shares_tracker and name not in _allocated_names:
+                    # Attaching registers the memory with the resource tracker, which would then release it when
+                    # this process exits even though the memory belongs to another process (Python issue 39959).
+                    # Registering again with a shared tracker has no effect and must not be undone
+                    resource_tracker.unregister(self.__shm._name, 'shared_memory')
+            self.name = self.__shm.name
+            self.array = np.ndarray(self.shape, dtype=self.dtype, buffer=self.__shm.buf)
+        else:
+            if self.__owner:
+                file_handle, name = tempfile.mkstemp(prefix='pyUSID_shared_', suffix='.dat')
+                os.close(file_handle)
+            self.name = name
+            self.array = np.memmap(name, dtype=self.dtype, shape=self.shape,
+                                   mode='w+' if self.__owner else 'r+')
+
+    @classmethod
+    def attach(cls, descriptor):
+        """
+        Attaches to an array shared by another process
+
+        Parameters
+        ----------
+        descriptor : tuple
+            Value of :attr:`descriptor` of the shared array
+
+        Returns
+        -------
+        :class:`SharedArray`
+        """
+        name, shape, dtype = descriptor
+        return cls(shape, dtype, name=name)
+
+    @property
+    def descriptor(self):
+        """
+        Small, picklable description that other processes can use to attach
+        to this array
+
+        Returns
+        -------
+        tuple
+        """
+        return self.name, self.shape, self.dtype.str
+
+    def close(self):
+        """
+        Detaches this process from the shared memory. The array can no longer
+        be used by this process. The process that allocated the memory also
+        releases it
+        """
+        if self.array is None:
+            return
+        self.array = None
+        if self.__shm is not None:
+            try:
+                self.__shm.close()
+            except BufferError:
+                # Views of the array still exist. The memory is unmapped once they are garbage collected
+                pass
+            if self.__owner:
+                self.__shm.unlink()
+                _allocated_names.discard(self.name)
+        elif self.__owner and os.path.exists(self.name):
+            os.remove(self.name)
+
+
+class WorkerPool(object):
+    """
+    A pool of worker processes that is started once and reused for mapping
+    the same function to several batches of data. The function and its
+    constant arguments (e.g. models, lookup tables) are shipped to each
+    worker only once when the pool is started, so only the data itself needs
+    to be sent to the workers for each batch.
+    """
+
+    def __init__(self, func, cores=1, func_args=None, func_kwargs=None,
+                 verbose=False):
+        """
+        Parameters
+        ----------
+        func : callable
+            Function to map to the first axis of the data
+        cores : uint, optional. Default = 1
+            Number of worker processes. No processes are started if this is 1
+            and the function will be computed serially instead
+        func_args : list, optional
+            Arguments to be passed to the function
+        func_kwargs : dict, optional
+            Keyword arguments to be passed to the function
+        verbose : bool, optional. Default = False
+            Whether or not to print statements that aid in debugging
+        """
+        if not callable(func):
+            raise TypeError('Function argument is not callable')
+        if not isinstance(cores, int):
+            raise TypeError('cores should be an integer')
+        if cores < 1:
+            raise ValueError('cores should be at least 1')
+        if func_args is None:
+            func_args = list()
+        else:
+            if isinstance(func_args, tuple):
+                func_args = list(func_args)
+            if not isinstance(func_args, list):
+                raise TypeError('Arguments to the mapped function should be '
+                                'specified as a list')
+        if func_kwargs is None:
+            func_kwargs = dict()
+        else:
+            if not isinstance(func_kwargs, dict):
+                raise TypeError('Keyword arguments to the mapped function '
+                                'should be specified via a dictionary')
+
+        self.func = func
+        self.func_args = func_args
+        self.func_kwargs = func_kwargs
+        self.cores = cores
+        self.verbose = verbose
+        self.__pool = None
+
+        if self.cores > 1:
+            if _TRACKED:
+                # Workers inherit a resource tracker that is already running
+                resource_tracker.ensure_running()
+            self.__pool = multiprocessing.Pool(processes=self.cores,
+                                               initializer=_init_worker,
+                                               initargs=(func, func_args,
+                                                         func_kwargs, _TRACKED))
+            if self.verbose:
+                print('Started a pool of {} worker processes'.format(self.cores))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.terminate()
+
+    def matches(self, func, func_args=None, func_kwargs=None):
+        """
+        Checks whether this pool was started for the provided function and
+        the very same (not merely equal) arguments
+
+        Parameters
+        ----------
+        func : callable
+            Function to map to the data
+        func_args : list, optional
+            Arguments to be passed to the function
+        func_kwargs : dict, optional
+            Keyword arguments to be passed to the function
+
+        Returns
+        -------
+        bool
+            Whether or not this pool can be reused for the provided function
+        """
+        func_args = list() if func_args is None else list(func_args)
+        func_kwargs = dict() if func_kwargs is None else func_kwargs
+        if func is not self.func and func != self.func:
+            return False
+        if len(func_args) != len(self.func_args) or \
+                set(func_kwargs.keys()) != set(self.func_kwargs.keys()):
+            return False
+        if not all([new is old for new, old in zip(func_args, self.func_args)]):
+            return False
+        return all([func_kwargs[key] is self.func_kwargs[key] for key in func_kwargs.keys()])
+
+    def map(self, data):
+        """
+        Maps the function to each element along the first axis of the data
+
+        Parameters
+        ----------
+        data : array-like
+            Data to map the function to
+
+        Returns
+        -------
+        results : list
+            List of computational results
+        """
+        if self.__pool is None:
+            if self.cores > 1:
+                raise ValueError('This pool of workers has already been shut down')
+            return [self.func(item, *self.func_args, **self.func_kwargs) for item in data]
+
+        return self.__pool.map(_apply_in_worker, data)
+
+    def map_shared(self, data, out, num_rows=None, batched=False):
+        """
+        Maps the function to rows of data in shared memory and writes the
+        results into shared memory as well. Only the names of the shared
+        arrays and ranges of rows are sent to the workers
+
+        Parameters
+        ----------
+        data : :class:`SharedArray`
+            Input array with one row per position
+        out : :class:`SharedArray`
+            Preallocated output array with one row per position
+        num_rows : uint, optional
+            Number of (leading) rows of the arrays to compute. Default - all
+        batched : bool, optional. Default = False
+            Whether the function operates on several rows at once (e.g.
+            :meth:`~pyUSID.processing.process.Process._map_batch`) or one row
+            at a time
+        """
+        for arg, arg_name in zip([data, out], ['data', 'out']):
+            if not isinstance(arg, SharedArray):
+                raise TypeError('{} should be a SharedArray'.format(arg_name))
+        if num_rows is None:
+            num_rows = data.shape[0]
+        if num_rows > data.shape[0] or num_rows > out.shape[0]:
+            raise ValueError('The shared arrays have fewer than {} rows'.format(num_rows))
+
+        if self.__pool is None:
+            if self.cores > 1:
+                raise ValueError('This pool of workers has already been shut down')
+            _compute_rows(self.func, self.func_args, self.func_kwargs, data.array,
+                          out.array, 0, num_rows, batched)
+            return
+
+        bounds = np.linspace(0, num_rows, min(self.cores, max(1, num_rows)) + 1).astype(int)
+        tasks = [(data.descriptor, out.descriptor, start, stop, batched)
+                 for start, stop in zip(bounds[:-1], bounds[1:]) if stop > start]
+        _ = self.__pool.map(_apply_to_shared_rows, tasks)
+
+    def close(self):
+        """
+        Shuts down the worker processes after they finish any pending work
+        """
+        if self.__pool is None:
+            return
+        self.__pool.close()
+        self.__pool.join()
+        self.__pool = None
+        if self.verbose:
+            print('Shut down the pool of worker processes')
+
+    def terminate(self):
+        """
+        Immediately stops the worker processes. Use this when the computation
+        was interrupted
+        """
+        if self.__pool is None:
+            return
+        self.__pool.terminate()
+        self.__pool.join()
+        self.__pool = None
+        if self.verbose:
+            print('Terminated the pool of worker processes')
@@ -18,6 +18,7 @@ requirements = ['numpy>=1.10',
                 'h5py>=2.6.0',
                 'pillow',  # Remove once ImageReader is in ScopeReaders
                 'psutil',
+                'joblib',
                 'six',
                 'sidpy>=0.0.2'
                 ]
@@ -60,6 +61,7 @@ setup(
     # https://setuptools.readthedocs.io/en/latest/setuptools.html#declaring-dependencies
     extras_require={
         'MPI':  ["mpi4py"],
+        'export': ["pyarrow", "zarr"],
     },
     # If there are data files included in your packages that need to be
     # installed, specify them here.  If using Python 2.6 or less, then these
@@ -12,6 +12,7 @@ import h5py
 import numpy as np
 import dask.array as da
 import shutil
+from unittest import mock
 
 sys.path.append("../../pyUSID/")
 from pyUSID.io import hdf_utils, write_utils, USIDataset
@@ -112,6 +113,197 @@ class TestGetSortOrder(TestModel):
                 self.assertTrue(np.all(exp_order == hdf_utils.get_sort_order(h5_dset)))
 
 
+class TestBlockwiseScan(unittest.TestCase):
+
+    def setUp(self):
+        self.file_path = 'test_blockwise_scan.h5'
+        # 3 x 4 x 5 positions. Slowest dimension first. The middle dimension repeats a value across chunks
+        inds = np.array(np.meshgrid(np.arange(3), [0, 0, 1, 2], np.arange(5), indexing='ij'))
+        self.pos_inds = np.transpose(inds.reshape(3, -1)[::-1])
+        self.h5_file = h5py.File(self.file_path, mode='w')
+        self.h5_pos = self.h5_file.create_dataset('Position_Indices', data=self.pos_inds, chunks=(7, 3))
+        self.h5_spec = self.h5_file.create_dataset('Spectroscopic_Indices', data=np.transpose(self.pos_inds),
+                                                   chunks=(3, 7))
+
+    def tearDown(self):
+        # Stale handles outliving the file could release identifiers that HDF5 has since reused
+        del self.h5_pos, self.h5_spec
+        self.h5_file.close()
+        os.remove(self.file_path)
+
+    def test_many_blocks(self):
+        # A few chunks per block
+        with mock.patch('pyUSID.io.hdf_utils.model.ANC_BLOCK_BYTES', 2 * 7 * 3 * 8):
+            for h5_dset in [self.h5_pos, self.h5_spec]:
+                self.assertEqual(hdf_utils.get_dimensionality(h5_dset), [5, 3, 3])
+                self.assertEqual(hdf_utils.get_sort_order(h5_dset).tolist(), [0, 1, 2])
+            self.assertEqual(hdf_utils.describe_anc_dset(self.h5_pos, False), ([5, 3, 3], [0, 1, 2]))
+
+    def test_matches_in_memory(self):
+        with mock.patch('pyUSID.io.hdf_utils.model.ANC_BLOCK_BYTES', 8):
+            blockwise = (hdf_utils.get_dimensionality(self.h5_pos), hdf_utils.get_sort_order(self.h5_pos).tolist())
+        self.assertEqual(blockwise, (hdf_utils.get_dimensionality(self.pos_inds),
+                                     hdf_utils.get_sort_order(self.pos_inds).tolist()))
+
+    def test_blocks_span_chunks(self):
+        blocks = list(hdf_utils.model._iter_anc_blocks(self.h5_pos, 0, max_bytes=100))
+        self.assertEqual([block.shape for block in blocks],
+                         [(3, 7)] * 8 + [(3, 4)])
+        self.assertTrue(np.array_equal(np.hstack(blocks), np.transpose(self.pos_inds)))
+
+
+class TestSlicePlanning(TestModel):
+
+    def test_flat_strides(self):
+        self.assertEqual(hdf_utils.get_flat_strides([5, 3], [0, 1]).tolist(), [1, 5])
+        self.assertEqual(hdf_utils.get_flat_strides([5, 3, 2], [1, 2, 0]).tolist(), [6, 1, 3])
+
+    def test_regular(self):
+        with h5py.File(data_utils.std_beps_path, mode='r') as h5_f:
+            self.assertTrue(hdf_utils.is_regular_anc_dset(h5_f['/Raw_Measurement/Position_Indices'], False))
+            self.assertTrue(hdf_utils.is_regular_anc_dset(h5_f['/Raw_Measurement/Spectroscopic_Indices'], True))
+            # Slowest dimension first
+            self.assertTrue(hdf_utils.is_regular_anc_dset(np.fliplr(h5_f['/Raw_Measurement/Position_Indices']),
+                                                          False))
+            pos_inds = h5_f['/Raw_Measurement/Position_Indices'][()]
+        # Positions out of order
+        self.assertFalse(hdf_utils.is_regular_anc_dset(pos_inds[::-1], False))
+        # Index values that do not start from 0
+        self.assertFalse(hdf_utils.is_regular_anc_dset(pos_inds + 1, False))
+        # Missing positions
+        self.assertFalse(hdf_utils.is_regular_anc_dset(pos_inds[:-1], False))
+
+    def test_sparse_not_regular(self):
+        with h5py.File(data_utils.sparse_sampling_path, mode='r') as h5_f:
+            h5_main = h5_f['/Measurement_000/Channel_000/Raw_Data']
+            h5_pos_inds = h5_f[h5_main.attrs['Position_Indices']]
+            self.assertFalse(hdf_utils.is_regular_anc_dset(h5_pos_inds, False))
+
+    def test_flat_indices(self):
+        flat = hdf_utils.get_flat_indices([1, 5], [[3, 0], [2]])
+        self.assertEqual(flat.tolist(), [[13], [10]])
+        self.assertEqual(hdf_utils.get_flat_indices([], []).tolist(), 0)
+        with self.assertRaises(ValueError):
+            _ = hdf_utils.get_flat_indices([1, 5], [[3]])
+
+    def test_contiguous_slices(self):
+        self.assertEqual(hdf_utils.get_contiguous_slices([2, 3, 4, 7, 9, 10]),
+                         [slice(2, 5), slice(7, 8), slice(9, 11)])
+        self.assertEqual(hdf_utils.get_contiguous_slices([]), [])
+
+
+class TestDescribeAncDset(TestModel):
+
+    def test_matches_separate_functions(self):
+        with h5py.File(data_utils.std_beps_path, mode='r') as h5_f:
+            for path, is_spec in [('/Raw_Measurement/Spectroscopic_Indices', True),
+                                  ('/Raw_Measurement/source_main-Fitter_000/Spectroscopic_Indices', True),
+                                  ('/Raw_Measurement/Position_Indices', False)]:
+                h5_dset = h5_f[path]
+                sizes, sort_order = hdf_utils.describe_anc_dset(h5_dset, is_spec)
+                self.assertEqual(sizes, hdf_utils.get_dimensionality(h5_dset))
+                self.assertEqual(sort_order, list(hdf_utils.get_sort_order(h5_dset)))
+
+    def test_reversed(self):
+        with h5py.File(data_utils.std_beps_path, mode='r') as h5_f:
+            sizes, sort_order = hdf_utils.describe_anc_dset(np.fliplr(h5_f['/Raw_Measurement/Position_Indices']),
+                                                            False)
+            self.assertEqual(sizes, [3, 5])
+            self.assertEqual(sort_order, [1, 0])
+
+    def test_not_hdf_dset(self):
+        for obj in [15, 'srds']:
+            with self.assertRaises(TypeError):
+                _ = hdf_utils.describe_anc_dset(obj, True)
+
+
+class TestGetDimDescriptor(TestModel):
+
+    def test_read_only(self):
+        with h5py.File(data_utils.std_beps_path, mode='r') as h5_f:
+            h5_main = h5_f['/Raw_Measurement/source_main']
+            descriptor = hdf_utils.get_dim_descriptor(h5_main)
+            self.assertEqual(descriptor['Position']['sizes'], [5, 3])
+            self.assertEqual(descriptor['Position']['sort'], [0, 1])
+            self.assertEqual(descriptor['Position']['labels'], ['X', 'Y'])
+            self.assertEqual(descriptor['Spectroscopic']['sizes'], [7, 2])
+            self.assertEqual(descriptor['Spectroscopic']['labels'], ['Bias', 'Cycle'])
+            self.assertFalse(hdf_utils.DIM_DESCRIPTOR_ATTR in h5_main.attrs)
+
+    def test_cached(self):
+        with h5py.File(data_utils.std_beps_path, mode='r+') as h5_f:
+            h5_main = h5_f['/Raw_Measurement/source_main']
+            descriptor = hdf_utils.get_dim_descriptor(h5_main, cache=True)
+            self.assertTrue(hdf_utils.DIM_DESCRIPTOR_ATTR in h5_main.attrs)
+            with mock.patch('pyUSID.io.hdf_utils.model.describe_anc_dset') as describe:
+                self.assertEqual(hdf_utils.get_dim_descriptor(h5_main), descriptor)
+                self.assertEqual(describe.call_count, 0)
+
+    def test_not_cached(self):
+        with h5py.File(data_utils.std_beps_path, mode='r+') as h5_f:
+            h5_main = h5_f['/Raw_Measurement/source_main']
+            # Reading never writes to the file unless asked to
+            _ = hdf_utils.get_dim_descriptor(h5_main)
+            self.assertFalse(hdf_utils.DIM_DESCRIPTOR_ATTR in h5_main.attrs)
+            _ = USIDataset(h5_main)
+            self.assertFalse(hdf_utils.DIM_DESCRIPTOR_ATTR in h5_main.attrs)
+
+    def test_written_with_main(self):
+        pos_dims = [write_utils.Dimension('X', 'nm', 3), write_utils.Dimension('Y', 'nm', 2)]
+        with h5py.File('test_dim_descriptor.h5', mode='w') as h5_f:
+            h5_main = hdf_utils.write_main_dataset(h5_f, np.zeros((6, 4)), 'Main', 'Current', 'A', pos_dims,
+                                                   write_utils.Dimension('Bias', 'V', 4))
+            self.assertTrue(hdf_utils.DIM_DESCRIPTOR_ATTR in h5_main.attrs)
+            with mock.patch('pyUSID.io.hdf_utils.model.describe_anc_dset') as describe:
+                descriptor = hdf_utils.get_dim_descriptor(h5_main)
+                self.assertEqual(describe.call_count, 0)
+            self.assertEqual(dict(zip(descriptor['Position']['labels'], descriptor['Position']['sizes'])),
+                             {'X': 3, 'Y': 2})
+            self.assertTrue(descriptor['Position']['regular'])
+            del h5_main
+        os.remove('test_dim_descriptor.h5')
+
+    def test_invalidated_by_changes(self):
+        with h5py.File(data_utils.std_beps_path, mode='r+') as h5_f:
+            h5_main = h5_f['/Raw_Measurement/source_main']
+            _ = hdf_utils.get_dim_descriptor(h5_main, cache=True)
+            h5_pos_inds = h5_f['/Raw_Measurement/Position_Indices']
+            hdf_utils.write_simple_attrs(h5_pos_inds, {'labels': ['Col', 'Row'], 'units': ['um', 'um']})
+            descriptor = hdf_utils.get_dim_descriptor(h5_main, cache=True)
+            self.assertEqual(descriptor['Position']['labels'], ['Col', 'Row'])
+
+            # Positions now visited in the transposed order
+            h5_pos_inds[()] = np.fliplr(h5_pos_inds[()])
+            descriptor = hdf_utils.get_dim_descriptor(h5_main)
+            self.assertEqual(descriptor['Position']['sizes'], [3, 5])
+            self.assertEqual(descriptor['Position']['sort'], [1, 0])
+
+    def test_middle_rows_not_read(self):
+        with h5py.File(data_utils.std_beps_path, mode='r+') as h5_f:
+            h5_main = h5_f['/Raw_Measurement/source_main']
+            descriptor = hdf_utils.get_dim_descriptor(h5_main, cache=True)
+            # Only the entries between the first and last positions are swapped
+            h5_pos_inds = h5_f['/Raw_Measurement/Position_Indices']
+            pos_inds = h5_pos_inds[()]
+            h5_pos_inds[1:3] = pos_inds[[2, 1]]
+            self.assertEqual(hdf_utils.get_dim_descriptor(h5_main), descriptor)
+            # Analyzed again once the cached descriptor is removed
+            del h5_main.attrs[hdf_utils.DIM_DESCRIPTOR_ATTR]
+            self.assertFalse(hdf_utils.get_dim_descriptor(h5_main)['Position']['regular'])
+
+    def test_unreadable_cache(self):
+        with h5py.File(data_utils.std_beps_path, mode='r+') as h5_f:
+            h5_main = h5_f['/Raw_Measurement/source_main']
+            h5_main.attrs[hdf_utils.DIM_DESCRIPTOR_ATTR] = 'not json'
+            with self.assertWarns(UserWarning):
+                descriptor = hdf_utils.get_dim_descriptor(h5_main)
+            self.assertEqual(descriptor['Position']['sizes'], [5, 3])
+
+    def test_not_hdf_dset(self):
+        with self.assertRaises(TypeError):
+            _ = hdf_utils.get_dim_descriptor(np.arange(5))
+
+
 class TestGetUnitValues(TestModel):
 
     def test_source_spec_all(self):
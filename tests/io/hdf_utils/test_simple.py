@@ -11,6 +11,8 @@ import sys
 import h5py
 import numpy as np
 import shutil
+import json
+from unittest.mock import patch
 
 sys.path.append("../../pyUSID/")
 from pyUSID.io import hdf_utils, Dimension, USIDataset
@@ -746,6 +748,130 @@ class TestCheckForOld(TestSimple):
             self.assertIsInstance(ret_val, list)
             self.assertEqual(len(ret_val), 0)
 
+    def test_registered_exact_match(self):
+        attrs = {'att_1': 'string_val', 'att_2': 1.2345,
+                 'att_3': [1, 2, 3, 4], 'att_4': ['str_1', 'str_2', 'str_3']}
+        with h5py.File(data_utils.std_beps_path, mode='r+') as h5_f:
+            h5_main = h5_f['/Raw_Measurement/source_main']
+            h5_grp = h5_f['/Raw_Measurement/source_main-Fitter_000']
+            hdf_utils.register_results_group(h5_grp, attrs)
+            # Types and order of parameters do not matter
+            attrs = {'att_4': ('str_1', 'str_2', 'str_3'), 'att_1': 'string_val',
+                     'att_3': np.arange(1, 5), 'att_2': 1.2345}
+            [h5_ret_grp] = hdf_utils.check_for_old(h5_main, 'Fitter',
+                                                   new_parms=attrs,
+                                                   target_dset=None)
+            self.assertEqual(h5_ret_grp, h5_grp)
+
+    def test_registered_subset_match(self):
+        attrs = {'att_1': 'string_val', 'att_2': 1.2345,
+                 'att_3': [1, 2, 3, 4], 'att_4': ['str_1', 'str_2', 'str_3']}
+        with h5py.File(data_utils.std_beps_path, mode='r+') as h5_f:
+            h5_main = h5_f['/Raw_Measurement/source_main']
+            h5_grp = h5_f['/Raw_Measurement/source_main-Fitter_000']
+            hdf_utils.register_results_group(h5_grp, attrs)
+            _ = attrs.pop('att_1')
+            # Hashes differ so the attributes are compared as for unregistered groups
+            [h5_ret_grp] = hdf_utils.check_for_old(h5_main, 'Fitter',
+                                                   new_parms=attrs, target_dset=None)
+            self.assertEqual(h5_ret_grp, h5_grp)
+
+    def test_registered_found_without_comparing(self):
+        attrs = {'att_1': 'string_val', 'att_2': 1.2345}
+        with h5py.File(data_utils.std_beps_path, mode='r+') as h5_f:
+            h5_main = h5_f['/Raw_Measurement/source_main']
+            h5_grp = h5_f['/Raw_Measurement/source_main-Fitter_001']
+            hdf_utils.register_results_group(h5_grp, attrs)
+            with patch('pyUSID.io.hdf_utils.simple.check_for_matching_attrs',
+                       return_value=False) as mock_compare:
+                [h5_ret_grp] = hdf_utils.check_for_old(h5_main, 'Fitter', new_parms=attrs)
+            # Only the unregistered group is compared
+            self.assertEqual([call[0][0].name for call in mock_compare.call_args_list],
+                             ['/Raw_Measurement/source_main-Fitter_000'])
+            self.assertEqual(h5_ret_grp, h5_grp)
+
+    def test_registered_with_legacy_match(self):
+        attrs = {'att_1': 'string_val'}
+        with h5py.File(data_utils.std_beps_path, mode='r+') as h5_f:
+            h5_main = h5_f['/Raw_Measurement/source_main']
+            # Fitter_000 also has att_1 = 'string_val' but was never registered
+            hdf_utils.register_results_group(h5_f['/Raw_Measurement/source_main-Fitter_001'], attrs)
+            ret_val = hdf_utils.check_for_old(h5_main, 'Fitter', new_parms=attrs)
+            self.assertEqual(sorted([group.name for group in ret_val]),
+                             ['/Raw_Measurement/source_main-Fitter_000', '/Raw_Measurement/source_main-Fitter_001'])
+
+    def test_registered_empty_parms(self):
+        with h5py.File(data_utils.std_beps_path, mode='r+') as h5_f:
+            h5_main = h5_f['/Raw_Measurement/source_main']
+            hdf_utils.register_results_group(h5_f['/Raw_Measurement/source_main-Fitter_001'], {})
+            # Every results group matches empty parameters
+            ret_val = hdf_utils.check_for_old(h5_main, 'Fitter')
+            self.assertEqual(len(ret_val), 2)
+
+    def test_registered_and_legacy_groups(self):
+        attrs = {'att_1': 'other_string_val', 'att_2': 5.4321,
+                 'att_3': [4, 1, 3], 'att_4': ['s', 'str_2', 'str_3']}
+        with h5py.File(data_utils.std_beps_path, mode='r+') as h5_f:
+            h5_main = h5_f['/Raw_Measurement/source_main']
+            # Fitter_001 remains a legacy group whose attributes are compared
+            hdf_utils.register_results_group(h5_f['/Raw_Measurement/source_main-Fitter_000'],
+                                             {'att_1': 'string_val'})
+            [h5_ret_grp] = hdf_utils.check_for_old(h5_main, 'Fitter',
+                                                   new_parms=attrs,
+                                                   target_dset=None)
+            self.assertEqual(h5_ret_grp, h5_f['/Raw_Measurement/source_main-Fitter_001'])
+
+
+class TestRegisterResultsGroup(TestSimple):
+
+    def test_index(self):
+        with h5py.File(data_utils.std_beps_path, mode='r+') as h5_f:
+            h5_parent = h5_f['/Raw_Measurement']
+            h5_grp_0 = h5_parent['source_main-Fitter_000']
+            h5_grp_1 = h5_parent['source_main-Fitter_001']
+            hash_0 = hdf_utils.register_results_group(h5_grp_0, {'a': 1})
+            hash_1 = hdf_utils.register_results_group(h5_grp_1, {'a': 1.0})
+            self.assertEqual(hash_0, hash_1)
+            self.assertEqual(h5_grp_0.attrs[hdf_utils.PARMS_HASH_ATTR], hash_0)
+            attr_0 = '{}:source_main-Fitter:{}'.format(hdf_utils.RESULTS_INDEX_ATTR, hash_0)
+            self.assertEqual(json.loads(h5_parent.attrs[attr_0]),
+                             ['source_main-Fitter_000', 'source_main-Fitter_001'])
+            # Registering again does not list the group twice
+            _ = hdf_utils.register_results_group(h5_grp_0, {'a': 1})
+            self.assertEqual(len(json.loads(h5_parent.attrs[attr_0])), 2)
+
+            # Registering again with other parameters moves the group
+            hash_2 = hdf_utils.register_results_group(h5_grp_1, {'a': 2})
+            attr_2 = '{}:source_main-Fitter:{}'.format(hdf_utils.RESULTS_INDEX_ATTR, hash_2)
+            self.assertEqual(json.loads(h5_parent.attrs[attr_0]), ['source_main-Fitter_000'])
+            self.assertEqual(json.loads(h5_parent.attrs[attr_2]), ['source_main-Fitter_001'])
+
+            # Attributes that no longer list any group are removed
+            _ = hdf_utils.register_results_group(h5_grp_0, {'a': 2})
+            self.assertFalse(attr_0 in h5_parent.attrs.keys())
+            self.assertEqual(json.loads(h5_parent.attrs[attr_2]),
+                             ['source_main-Fitter_001', 'source_main-Fitter_000'])
+
+    def test_invalid_types(self):
+        with self.assertRaises(TypeError):
+            _ = hdf_utils.register_results_group('not_a_group', {'a': 1})
+        with self.assertRaises(TypeError):
+            _ = hdf_utils.get_parms_hash(['not', 'a', 'dict'])
+
+
+class TestGetParmsHash(unittest.TestCase):
+
+    def test_equivalent_parms(self):
+        self.assertEqual(hdf_utils.get_parms_hash({'a': [1, 2], 'b': 'x', 'c': None}),
+                         hdf_utils.get_parms_hash({'b': b'x', 'a': np.array([1., 2.])}))
+        self.assertEqual(hdf_utils.get_parms_hash(None), hdf_utils.get_parms_hash({}))
+
+    def test_different_parms(self):
+        self.assertNotEqual(hdf_utils.get_parms_hash({'a': [1, 2]}),
+                            hdf_utils.get_parms_hash({'a': [2, 1]}))
+        self.assertNotEqual(hdf_utils.get_parms_hash({'a': True}),
+                            hdf_utils.get_parms_hash({'a': 'True'}))
+
 
 class TestCreateIndexedGroup(unittest.TestCase):
 
@@ -0,0 +1,239 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 2026
+"""
+from __future__ import division, print_function, unicode_literals, absolute_import
+import unittest
+import os
+import sys
+import json
+import shutil
+import h5py
+import numpy as np
+from sidpy.hdf.hdf_utils import get_attr
+
+sys.path.append("../../pyUSID/")
+from pyUSID.io import USIDataset
+from pyUSID.io import export_utils
+
+from . import data_utils
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+try:
+    import zarr
+except ImportError:
+    zarr = None
+
+
+class TestExportBEPS(unittest.TestCase):
+
+    def setUp(self):
+        data_utils.make_beps_file()
+        self.h5_file = h5py.File(data_utils.std_beps_path, mode='r')
+        h5_grp = self.h5_file['/Raw_Measurement/']
+        self.h5_source = USIDataset(h5_grp['source_main'])
+        self.h5_compound = USIDataset(h5_grp['source_main-Fitter_000/results_main'])
+        self.h5_complex = USIDataset(h5_grp['source_main-Fitter_001/results_main'])
+        self.out_paths = []
+
+    def tearDown(self):
+        del self.h5_source, self.h5_compound, self.h5_complex
+        self.h5_file.close()
+        os.remove(data_utils.std_beps_path)
+        for path in self.out_paths:
+            if os.path.isdir(path):
+                shutil.rmtree(path)
+            elif os.path.exists(path):
+                os.remove(path)
+
+    def get_expected_columns(self, h5_main):
+        # Built from the entire dataset at once
+        num_pos, num_steps = h5_main.shape
+        expected = {'position_index': np.repeat(np.arange(num_pos), num_steps),
+                    'spectroscopic_index': np.tile(np.arange(num_steps), num_pos)}
+        pos_vals = h5_main.h5_pos_vals[()]
+        for index, label in enumerate(get_attr(h5_main.h5_pos_inds, 'labels')):
+            expected[label] = pos_vals[expected['position_index'], index]
+        spec_vals = h5_main.h5_spec_vals[()]
+        for index, label in enumerate(get_attr(h5_main.h5_spec_inds, 'labels')):
+            expected[label] = spec_vals[index, expected['spectroscopic_index']]
+        return expected
+
+
+class TestColumns(TestExportBEPS):
+
+    def test_export_columns(self):
+        columns = export_utils.get_export_columns(self.h5_source)
+        self.assertEqual([name for name, _, _ in columns],
+                         ['position_index', 'spectroscopic_index', 'X', 'Y', 'Bias', 'Cycle', 'value'])
+        self.assertEqual(columns[2][2], {'units': 'nm', 'dimension_type': 'position'})
+        self.assertEqual(columns[4][2], {'units': 'V', 'dimension_type': 'spectroscopic'})
+        self.assertEqual(columns[-1][1], self.h5_source.dtype)
+        self.assertEqual(columns[-1][2], {'quantity': 'Current', 'units': 'A'})
+
+    def test_complex_and_compound_columns(self):
+        columns = export_utils.get_export_columns(self.h5_complex)
+        self.assertEqual([(name, dtype) for name, dtype, _ in columns[-2:]],
+                         [('value_real', np.float64), ('value_imag', np.float64)])
+        columns = export_utils.get_export_columns(self.h5_compound)
+        self.assertEqual([name for name, _, _ in columns[-3:]], list(self.h5_compound.dtype.names))
+
+    def test_block_columns(self):
+        for h5_main in [self.h5_source, self.h5_complex, self.h5_compound]:
+            blocks = [export_utils.get_block_columns(h5_main, start, min(start + 4, h5_main.shape[0]))
+                      for start in range(0, h5_main.shape[0], 4)]
+            names = [name for name, _, _ in export_utils.get_export_columns(h5_main)]
+            self.assertEqual(list(blocks[0].keys()), names)
+            actual = {name: np.concatenate([block[name] for block in blocks]) for name in names}
+            for name, values in self.get_expected_columns(h5_main).items():
+                self.assertTrue(np.allclose(actual[name], values))
+            data = h5_main[()].ravel()
+            if h5_main is self.h5_complex:
+                self.assertTrue(np.allclose(actual['value_real'] + 1j * actual['value_imag'], data))
+            elif h5_main is self.h5_compound:
+                for name in data.dtype.names:
+                    self.assertTrue(np.allclose(actual[name], data[name]))
+            else:
+                self.assertTrue(np.allclose(actual['value'], data))
+
+    def test_block_columns_spec_vals(self):
+        spec_vals = self.h5_source.h5_spec_vals[()]
+        expected = export_utils.get_block_columns(self.h5_source, 3, 7)
+        actual = export_utils.get_block_columns(self.h5_source, 3, 7, spec_vals=spec_vals)
+        for name, values in expected.items():
+            self.assertTrue(np.array_equal(actual[name], values))
+
+    def test_invalid_inputs(self):
+        with self.assertRaises(TypeError):
+            _ = export_utils.get_export_columns(self.h5_file['/Raw_Measurement/source_main'])
+        with self.assertRaises(TypeError):
+            _ = export_utils.get_block_columns(np.zeros((5, 5)), 0, 2)
+
+
+class TestBlocks(unittest.TestCase):
+
+    def setUp(self):
+        self.file_path = 'test_export_blocks.h5'
+        self.h5_file = h5py.File(self.file_path, mode='w')
+
+    def tearDown(self):
+        self.h5_file.close()
+        os.remove(self.file_path)
+
+    def test_rows_per_block(self):
+        h5_contig = self.h5_file.create_dataset('contiguous', shape=(100, 10), dtype=np.float64)
+        h5_chunked = self.h5_file.create_dataset('chunked', shape=(100, 10), dtype=np.float64, chunks=(8, 10))
+        self.assertEqual(export_utils.get_rows_per_block(h5_contig, 80, 80 * 30), 30)
+        # Whole chunks where possible
+        self.assertEqual(export_utils.get_rows_per_block(h5_chunked, 80, 80 * 30), 24)
+        self.assertEqual(export_utils.get_rows_per_block(h5_chunked, 80, 80 * 5), 5)
+        # At least one and at most all positions
+        self.assertEqual(export_utils.get_rows_per_block(h5_contig, 80, 10), 1)
+        self.assertEqual(export_utils.get_rows_per_block(h5_contig, 80, 80 * 1000), 100)
+
+    def test_iter_blocks(self):
+        for cores in [1, 3]:
+            results = list(export_utils.iter_blocks(lambda start, stop: (start, stop), 10, 3, cores=cores))
+            self.assertEqual(results, [(0, 3), (3, 6), (6, 9), (9, 10)])
+        with self.assertRaises(TypeError):
+            _ = list(export_utils.iter_blocks('not callable', 10, 3))
+
+
+class TestExports(TestExportBEPS):
+
+    @unittest.skipIf(pa is not None and zarr is not None, 'pyarrow and zarr are installed')
+    def test_missing_packages(self):
+        for method, module in [(self.h5_source.to_arrow, pa), (self.h5_source.to_parquet, pa),
+                               (self.h5_source.to_zarr, zarr)]:
+            if module is not None:
+                continue
+            self.out_paths.append('test_export_missing.out')
+            with self.assertRaises(ImportError):
+                _ = method(output_path=self.out_paths[-1])
+
+    def test_existing_file(self):
+        self.out_paths.append('test_export_existing.parquet')
+        with open(self.out_paths[-1], 'w') as out_file:
+            out_file.write('old')
+        for method in [self.h5_source.to_arrow, self.h5_source.to_parquet, self.h5_source.to_zarr]:
+            with self.assertRaises(FileExistsError):
+                _ = method(output_path=self.out_paths[-1])
+            with self.assertRaises(TypeError):
+                _ = method(output_path=self.out_paths[-1], force='yes')
+
+    def test_existing_directory(self):
+        self.out_paths.append('test_export_existing_dir')
+        os.mkdir(self.out_paths[-1])
+        with open(os.path.join(self.out_paths[-1], 'keep.txt'), 'w') as out_file:
+            out_file.write('keep')
+        # Only Zarr groups are ever removed
+        for method in [self.h5_source.to_csv, self.h5_source.to_parquet, self.h5_source.to_zarr]:
+            with self.assertRaises(IsADirectoryError):
+                _ = method(output_path=self.out_paths[-1], force=True)
+        self.assertTrue(os.path.isfile(os.path.join(self.out_paths[-1], 'keep.txt')))
+
+    @unittest.skipIf(zarr is None, 'zarr is not installed')
+    def test_overwrite_zarr(self):
+        self.out_paths.append('test_export_overwrite.zarr')
+        _ = zarr.open_group(self.out_paths[-1], mode='w').create_dataset('old', shape=(2,))
+        self.h5_source.to_zarr(output_path=self.out_paths[-1], force=True)
+        z_group = zarr.open_group(self.out_paths[-1], mode='r')
+        self.assertFalse('old' in z_group)
+        self.assertTrue(np.allclose(z_group['source_main'][:], self.h5_source[()]))
+
+    def check_table(self, table, h5_main):
+        expected = self.get_expected_columns(h5_main)
+        for name, values in expected.items():
+            self.assertTrue(np.allclose(table.column(name).to_numpy(), values))
+        self.assertTrue(np.allclose(table.column('value').to_numpy(), h5_main[()].ravel()))
+        self.assertEqual(table.schema.field('X').metadata[b'units'], b'nm')
+        self.assertEqual(table.schema.field('value').metadata[b'quantity'], b'Current')
+        self.assertEqual(json.loads(table.schema.metadata[b'position_dimensions'].decode()), ['X', 'Y'])
+
+    @unittest.skipIf(pa is None, 'pyarrow is not installed')
+    def test_arrow(self):
+        self.out_paths.append('test_export.arrow')
+        self.h5_source.to_arrow(output_path=self.out_paths[-1], max_mem_mb=1E-3, cores=2)
+        with pa.memory_map(self.out_paths[-1]) as source:
+            reader = pa.ipc.open_file(source)
+            self.assertGreater(reader.num_record_batches, 1)
+            self.check_table(reader.read_all(), self.h5_source)
+
+    @unittest.skipIf(pa is None, 'pyarrow is not installed')
+    def test_parquet(self):
+        self.out_paths.append('test_export.parquet')
+        self.h5_source.to_parquet(output_path=self.out_paths[-1], max_mem_mb=1E-3, cores=2)
+        self.assertGreater(pq.ParquetFile(self.out_paths[-1]).num_row_groups, 1)
+        self.check_table(pq.read_table(self.out_paths[-1]), self.h5_source)
+
+    @unittest.skipIf(pa is None, 'pyarrow is not installed')
+    def test_parquet_compound(self):
+        self.out_paths.append('test_export_compound.parquet')
+        self.h5_compound.to_parquet(output_path=self.out_paths[-1])
+        table = pq.read_table(self.out_paths[-1])
+        data = self.h5_compound[()].ravel()
+        # Half precision floats are not supported by Parquet
+        self.assertEqual(table.schema.field('g').type, pa.float32())
+        for name in data.dtype.names:
+            self.assertTrue(np.allclose(table.column(name).to_numpy(), data[name]))
+
+    @unittest.skipIf(zarr is None, 'zarr is not installed')
+    def test_zarr(self):
+        self.out_paths.append('test_export.zarr')
+        self.h5_source.to_zarr(output_path=self.out_paths[-1], max_mem_mb=1E-3, cores=2)
+        z_group = zarr.open_group(self.out_paths[-1], mode='r')
+        self.assertTrue(np.allclose(z_group['source_main'][:], self.h5_source[()]))
+        self.assertGreater(z_group['source_main'].nchunks, 1)
+        self.assertEqual(z_group['source_main'].attrs['units'], 'A')
+        for name, h5_anc in [('Position_Values', self.h5_source.h5_pos_vals),
+                             ('Spectroscopic_Indices', self.h5_source.h5_spec_inds)]:
+            self.assertTrue(np.allclose(z_group[name][:], h5_anc[()]))
+            self.assertEqual(z_group[name].attrs['labels'], list(get_attr(h5_anc, 'labels')))
+
+
+if __name__ == '__main__':
+    unittest.main()
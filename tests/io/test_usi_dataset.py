@@ -7,18 +7,20 @@ Created on Tue Nov  3 15:07:16 2017
 from __future__ import division, print_function, unicode_literals, absolute_import
 import unittest
 import os
+import io
 import sys
 import h5py
 import numpy as np
 import dask.array as da
 import matplotlib as mpl
+from unittest import mock
 # Attempting to get things to work for all versions of python on Travis
 mpl.use('Agg')
 from sidpy.hdf.hdf_utils import get_attr
 
 sys.path.append("../../pyUSID/")
 from pyUSID.io import USIDataset
-from pyUSID.io.hdf_utils.model import reshape_to_n_dims, get_dimensionality
+from pyUSID.io.hdf_utils.model import reshape_to_n_dims, get_dimensionality, get_dim_descriptor
 from pyUSID.io.write_utils import Dimension
 
 from . import data_utils
@@ -159,6 +161,25 @@ class TestGetNDimFormExistsReal(TestUSIDatasetReal):
             actual_s2f = usi_dset.get_n_dim_form(lazy=False)
             self.assertTrue(np.allclose(nd_slow_to_fast, actual_s2f))
 
+    def test_sorted_on_open(self):
+        with h5py.File(test_h5_file_path, mode='r') as h5_f:
+            usi_dset = USIDataset(h5_f['/Raw_Measurement/source_main'], sort_dims=True)
+            nd_slow_to_fast, nd_fast_to_slow = self.get_expected_n_dim(h5_f)
+            self.assertTrue(np.allclose(nd_slow_to_fast, usi_dset.get_n_dim_form(lazy=False)))
+            usi_dset.toggle_sorting()
+            self.assertTrue(np.allclose(nd_fast_to_slow, usi_dset.get_n_dim_form(lazy=False)))
+
+    def test_cached_descriptor(self):
+        with h5py.File(test_h5_file_path, mode='r+') as h5_f:
+            _ = get_dim_descriptor(h5_f['/Raw_Measurement/source_main'], cache=True)
+            nd_slow_to_fast, nd_fast_to_slow = self.get_expected_n_dim(h5_f)
+            # Opening does not need to analyze the ancillary datasets
+            with mock.patch('pyUSID.io.hdf_utils.model.describe_anc_dset') as describe:
+                usi_dset = USIDataset(h5_f['/Raw_Measurement/source_main'])
+                self.assertEqual(describe.call_count, 0)
+            self.assertEqual(usi_dset.pos_dim_sizes, [5, 3])
+            self.assertTrue(np.allclose(nd_fast_to_slow, usi_dset.get_n_dim_form(lazy=False)))
+
 
 class TestPosSpecSlicesReal(TestUSIDatasetReal):
 
@@ -313,6 +334,119 @@ class TestGetUnitValuesReal(TestUSIDatasetReal):
                 _ = usi_main.get_spec_values(np.array(5))
 
 
+class TestRegularSlicePlanner(TestUSIDatasetReal):
+
+    slice_dicts = [{'X': 2}, {'Y': 1}, {'X': [3, 0, 3], 'Bias': slice(1, 6, 2)},
+                   {'Y': -1, 'Cycle': 1}, {'X': slice(None, None, -2), 'Bias': np.array([4, 2])},
+                   {'X': 1, 'Y': 2, 'Bias': 0, 'Cycle': 1}, {}]
+
+    def test_matches_n_dim_form(self):
+        with h5py.File(test_h5_file_path, mode='r') as h5_f:
+            usi_main = USIDataset(h5_f['/Raw_Measurement/source_main'])
+            for _ in range(2):
+                for slice_dict in self.slice_dicts:
+                    actual, success = usi_main.slice(slice_dict)
+                    expected, _ = usi_main.slice(slice_dict, lazy=True)
+                    expected = expected.compute()
+                    self.assertTrue(success)
+                    self.assertEqual(actual.shape, expected.shape)
+                    self.assertTrue(np.allclose(actual, expected))
+                usi_main.toggle_sorting()
+
+    def test_pos_spec_slices_match_search(self):
+        with h5py.File(test_h5_file_path, mode='r') as h5_f:
+            usi_main = USIDataset(h5_f['/Raw_Measurement/source_main'])
+            pos_inds = usi_main.h5_pos_inds[()]
+            spec_inds = usi_main.h5_spec_inds[()]
+            pos_slice, spec_slice = usi_main._get_pos_spec_slices({'X': [3, 1], 'Bias': slice(2, 5)})
+            exp_pos = np.argwhere(np.isin(pos_inds[:, 0], [3, 1]))
+            exp_spec = np.argwhere(np.isin(spec_inds[usi_main.spec_dim_labels.index('Bias')], [2, 3, 4]))
+            self.assertTrue(np.array_equal(pos_slice, exp_pos))
+            self.assertTrue(np.array_equal(spec_slice, exp_spec))
+
+    def test_reads_only_selected_positions(self):
+        orig_getitem = h5py.Dataset.__getitem__
+        main_reads = []
+
+        def record_getitem(h5_dset, key):
+            if h5_dset.name == '/Raw_Measurement/source_main':
+                main_reads.append(key)
+            return orig_getitem(h5_dset, key)
+
+        with h5py.File(test_h5_file_path, mode='r') as h5_f:
+            usi_main = USIDataset(h5_f['/Raw_Measurement/source_main'])
+            for slice_dict, exp_rows in [({'Y': 1}, [slice(5, 10)]),
+                                         ({'X': 2}, [slice(2, 3), slice(7, 8), slice(12, 13)])]:
+                for ndim_form in [True, False]:
+                    del main_reads[:]
+                    # Every position in between would otherwise be read and discarded
+                    with mock.patch('pyUSID.io.usi_data.MAX_POSITION_GAP_BYTES', 0):
+                        with mock.patch.object(h5py.Dataset, '__getitem__', record_getitem):
+                            _ = usi_main.slice(slice_dict, ndim_form=ndim_form)
+                    self.assertEqual([key[0] for key in main_reads], exp_rows)
+
+    def test_merges_small_gaps_in_positions(self):
+        orig_getitem = h5py.Dataset.__getitem__
+        main_reads = []
+
+        def record_getitem(h5_dset, key):
+            if h5_dset.name == '/Raw_Measurement/source_main':
+                main_reads.append(key)
+            return orig_getitem(h5_dset, key)
+
+        with h5py.File(test_h5_file_path, mode='r') as h5_f:
+            usi_main = USIDataset(h5_f['/Raw_Measurement/source_main'])
+            # X is the fastest of the 5 x 3 position dimensions
+            slice_dict = {'X': slice(0, 5, 2), 'Cycle': 0}
+            expected, _ = usi_main.slice(slice_dict, lazy=True)
+            # Each position holds 7 bias steps of 8 bytes within the read. Only one position is skipped at a time
+            exp_runs = [slice(0, 1), slice(2, 3), slice(4, 6), slice(7, 8), slice(9, 11), slice(12, 13),
+                        slice(14, 15)]
+            for max_bytes, exp_rows in [(8 * 7, [slice(0, 15)]), (8 * 7 - 1, exp_runs)]:
+                del main_reads[:]
+                with mock.patch('pyUSID.io.usi_data.MAX_POSITION_GAP_BYTES', max_bytes):
+                    with mock.patch.object(h5py.Dataset, '__getitem__', record_getitem):
+                        actual, _ = usi_main.slice(slice_dict)
+                self.assertEqual([key[0] for key in main_reads], exp_rows)
+                self.assertTrue(np.allclose(actual, expected.compute()))
+
+    def test_skips_large_gaps_in_steps(self):
+        orig_getitem = h5py.Dataset.__getitem__
+        main_reads = []
+
+        def record_getitem(h5_dset, key):
+            if h5_dset.name == '/Raw_Measurement/source_main':
+                main_reads.append(key)
+            return orig_getitem(h5_dset, key)
+
+        with h5py.File(test_h5_file_path, mode='r') as h5_f:
+            usi_main = USIDataset(h5_f['/Raw_Measurement/source_main'])
+            # Bias is the fastest of the 7 x 2 spectroscopic dimensions
+            slice_dict = {'Y': 1, 'Bias': [0, 6]}
+            expected, _ = usi_main.slice(slice_dict, lazy=True)
+            for max_gap, exp_cols in [(64, [slice(0, 14)]), (0, [slice(0, 1), slice(6, 8), slice(13, 14)])]:
+                del main_reads[:]
+                with mock.patch('pyUSID.io.usi_data.MAX_HYPERSLAB_GAP', max_gap):
+                    with mock.patch.object(h5py.Dataset, '__getitem__', record_getitem):
+                        actual, _ = usi_main.slice(slice_dict)
+                self.assertEqual([key[1] for key in main_reads], exp_cols)
+                self.assertTrue(np.allclose(actual, expected.compute()))
+
+    def test_ancillary_changed_after_load(self):
+        with h5py.File(test_h5_file_path, mode='r+') as h5_f:
+            h5_main = h5_f['/Raw_Measurement/source_main']
+            usi_main = USIDataset(h5_main)
+            # The first two positions swap places without changing the dimensions
+            h5_pos_inds = h5_f['/Raw_Measurement/Position_Indices']
+            h5_pos_inds[0:2] = h5_pos_inds[()][[1, 0]]
+            exp_pos, exp_spec = USIDataset(h5_main)._get_pos_spec_slices({'X': 0, 'Bias': 1})
+            with self.assertWarns(UserWarning):
+                pos_slice, spec_slice = usi_main._get_pos_spec_slices({'X': 0, 'Bias': 1})
+            self.assertTrue(np.array_equal(pos_slice, exp_pos))
+            self.assertTrue(np.array_equal(spec_slice, exp_spec))
+            self.assertEqual(pos_slice[0, 0], 1)
+
+
 class TestSliceReal(TestUSIDatasetReal):
 
     def test_non_existent_dim(self):
@@ -893,5 +1027,69 @@ class TestCompoundStaticVisualization(unittest.TestCase):
 """
 
 
+class TestToCSV(TestBEPS):
+
+    def setUp(self):
+        super(TestToCSV, self).setUp()
+        self.csv_path = 'test_to_csv.csv'
+
+    def tearDown(self):
+        super(TestToCSV, self).tearDown()
+        for path in [self.csv_path, 'temp.csv']:
+            if os.path.exists(path):
+                os.remove(path)
+
+    @staticmethod
+    def get_expected_lines(usi_main):
+        # Same layout as when the entire dataset was written via numpy.savetxt
+        buffer = io.StringIO()
+        header = [','.join(str(item) for item in row) for row in usi_main.h5_spec_vals]
+        header.append(','.join('-' * 62 for _ in range(usi_main.shape[1])))
+        np.savetxt(buffer, usi_main[()], delimiter=',', header='\n'.join(header), comments='')
+        left = [','.join('' for _ in usi_main.pos_dim_labels) + str(desc) + ','
+                for desc in usi_main.spec_dim_descriptors]
+        left.append(','.join(usi_main.pos_dim_descriptors) + ',')
+        left += [','.join(str(item) for item in row) + ',' for row in usi_main.h5_pos_vals]
+        return [lft + rgt for lft, rgt in zip(left, buffer.getvalue().splitlines())]
+
+    def check_csv(self, usi_main):
+        if os.path.exists(self.csv_path):
+            os.remove(self.csv_path)
+        self.assertEqual(usi_main.to_csv(output_path=self.csv_path), self.csv_path)
+        with open(self.csv_path) as csv_file:
+            actual = csv_file.read()
+        self.assertTrue(actual.endswith('\n'))
+        self.assertEqual(actual.splitlines(), self.get_expected_lines(usi_main))
+        self.assertFalse(os.path.exists('temp.csv'))
+
+    def test_real(self):
+        self.check_csv(self.h5_source)
+
+    def test_complex(self):
+        self.check_csv(self.h5_complex)
+
+    def test_many_blocks(self):
+        with mock.patch('pyUSID.io.usi_data.get_rows_per_block', return_value=3):
+            self.check_csv(self.h5_source)
+            self.check_csv(self.h5_complex)
+
+    def test_existing_file(self):
+        with open(self.csv_path, 'w') as csv_file:
+            csv_file.write('old')
+        with self.assertRaises(FileExistsError):
+            _ = self.h5_source.to_csv(output_path=self.csv_path)
+        _ = self.h5_source.to_csv(output_path=self.csv_path, force=True)
+        with open(self.csv_path) as csv_file:
+            self.assertNotEqual(csv_file.read(), 'old')
+
+    def test_invalid_inputs(self):
+        with self.assertRaises(TypeError):
+            _ = self.h5_source.to_csv(output_path=self.csv_path, force='yes')
+        with self.assertRaises(TypeError):
+            _ = self.h5_source.to_csv(output_path=5)
+        with self.assertRaises(TypeError):
+            _ = self.h5_compound.to_csv(output_path=self.csv_path)
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 2026
+"""
+from __future__ import division, print_function, unicode_literals, absolute_import
+import unittest
+import os
+import sys
+import signal
+import time as tm
+
+sys.path.append("../../pyUSID/")
+from pyUSID.processing.checkpoint import CheckpointPolicy
+
+
+class TestCheckpointPolicy(unittest.TestCase):
+
+    def test_default_every_batch(self):
+        policy = CheckpointPolicy()
+        policy.start()
+        self.assertTrue(policy.batch_completed())
+        policy.reset()
+        self.assertTrue(policy.batch_completed())
+        policy.stop()
+        self.assertTrue(policy.is_collective)
+
+    def test_every_n_batches(self):
+        policy = CheckpointPolicy(batches=3)
+        policy.start()
+        self.assertEqual([policy.batch_completed() for _ in range(3)],
+                         [False, False, True])
+        policy.reset()
+        self.assertFalse(policy.batch_completed())
+        policy.stop()
+
+    def test_every_t_seconds(self):
+        policy = CheckpointPolicy(batches=None, seconds=0.05)
+        policy.start()
+        self.assertFalse(policy.batch_completed())
+        tm.sleep(0.1)
+        self.assertTrue(policy.batch_completed())
+        policy.reset()
+        self.assertFalse(policy.batch_completed())
+        policy.stop()
+        self.assertFalse(policy.is_collective)
+
+    @unittest.skipIf(not hasattr(signal, 'SIGUSR1'), 'SIGUSR1 is not available on this platform')
+    def test_on_signal(self):
+        prev_handler = signal.getsignal(signal.SIGUSR1)
+        policy = CheckpointPolicy(batches=None, signals=[signal.SIGUSR1])
+        policy.start()
+        self.assertFalse(policy.batch_completed())
+        os.kill(os.getpid(), signal.SIGUSR1)
+        self.assertTrue(policy.batch_completed())
+        policy.reset()
+        self.assertFalse(policy.batch_completed())
+        policy.stop()
+        self.assertEqual(signal.getsignal(signal.SIGUSR1), prev_handler)
+
+    def test_invalid_batches(self):
+        with self.assertRaises(TypeError):
+            _ = CheckpointPolicy(batches=1.5)
+        with self.assertRaises(ValueError):
+            _ = CheckpointPolicy(batches=0)
+
+    def test_invalid_seconds(self):
+        with self.assertRaises(TypeError):
+            _ = CheckpointPolicy(seconds='10')
+        with self.assertRaises(ValueError):
+            _ = CheckpointPolicy(seconds=-1)
+
+    def test_invalid_signals(self):
+        with self.assertRaises(TypeError):
+            _ = CheckpointPolicy(signals=['SIGUSR1'])
+
+    def test_no_conditions(self):
+        with self.assertRaises(ValueError):
+            _ = CheckpointPolicy(batches=None)
+
+
+if __name__ == '__main__':
+    unittest.main()
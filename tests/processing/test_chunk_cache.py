@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 2026
+"""
+from __future__ import division, print_function, unicode_literals, absolute_import
+import unittest
+import os
+import sys
+import glob
+import numpy as np
+import h5py
+
+sys.path.append("../../pyUSID/")
+from pyUSID.processing import chunk_cache
+from pyUSID.processing.sharding import ResultShard
+
+file_path = 'test_chunk_cache.h5'
+
+
+class TestChunkCacheSettings(unittest.TestCase):
+
+    def setUp(self):
+        self.h5_file = h5py.File(file_path, mode='w')
+        # Each chunk: 8 positions x 64 points of float64 = 4 kB. 4 chunks per position
+        self.h5_dset = self.h5_file.create_dataset('chunked', shape=(1000, 256), dtype=np.float64,
+                                                   chunks=(8, 64))
+        self.h5_contig = self.h5_file.create_dataset('contiguous', shape=(1000, 256), dtype=np.float64)
+
+    def tearDown(self):
+        self.h5_file.close()
+        for path in glob.glob(os.path.splitext(file_path)[0] + '*.h5'):
+            os.remove(path)
+
+    def test_cache_nbytes(self):
+        self.assertEqual(chunk_cache.get_chunks_per_row((1000, 256), (8, 64)), 4)
+        self.assertEqual(chunk_cache.get_chunks_per_row((1000, 250), (8, 64)), 4)
+        # 100 positions span up to 14 rows of chunks
+        nbytes, chunk_nbytes = chunk_cache.get_cache_nbytes((1000, 256), (8, 64), 8, 100)
+        self.assertEqual(chunk_nbytes, 4096)
+        self.assertEqual(nbytes, 14 * 4 * 4096)
+        # Never more than the entire dataset
+        nbytes, _ = chunk_cache.get_cache_nbytes((16, 256), (8, 64), 8, 100)
+        self.assertEqual(nbytes, 2 * 4 * 4096)
+
+    def test_settings(self):
+        settings = chunk_cache.get_chunk_cache_settings(self.h5_dset, 1000)
+        self.assertEqual(settings['rdcc_nbytes'], 125 * 4 * 4096)
+        self.assertEqual(settings['rdcc_w0'], 1.0)
+        self.assertGreaterEqual(settings['rdcc_nslots'], 100 * 500)
+        nslots = settings['rdcc_nslots']
+        self.assertTrue(all(nslots % div for div in range(2, int(nslots ** 0.5) + 1)))
+
+    def test_settings_limits(self):
+        # Not smaller than the default cache
+        settings = chunk_cache.get_chunk_cache_settings(self.h5_dset, 8)
+        self.assertEqual(settings['rdcc_nbytes'], chunk_cache.DEFAULT_CACHE_NBYTES)
+        # Capped by the memory budget but holds at least one chunk
+        settings = chunk_cache.get_chunk_cache_settings(self.h5_dset, 1000, max_nbytes=64 * 1024)
+        self.assertEqual(settings['rdcc_nbytes'], 64 * 1024)
+        settings = chunk_cache.get_chunk_cache_settings(self.h5_dset, 1000, max_nbytes=10)
+        self.assertEqual(settings['rdcc_nbytes'], 4096)
+        self.assertIsNone(chunk_cache.get_chunk_cache_settings(self.h5_contig, 1000))
+        with self.assertRaises(TypeError):
+            _ = chunk_cache.get_chunk_cache_settings(np.zeros(5), 10)
+
+    def test_settings_applied_when_opening(self):
+        settings = chunk_cache.get_chunk_cache_settings(self.h5_dset, 1000)
+        self.h5_file.close()
+        self.h5_file = h5py.File(file_path, mode='r', **settings)
+        self.assertEqual(chunk_cache.get_chunk_cache(self.h5_file['chunked']), settings)
+
+    def test_chunk_rows(self):
+        self.assertTrue(np.array_equal(chunk_cache.get_chunk_rows([3, 7, 8, 9, 40], self.h5_dset),
+                                       [0, 1, 5]))
+        self.assertEqual(chunk_cache.get_chunk_rows([3, 7], self.h5_contig).size, 0)
+
+    def test_shard_cache(self):
+        h5_grp = self.h5_file.create_group('Results')
+        h5_grp.create_dataset('Fit', shape=(1000, 256), dtype=np.float64)
+        shard = ResultShard(h5_grp, 0, ['Fit'], rows_per_batch=500)
+        try:
+            cache = chunk_cache.get_chunk_cache(shard.datasets['Fit'])
+            rows_per_chunk = shard.datasets['Fit'].chunks[0]
+            self.assertEqual(cache['rdcc_nbytes'],
+                             (int(np.ceil(500 / rows_per_chunk)) + 1) * rows_per_chunk * 256 * 8)
+            self.assertEqual(cache['rdcc_w0'], 1.0)
+        finally:
+            shard.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 2026
+"""
+from __future__ import division, print_function, unicode_literals, absolute_import
+import unittest
+import os
+import sys
+import pickle
+import importlib.util
+import numpy as np
+import h5py
+
+sys.path.append("../../pyUSID/")
+from pyUSID.processing import dask_engine
+
+file_path = 'test_dask_engine.h5'
+
+
+def _row_sum(row, offset=0):
+    return np.sum(row) + offset
+
+
+def _batch_sum(block, offset=0):
+    return np.sum(block, axis=1) + offset
+
+
+class TestDaskEngine(unittest.TestCase):
+
+    def setUp(self):
+        self.data = np.random.rand(23, 7)
+        self.h5_file = h5py.File(file_path, mode='w')
+        self.h5_dset = self.h5_file.create_dataset('source', data=self.data, chunks=(4, 7))
+        self.batches = [np.arange(0, 8), np.array([8, 9, 15, 16]), np.arange(17, 23)]
+
+    def tearDown(self):
+        self.h5_file.close()
+        os.remove(file_path)
+
+    def __compute(self, blocks, **kwargs):
+        streamed = list(dask_engine.stream_blocks(blocks, **kwargs))
+        self.assertEqual(sorted([index for index, _ in streamed]), list(range(len(blocks))))
+        return [results for _, results in sorted(streamed, key=lambda item: item[0])]
+
+    def test_per_position(self):
+        blocks = dask_engine.build_result_blocks(self.h5_dset, self.batches, _row_sum,
+                                                 func_kwargs={'offset': 1})
+        self.assertEqual(len(blocks), len(self.batches))
+        for max_in_flight in [1, 2, 5]:
+            results = self.__compute(blocks, max_in_flight=max_in_flight, num_workers=2)
+            for positions, block_results in zip(self.batches, results):
+                self.assertIsInstance(block_results, list)
+                self.assertTrue(np.allclose(block_results, self.data[positions].sum(axis=1) + 1))
+
+    def test_batched(self):
+        blocks = dask_engine.build_result_blocks(self.h5_dset, self.batches, _batch_sum,
+                                                 batched=True, func_args=[2])
+        for positions, block_results in zip(self.batches, self.__compute(blocks)):
+            self.assertIsInstance(block_results, np.ndarray)
+            self.assertTrue(np.allclose(block_results, self.data[positions].sum(axis=1) + 2))
+
+    def test_one_block_per_batch(self):
+        blocks = dask_engine.build_result_blocks(self.h5_dset, self.batches, _row_sum)
+        results = self.__compute(blocks)
+        self.assertEqual([len(block_results) for block_results in results], [8, 4, 6])
+
+    def test_by_path(self):
+        blocks = dask_engine.build_result_blocks(self.h5_dset, self.batches, _row_sum, by_path=True)
+        # Tasks refer to the file by path rather than holding HDF5 objects, which cannot be pickled
+        blocks = [pickle.loads(pickle.dumps(block)) for block in blocks]
+        self.h5_file.close()
+        for positions, block_results in zip(self.batches, self.__compute(blocks)):
+            self.assertTrue(np.allclose(block_results, self.data[positions].sum(axis=1)))
+        self.h5_file = h5py.File(file_path, mode='r')
+
+    @unittest.skipIf(importlib.util.find_spec('distributed') is None, 'dask.distributed is not installed')
+    def test_distributed_client(self):
+        from dask.distributed import Client, LocalCluster
+        # Workers read the file while it is open here
+        os.environ['HDF5_USE_FILE_LOCKING'] = 'FALSE'
+        self.h5_file.flush()
+        try:
+            with LocalCluster(n_workers=2, threads_per_worker=1, processes=True) as cluster, \
+                    Client(cluster) as client:
+                blocks = dask_engine.build_result_blocks(self.h5_dset, self.batches, _batch_sum, batched=True,
+                                                         func_args=[2], by_path=True)
+                results = self.__compute(blocks, client=client, max_in_flight=2)
+        finally:
+            del os.environ['HDF5_USE_FILE_LOCKING']
+        for positions, block_results in zip(self.batches, results):
+            self.assertTrue(np.allclose(block_results, self.data[positions].sum(axis=1) + 2))
+
+    def test_empty_and_invalid(self):
+        self.assertEqual(dask_engine.build_result_blocks(self.h5_dset, [], _row_sum), [])
+        with self.assertRaises(TypeError):
+            _ = dask_engine.build_result_blocks(self.h5_dset, self.batches, 'not callable')
+        with self.assertRaises(TypeError):
+            _ = dask_engine.build_result_blocks(self.data, self.batches, _row_sum)
+
+    @unittest.skipIf(importlib.util.find_spec('distributed') is not None, 'dask.distributed is installed')
+    def test_no_distributed(self):
+        with self.assertWarns(UserWarning):
+            self.assertIsNone(dask_engine.get_local_client())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 2026
+"""
+from __future__ import division, print_function, unicode_literals, absolute_import
+import unittest
+from ..io import data_utils
+from ..io.data_utils import *
+sys.path.append("../../../pyUSID/")
+import pyUSID as usid
+from .test_process import _create_results_grp_dsets, AvgSpecCoalescedWrite, AvgSpecBatched, AvgSpecSlowPixel
+from pyUSID.processing.fusion import _iter_batches
+
+
+class MaxSpec(usid.Process):
+
+    def __init__(self, h5_main, **kwargs):
+        super(MaxSpec, self).__init__(h5_main, 'Max_Val', **kwargs)
+
+    def _create_results_datasets(self):
+        self.h5_results_grp, self.h5_results = _create_results_grp_dsets(self.h5_main, self.process_name,
+                                                                         self.parms_dict)
+
+    def _get_existing_datasets(self):
+        self.h5_results = self.h5_results_grp['Results']
+
+    @staticmethod
+    def _map_function(spectrogram, *args, **kwargs):
+        return np.max(spectrogram)
+
+    def _write_results_chunk(self):
+        self._write_to_positions(self.h5_results, self._results)
+
+
+class TestFusedProcess(unittest.TestCase):
+
+    def setUp(self):
+        delete_existing_file(data_utils.std_beps_path)
+        data_utils.make_beps_file()
+        self.h5_file = h5py.File(data_utils.std_beps_path, mode='r+')
+        self.h5_main = usid.USIDataset(self.h5_file['Raw_Measurement/source_main'])
+        self.exp_mean = np.expand_dims(np.mean(self.h5_main[()], axis=1), axis=1)
+        self.exp_max = np.expand_dims(np.max(self.h5_main[()], axis=1), axis=1)
+
+    def tearDown(self):
+        self.h5_file.close()
+        delete_existing_file(data_utils.std_beps_path)
+
+    def __verify(self, h5_grps):
+        self.assertEqual(len(h5_grps), 2)
+        for h5_grp, expected in zip(h5_grps, [self.exp_mean, self.exp_max]):
+            self.assertIsInstance(h5_grp, h5py.Group)
+            self.assertTrue(np.allclose(h5_grp['Results'][()], expected))
+            self.assertTrue(np.all(h5_grp['completed_positions'][()] == 1))
+            self.assertEqual(h5_grp.attrs['last_pixel'], self.h5_main.shape[0])
+
+    def test_compute(self):
+        procs = [AvgSpecCoalescedWrite(self.h5_main), MaxSpec(self.h5_main)]
+        fused = usid.processing.FusedProcess(procs)
+        reads = []
+        read_positions = procs[0]._read_positions
+
+        def counting_read(positions):
+            reads.append(len(positions))
+            return read_positions(positions)
+
+        procs[0]._read_positions = counting_read
+        procs[0]._max_pos_per_read = 4
+        procs[1]._max_pos_per_read = 6
+        h5_grps = fused.compute()
+        self.__verify(h5_grps)
+        # Each position is read only once and in batches that suit both processes
+        self.assertEqual(reads, [4, 4, 4, 3])
+        self.assertEqual(h5_grps[0], procs[0].h5_results_grp)
+
+        # Computing again should return the existing results
+        procs = [AvgSpecCoalescedWrite(self.h5_main), MaxSpec(self.h5_main)]
+        self.assertEqual(usid.processing.FusedProcess(procs).compute(), h5_grps)
+
+    def test_resume_partial(self):
+        # First process was partially computed while the second was never started
+        h5_grp, h5_results = _create_results_grp_dsets(self.h5_main, 'Mean_Val',
+                                                       {'parm_1': 1, 'parm_2': [1, 2, 3]})
+        status = np.ones(self.h5_main.shape[0], dtype=np.uint8)
+        status[1::4] = 0
+        results = self.exp_mean.copy()
+        results[status == 0] = -1
+        h5_results[:, :] = results
+        h5_grp.create_dataset('completed_positions', data=status)
+
+        procs = [AvgSpecCoalescedWrite(self.h5_main), MaxSpec(self.h5_main)]
+        computed = []
+        compute_positions = procs[0]._compute_positions
+
+        def recording_compute(positions, data, *args, **kwargs):
+            computed.append(np.array(positions))
+            return compute_positions(positions, data, *args, **kwargs)
+
+        procs[0]._compute_positions = recording_compute
+        h5_grps = usid.processing.FusedProcess(procs).compute()
+        self.__verify(h5_grps)
+        self.assertEqual(h5_grps[0], h5_grp)
+        self.assertTrue(np.all(np.concatenate(computed) == np.where(status == 0)[0]))
+
+    def test_batched_and_lazy(self):
+        procs = [AvgSpecBatched(self.h5_main, lazy=True), MaxSpec(self.h5_main)]
+        h5_grps = usid.processing.FusedProcess(procs).compute()
+        self.assertTrue(np.allclose(h5_grps[0]['Results'][()], self.exp_mean))
+        self.assertTrue(np.allclose(h5_grps[1]['Results'][()], self.exp_max))
+
+    def test_timeout_retried_with_args(self):
+        procs = [AvgSpecSlowPixel(self.h5_main, pixel_timeout=0.1), MaxSpec(self.h5_main)]
+        procs[0]._max_pos_per_read = 6
+        slow_pos = 8
+        # Keyword arguments reach the mapped function of every process
+        h5_grps = usid.processing.FusedProcess(procs).compute(slow_value=float(self.exp_mean[slow_pos, 0]))
+        self.__verify(h5_grps)
+
+    def test_timed_out_again(self):
+        procs = [AvgSpecSlowPixel(self.h5_main, pixel_timeout=0.1, retry_timeout=0.1), MaxSpec(self.h5_main)]
+        slow_pos = 8
+        h5_grps = usid.processing.FusedProcess(procs).compute(slow_value=float(self.exp_mean[slow_pos, 0]))
+        status = h5_grps[0]['completed_positions'][()]
+        self.assertEqual(status[slow_pos], 2)
+        self.assertEqual(np.sum(status == 1), self.h5_main.shape[0] - 1)
+        # Resumed rather than returned as complete by a future instance
+        self.assertEqual(len(AvgSpecSlowPixel(self.h5_main).partial_h5_groups), 1)
+        self.assertTrue(np.allclose(h5_grps[1]['Results'][()], self.exp_max))
+        self.assertTrue(np.all(h5_grps[1]['completed_positions'][()] == 1))
+
+    def test_iter_batches(self):
+        ranges = np.array([[0, 3], [5, 6], [8, 12]])
+        batches = list(_iter_batches(ranges, 4))
+        self.assertEqual([batch.tolist() for batch in batches], [[0, 1, 2, 5], [8, 9, 10, 11]])
+        self.assertEqual(list(_iter_batches(np.zeros((0, 2), dtype=np.int64), 4)), [])
+
+    def test_invalid_processes(self):
+        with self.assertRaises(TypeError):
+            _ = usid.processing.FusedProcess(MaxSpec(self.h5_main))
+        with self.assertRaises(ValueError):
+            _ = usid.processing.FusedProcess([])
+        with self.assertRaises(TypeError):
+            _ = usid.processing.FusedProcess([MaxSpec(self.h5_main), 'process'])
+
+    def test_different_sources(self):
+        h5_other = self.h5_main.parent.create_dataset('other_main', data=self.h5_main[()])
+        usid.hdf_utils.link_as_main(h5_other, self.h5_main.h5_pos_inds, self.h5_main.h5_pos_vals,
+                                    self.h5_main.h5_spec_inds, self.h5_main.h5_spec_vals)
+        for attr_name in ['quantity', 'units']:
+            h5_other.attrs[attr_name] = self.h5_main.attrs[attr_name]
+        with self.assertRaises(ValueError):
+            _ = usid.processing.FusedProcess([MaxSpec(self.h5_main), MaxSpec(h5_other)])
+
+
+if __name__ == '__main__':
+    unittest.main()
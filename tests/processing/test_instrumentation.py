@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 2026
+"""
+from __future__ import division, print_function, unicode_literals, absolute_import
+import unittest
+import os
+import sys
+import h5py
+import numpy as np
+
+sys.path.append("../../pyUSID/")
+from pyUSID.processing import instrumentation
+
+file_path = 'test_instrumentation.h5'
+
+
+class TestBatchStats(unittest.TestCase):
+
+    def setUp(self):
+        self.records = [instrumentation.new_batch_record(rank=0, batch=ind, positions=10)
+                        for ind in range(3)]
+        for ind, record in enumerate(self.records):
+            record['compute_time'] = 0.5 * ind
+            record['read_bytes'] = 1024
+
+    def tearDown(self):
+        if os.path.exists(file_path):
+            os.remove(file_path)
+
+    def test_new_record(self):
+        record = instrumentation.new_batch_record(rank=2, batch=5, positions=7)
+        self.assertEqual(set(record.keys()),
+                         set([name for name, _ in instrumentation.BATCH_STATS_FIELDS]))
+        self.assertEqual((record['rank'], record['batch'], record['positions']), (2, 5, 7))
+        self.assertEqual(record['compute_time'], 0)
+        self.assertGreater(record['timestamp'], 0)
+
+    def test_to_array(self):
+        stats = instrumentation.batch_stats_to_array(self.records)
+        self.assertEqual(stats.shape, (3,))
+        self.assertTrue(np.allclose(stats['compute_time'], [0, 0.5, 1.0]))
+        self.assertTrue(np.all(stats['batch'] == [0, 1, 2]))
+
+    def test_to_array_invalid(self):
+        with self.assertRaises(TypeError):
+            _ = instrumentation.batch_stats_to_array(self.records[0])
+        with self.assertRaises(TypeError):
+            _ = instrumentation.batch_stats_to_array([1, 2])
+
+    def test_rss(self):
+        self.assertGreater(instrumentation.get_rss(), 0)
+        self.assertGreaterEqual(instrumentation.get_rss(include_children=True),
+                                instrumentation.get_rss(include_children=False))
+
+    def test_rss_monitor(self):
+        monitor = instrumentation.RSSMonitor(interval=0.01)
+        monitor.start()
+        large = np.ones(32 * 1024 ** 2, dtype=np.uint8)
+        peak_rss = monitor.stop()
+        self.assertGreaterEqual(peak_rss, large.nbytes)
+        del large
+        # Peaks of earlier intervals are not carried over
+        monitor.start()
+        self.assertLess(monitor.stop(), peak_rss)
+        with self.assertRaises(ValueError):
+            _ = instrumentation.RSSMonitor(interval=0)
+
+    def test_write_and_append(self):
+        with h5py.File(file_path, mode='w') as h5_f:
+            h5_stats = instrumentation.write_batch_stats(h5_f, self.records)
+            self.assertEqual(h5_stats.shape, (3,))
+            # Statistics from a resumed computation should be appended
+            h5_stats = instrumentation.write_batch_stats(h5_f, self.records[:2])
+            self.assertEqual(h5_stats.shape, (5,))
+            self.assertTrue(np.all(h5_stats['batch'] == [0, 1, 2, 0, 1]))
+            self.assertTrue(np.all(h5_stats['read_bytes'] == 1024))
+
+    def test_append_to_older_fields(self):
+        older_fields = instrumentation.BATCH_STATS_FIELDS[:4]
+        with h5py.File(file_path, mode='w') as h5_f:
+            h5_f.create_dataset('Batch_Stats', shape=(1,), maxshape=(None,), dtype=older_fields)
+            h5_stats = instrumentation.write_batch_stats(h5_f, self.records)
+            self.assertEqual(h5_stats.dtype.names, tuple([name for name, _ in older_fields]))
+            self.assertTrue(np.all(h5_stats['batch'] == [0, 0, 1, 2]))
+
+    def test_write_invalid_group(self):
+        with self.assertRaises(TypeError):
+            _ = instrumentation.write_batch_stats('group', self.records)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 2026
+"""
+from __future__ import division, print_function, unicode_literals, absolute_import
+import unittest
+import os
+import sys
+import tracemalloc
+import numpy as np
+import h5py
+
+sys.path.append("../../pyUSID/")
+from pyUSID.processing.memory import PeakMemory, get_results_bytes_per_pos, get_max_positions
+
+file_path = 'test_memory.h5'
+
+
+class TestPeakMemory(unittest.TestCase):
+
+    def test_peak(self):
+        with PeakMemory() as peak:
+            scratch = np.ones(10 ** 6)
+            del scratch
+        self.assertGreaterEqual(peak.peak_bytes, 8 * 10 ** 6)
+        self.assertLess(peak.peak_bytes, 9 * 10 ** 6)
+        self.assertFalse(tracemalloc.is_tracing())
+
+    def test_already_tracing(self):
+        tracemalloc.start()
+        try:
+            with PeakMemory() as peak:
+                scratch = np.ones(10 ** 6)
+                del scratch
+            self.assertGreaterEqual(peak.peak_bytes, 8 * 10 ** 6)
+            # Left running for whoever started it
+            self.assertTrue(tracemalloc.is_tracing())
+        finally:
+            tracemalloc.stop()
+
+    def test_exception(self):
+        with self.assertRaises(ValueError):
+            with PeakMemory():
+                raise ValueError('Failed')
+        self.assertFalse(tracemalloc.is_tracing())
+
+
+class TestResultsBytes(unittest.TestCase):
+
+    def setUp(self):
+        self.h5_file = h5py.File(file_path, mode='w')
+
+    def tearDown(self):
+        self.h5_file.close()
+        os.remove(file_path)
+
+    def test_results_bytes(self):
+        h5_fit = self.h5_file.create_dataset('Fit', shape=(100, 3, 4), dtype=np.float32)
+        h5_guess = self.h5_file.create_dataset('Guess', shape=(100, 5), dtype=np.complex64)
+        self.assertEqual(get_results_bytes_per_pos([h5_fit, h5_guess]), 3 * 4 * 4 + 5 * 8)
+        self.assertEqual(get_results_bytes_per_pos([]), 0)
+        with self.assertRaises(TypeError):
+            _ = get_results_bytes_per_pos([np.zeros((100, 5))])
+
+
+class TestMaxPositions(unittest.TestCase):
+
+    def test_max_positions(self):
+        self.assertEqual(get_max_positions(1000, 10), 100)
+        self.assertEqual(get_max_positions(1000, 10, fixed_bytes=500), 50)
+        # Always at least one position
+        self.assertEqual(get_max_positions(1000, 10, fixed_bytes=5000), 1)
+        with self.assertRaises(ValueError):
+            _ = get_max_positions(1000, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -7,6 +7,13 @@ Created on Tue Nov  3 15:07:16 2017
 """
 from __future__ import division, print_function, unicode_literals, absolute_import
 import unittest
+import glob
+import time
+import importlib.util
+import shutil
+import subprocess
+import tempfile
+from unittest import mock
 from ..io import data_utils
 from ..io.data_utils import *
 sys.path.append("../../../pyUSID/")
@@ -75,6 +82,17 @@ class AvgSpecUltraBasic(usid.Process):
         self.h5_results[pos_in_batch, 0] = np.array(self._results)
 
 
+class AvgSpecBatched(AvgSpecUltraBasic):
+
+    @staticmethod
+    def _map_function(spectrogram, *args, **kwargs):
+        raise ValueError('The batched map function should have been used')
+
+    @staticmethod
+    def _map_batch(spectrograms, *args, **kwargs):
+        return np.mean(spectrograms, axis=1)
+
+
 class AvgSpecUltraBasicWTest(AvgSpecUltraBasic):
 
     def test(self, pos_ind):
@@ -87,6 +105,12 @@ class AvgSpecUltraBasicWGetPrevResults(AvgSpecUltraBasic):
         self.h5_results = self.h5_results_grp['Results']
 
 
+class AvgSpecCoalescedWrite(AvgSpecUltraBasicWGetPrevResults):
+
+    def _write_results_chunk(self):
+        self._write_to_positions(self.h5_results, self._results)
+
+
 class TestInvalidInitialization(unittest.TestCase):
 
     def test_no_map_func(self):
@@ -228,6 +252,28 @@ class TestCoreProcessWTest(TestCoreProcessNoTest):
         self.assertTrue(np.allclose(actual, expected))
 
 
+class TestRegisteredResults(TestCoreProcessNoTest):
+
+    def test_compute(self):
+        super(TestRegisteredResults, self).test_compute()
+        h5_grp = self.proc.h5_results_grp
+        self.assertEqual(h5_grp.attrs[usid.hdf_utils.PARMS_HASH_ATTR],
+                         usid.hdf_utils.get_parms_hash(self.proc.parms_dict))
+
+        proc = AvgSpecUltraBasic(self.h5_main)
+        self.assertEqual(proc.duplicate_h5_groups, [h5_grp])
+
+        class OtherParms(AvgSpecUltraBasic):
+
+            def __init__(self, h5_main, **kwargs):
+                super(OtherParms, self).__init__(h5_main, **kwargs)
+                self.parms_dict = {'parm_1': 2, 'parm_2': [1, 2, 3]}
+                self.duplicate_h5_groups, self.partial_h5_groups = self._check_for_duplicates()
+
+        proc = OtherParms(self.h5_main)
+        self.assertEqual(proc.duplicate_h5_groups, [])
+
+
 class TestWriteResultsToNewH5File(TestCoreProcessWTest):
 
     def setUp(self, proc_class=AvgSpecUltraBasicWTest, **proc_kwargs):
@@ -530,6 +576,870 @@ class TestMultiBatchCompute(TestCoreProcessNoTest):
         self.proc._max_pos_per_read = 6
         super(TestMultiBatchCompute, self).test_compute()
 
+
+class TestPipelinedCompute(TestCoreProcessNoTest):
+
+    def setUp(self, proc_class=AvgSpecUltraBasic, **proc_kwargs):
+        super(TestPipelinedCompute,
+              self).setUp(proc_class=proc_class, pipelined=True, **proc_kwargs)
+
+    def test_compute(self):
+        # 6 positions per batch since three batches are in flight
+        self.proc._max_pos_per_read = 18
+        super(TestPipelinedCompute, self).test_compute()
+        self.assertEqual(self.proc.h5_results_grp.attrs['last_pixel'],
+                         self.h5_main.shape[0])
+
+    def test_invalid_pipelined(self):
+        with self.assertRaises(TypeError):
+            _ = AvgSpecUltraBasic(self.h5_main, pipelined='yes')
+
+
+class TestPoolBackendCompute(TestCoreProcessNoTest):
+
+    def setUp(self, proc_class=AvgSpecUltraBasic, **proc_kwargs):
+        super(TestPoolBackendCompute,
+              self).setUp(proc_class=proc_class, backend='pool', cores=2,
+                          **proc_kwargs)
+
+    def test_compute(self):
+        self.proc._max_pos_per_read = 6
+        super(TestPoolBackendCompute, self).test_compute()
+
+    def test_invalid_backend(self):
+        with self.assertRaises(ValueError):
+            _ = AvgSpecUltraBasic(self.h5_main, backend='blah')
+        with self.assertRaises(TypeError):
+            _ = AvgSpecUltraBasic(self.h5_main, backend=['pool'])
+
+
+class TestSharedBackendCompute(TestCoreProcessNoTest):
+
+    def setUp(self, proc_class=AvgSpecUltraBasic, **proc_kwargs):
+        super(TestSharedBackendCompute,
+              self).setUp(proc_class=proc_class, backend='shared', **proc_kwargs)
+        # Force multiple workers even on machines with a single core
+        self.proc._cores = 2
+
+    def test_compute(self):
+        self.proc._max_pos_per_read = 6
+        super(TestSharedBackendCompute, self).test_compute()
+
+    def test_compute_pipelined(self):
+        self.proc = AvgSpecUltraBasic(self.h5_main, backend='shared',
+                                      pipelined=True)
+        self.proc._cores = 2
+        self.proc._max_pos_per_read = 12
+        super(TestSharedBackendCompute, self).test_compute()
+
+    def test_compute_lazy(self):
+        self.proc = AvgSpecUltraBasic(self.h5_main, backend='shared',
+                                      lazy=True)
+        self.proc._cores = 2
+        self.proc._max_pos_per_read = 6
+        super(TestSharedBackendCompute, self).test_compute()
+
+    def test_compute_batched(self):
+        self.proc = AvgSpecBatched(self.h5_main, backend='shared')
+        self.proc._cores = 2
+        self.proc._max_pos_per_read = 6
+        super(TestSharedBackendCompute, self).test_compute()
+
+    def test_results_not_arrays(self):
+
+        class DictResults(AvgSpecUltraBasic):
+
+            @staticmethod
+            def _map_function(spectrogram, *args, **kwargs):
+                return {'mean': np.mean(spectrogram)}
+
+        proc = DictResults(self.h5_main, backend='shared')
+        with self.assertRaises(TypeError):
+            _ = proc.compute()
+
+
+class TestThreadsBackendCompute(TestCoreProcessNoTest):
+
+    def setUp(self, proc_class=AvgSpecUltraBasic, **proc_kwargs):
+        super(TestThreadsBackendCompute,
+              self).setUp(proc_class=proc_class, backend='threads',
+                          **proc_kwargs)
+        # Force multiple threads even on machines with a single core
+        self.proc._cores = 2
+
+    def test_compute(self):
+        self.proc._max_pos_per_read = 6
+        super(TestThreadsBackendCompute, self).test_compute()
+
+    def test_compute_batched(self):
+        self.proc = AvgSpecBatched(self.h5_main, backend='threads')
+        self.proc._cores = 2
+        self.proc._max_pos_per_read = 6
+        super(TestThreadsBackendCompute, self).test_compute()
+
+    def test_memory_not_divided_by_cores(self):
+        with mock.patch('pyUSID.processing.process.psutil.cpu_count', return_value=8):
+            procs = [AvgSpecUltraBasic(self.h5_main, backend=backend, cores=4, max_mem_mb=1)
+                     for backend in ['joblib', 'threads']]
+        self.assertEqual([proc._cores for proc in procs], [4, 4])
+        self.assertGreaterEqual(procs[1]._max_pos_per_read, 4 * procs[0]._max_pos_per_read)
+
+
+class AvgSpecBoundMap(AvgSpecCoalescedWrite):
+
+    def _map_function(self, spectrogram, *args, **kwargs):
+        return np.mean(spectrogram)
+
+
+class TestDaskBackendCompute(TestCoreProcessNoTest):
+
+    def setUp(self, proc_class=AvgSpecCoalescedWrite, **proc_kwargs):
+        super(TestDaskBackendCompute,
+              self).setUp(proc_class=proc_class, backend='dask',
+                          **proc_kwargs)
+        self.proc._max_pos_per_read = 6
+
+    def test_compute(self):
+        super(TestDaskBackendCompute, self).test_compute()
+        self.assertTrue(np.all(self.proc.h5_results_grp['completed_positions'][()] == 1))
+
+    def test_compute_batched(self):
+        self.proc = AvgSpecBatched(self.h5_main, backend='dask')
+        self.proc._max_pos_per_read = 6
+        super(TestDaskBackendCompute, self).test_compute()
+
+    def test_instrumented(self):
+        self.proc = AvgSpecCoalescedWrite(self.h5_main, backend='dask', instrument=True)
+        self.proc._max_pos_per_read = 4
+        super(TestDaskBackendCompute, self).test_compute()
+        self.assertEqual([record['positions'] for record in self.proc.batch_stats], [4, 4, 4, 3])
+
+    def test_resume(self):
+        proc = AvgSpecInterrupted(self.h5_main)
+        proc._max_pos_per_read = 6
+        with self.assertRaises(KeyboardInterrupt):
+            _ = proc.compute()
+
+        self.proc = AvgSpecCoalescedWrite(self.h5_main, backend='dask')
+        self.assertEqual(len(self.proc.partial_h5_groups), 1)
+        self.proc._max_pos_per_read = 4
+        with mock.patch('pyUSID.processing.process.build_result_blocks',
+                        wraps=usid.processing.dask_engine.build_result_blocks) as mock_build:
+            super(TestDaskBackendCompute, self).test_compute()
+        batches = mock_build.call_args[0][1]
+        self.assertEqual(np.concatenate(batches).tolist(), list(range(6, self.h5_main.shape[0])))
+
+    @unittest.skipIf(importlib.util.find_spec('distributed') is None, 'dask.distributed is not installed')
+    def test_client(self):
+        client = mock.MagicMock()
+        client.compute.side_effect = RuntimeError('Submitted to the client')
+        self.proc = AvgSpecCoalescedWrite(self.h5_main, backend='dask', dask_client=client)
+        with self.assertRaises(RuntimeError):
+            _ = self.proc.compute()
+        self.assertTrue(client.compute.called)
+        # Clients provided by the user are not closed
+        self.assertFalse(client.close.called)
+
+    @unittest.skipIf(importlib.util.find_spec('distributed') is None, 'dask.distributed is not installed')
+    def test_distributed_client(self):
+        from dask.distributed import Client, LocalCluster
+        # Workers open the file while it is open for writing here
+        os.environ['HDF5_USE_FILE_LOCKING'] = 'FALSE'
+        try:
+            with LocalCluster(n_workers=2, threads_per_worker=1, processes=True) as cluster, \
+                    Client(cluster) as client:
+                self.proc = AvgSpecCoalescedWrite(self.h5_main, backend='dask', dask_client=client)
+                self.proc._max_pos_per_read = 4
+                super(TestDaskBackendCompute, self).test_compute()
+        finally:
+            del os.environ['HDF5_USE_FILE_LOCKING']
+        self.assertTrue(np.all(self.proc.h5_results_grp['completed_positions'][()] == 1))
+
+    def test_invalid_args(self):
+        with self.assertRaises(ValueError):
+            _ = AvgSpecUltraBasic(self.h5_main, dask_client=mock.MagicMock())
+        with self.assertRaises(TypeError):
+            _ = AvgSpecUltraBasic(self.h5_main, backend='dask', dask_client='localhost:8786')
+        with self.assertRaises(ValueError):
+            _ = AvgSpecUltraBasic(self.h5_main, backend='dask', pixel_timeout=1)
+        # Bound methods would send the HDF5 datasets held by the process to the workers
+        with self.assertRaises(TypeError):
+            _ = AvgSpecBoundMap(self.h5_main, backend='dask', dask_client=mock.MagicMock())
+
+
+class TestDynamicSchedulerCompute(TestCoreProcessNoTest):
+
+    def setUp(self, proc_class=AvgSpecUltraBasic, **proc_kwargs):
+        super(TestDynamicSchedulerCompute,
+              self).setUp(proc_class=proc_class, scheduler='dynamic',
+                          **proc_kwargs)
+
+    def test_compute(self):
+        # Without MPI, the dynamic scheduler falls back to the static one
+        self.proc._max_pos_per_read = 7
+        super(TestDynamicSchedulerCompute, self).test_compute()
+
+    def test_invalid_scheduler(self):
+        with self.assertRaises(ValueError):
+            _ = AvgSpecUltraBasic(self.h5_main, scheduler='blah')
+        with self.assertRaises(TypeError):
+            _ = AvgSpecUltraBasic(self.h5_main, scheduler=1)
+
+
+# Every rank counts the collective flushes it made while dynamically claiming batches. Rank 0 prints the counts
+_dynamic_mpi_script = """
+import sys
+import h5py
+from mpi4py import MPI
+import pyUSID as usid
+from tests.processing.test_process import AvgSpecUltraBasic
+
+comm = MPI.COMM_WORLD
+flushes = [0]
+orig_flush = h5py.File.flush
+
+
+def count_flush(h5_file):
+    flushes[0] += 1
+    orig_flush(h5_file)
+
+
+h5py.File.flush = count_flush
+with h5py.File(sys.argv[1], mode='r+', driver='mpio', comm=comm) as h5_f:
+    proc = AvgSpecUltraBasic(usid.USIDataset(h5_f['Raw_Measurement/source_main']), scheduler='dynamic',
+                             checkpoint_policy=usid.processing.CheckpointPolicy(batches=1))
+    proc._max_pos_per_read = 1
+    _ = proc.compute()
+flushes = comm.gather(flushes[0], root=0)
+if comm.Get_rank() == 0:
+    print(' '.join([str(count) for count in flushes]))
+"""
+
+
+def _mpi_available():
+    try:
+        import mpi4py
+    except ImportError:
+        return False
+    return h5py.get_config().mpi and shutil.which('mpiexec') is not None
+
+
+@unittest.skipIf(not _mpi_available(), 'mpi4py, mpiexec, or h5py built with MPI is not available')
+class TestDynamicSchedulerMPI(unittest.TestCase):
+
+    def setUp(self):
+        delete_existing_file(data_utils.std_beps_path)
+        data_utils.make_beps_file()
+
+    def tearDown(self):
+        delete_existing_file(data_utils.std_beps_path)
+
+    def test_checkpoints_at_epochs(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.py', delete=False) as file_handle:
+            file_handle.write(_dynamic_mpi_script)
+            script_path = file_handle.name
+        package_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+        env = dict(os.environ)
+        env['PYTHONPATH'] = os.pathsep.join([package_root] + [path for path in
+                                                              env.get('PYTHONPATH', '').split(os.pathsep) if path])
+        try:
+            output = subprocess.run([shutil.which('mpiexec'), '-n', '3', sys.executable, script_path,
+                                     os.path.abspath(data_utils.std_beps_path)],
+                                    stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                                    cwd=package_root, env=env, timeout=300)
+        finally:
+            os.remove(script_path)
+        self.assertEqual(output.returncode, 0, msg=output.stderr.decode())
+        flushes = [int(count) for count in output.stdout.decode().split()[-3:]]
+        # Every rank flushed together at every epoch (3 ranks x 1 position) and not just at the end
+        self.assertEqual(len(set(flushes)), 1)
+        self.assertGreater(flushes[0], 2)
+
+        with h5py.File(data_utils.std_beps_path, mode='r') as h5_f:
+            h5_main = h5_f['Raw_Measurement/source_main']
+            h5_grp = h5_f['Raw_Measurement/source_main-Mean_Val_000']
+            self.assertTrue(np.allclose(h5_grp['Results'][()][:, 0], np.mean(h5_main[()], axis=1)))
+            self.assertTrue(np.all(h5_grp['completed_positions'][()] == 1))
+
+
+class TestAdaptiveBatchCompute(TestCoreProcessNoTest):
+
+    def setUp(self, proc_class=AvgSpecUltraBasic, **proc_kwargs):
+        super(TestAdaptiveBatchCompute,
+              self).setUp(proc_class=proc_class, checkpoint_interval=1E-6,
+                          **proc_kwargs)
+
+    def test_compute(self):
+        mem_limited_pos = self.proc._max_pos_per_read
+        super(TestAdaptiveBatchCompute, self).test_compute()
+        # Batches should have been shrunk to checkpoint (nearly) every position
+        self.assertLess(self.proc._max_pos_per_read, mem_limited_pos)
+        self.assertGreaterEqual(self.proc._max_pos_per_read, 1)
+
+    def test_compute_pipelined(self):
+        self.proc = AvgSpecUltraBasic(self.h5_main, checkpoint_interval=1E-6,
+                                      pipelined=True)
+        super(TestAdaptiveBatchCompute, self).test_compute()
+
+    def test_long_interval_capped_by_memory(self):
+        self.proc = AvgSpecUltraBasic(self.h5_main, checkpoint_interval=1E+6)
+        mem_limited_pos = self.proc._max_pos_per_read
+        super(TestAdaptiveBatchCompute, self).test_compute()
+        self.assertLessEqual(self.proc._max_pos_per_read, mem_limited_pos)
+
+    def test_invalid_interval(self):
+        with self.assertRaises(TypeError):
+            _ = AvgSpecUltraBasic(self.h5_main, checkpoint_interval='10')
+        with self.assertRaises(ValueError):
+            _ = AvgSpecUltraBasic(self.h5_main, checkpoint_interval=-3)
+
+
+class AvgSpecLargeIntermediates(AvgSpecBatched):
+
+    @staticmethod
+    def _map_batch(spectrograms, *args, **kwargs):
+        # 1 MB of scratch space per position
+        scratch = np.ones((spectrograms.shape[0], 2 ** 17))
+        return np.mean(spectrograms, axis=1) + 0 * scratch[:, 0]
+
+
+class AvgSpecUnitComputation(NoMapFunc):
+
+    def _get_existing_datasets(self):
+        self.h5_results = self.h5_results_grp['Results']
+
+    def _unit_computation(self, *args, **kwargs):
+        self._results = np.mean(self.data, axis=1)
+
+    def _write_results_chunk(self):
+        self._write_to_positions(self.h5_results, self._results)
+
+
+class TestMemoryModelCompute(TestCoreProcessNoTest):
+
+    def test_compute(self):
+        source_limited_pos = self.proc._max_pos_per_read
+        super(TestMemoryModelCompute, self).test_compute()
+        # Results and intermediates only ever add to the source
+        self.assertLessEqual(self.proc._max_pos_per_read, source_limited_pos)
+        self.assertGreaterEqual(self.proc._max_pos_per_read, 1)
+
+    def test_intermediates(self):
+        self.proc = AvgSpecLargeIntermediates(self.h5_main, max_mem_mb=8, dry_run=True)
+        self.assertGreater(self.proc._max_pos_per_read, 1000)
+        super(TestMemoryModelCompute, self).test_compute()
+        self.assertLessEqual(self.proc._max_pos_per_read, 8)
+
+    def test_user_batch_size_kept(self):
+        self.proc._max_pos_per_read = 6
+        super(TestMemoryModelCompute, self).test_compute()
+        self.assertEqual(self.proc._max_pos_per_read, 6)
+
+    def test_user_batch_size_capped(self):
+        self.proc = AvgSpecLargeIntermediates(self.h5_main, max_mem_mb=8, dry_run=True)
+        self.proc._max_pos_per_read = 12
+        super(TestMemoryModelCompute, self).test_compute()
+        self.assertLessEqual(self.proc._max_pos_per_read, 8)
+
+    def test_mem_multiplier_lower_bound(self):
+        self.proc = AvgSpecUltraBasic(self.h5_main, max_mem_mb=1, mem_multiplier=1000.0)
+        multiplier_limited_pos = self.proc._max_pos_per_read
+        super(TestMemoryModelCompute, self).test_compute()
+        self.assertLessEqual(self.proc._max_pos_per_read, multiplier_limited_pos)
+
+    def test_dry_run_time_reused(self):
+        self.proc = AvgSpecUltraBasic(self.h5_main, checkpoint_interval=1E-6)
+        with mock.patch.object(AvgSpecUltraBasic, '_estimate_compute_time_per_pixel',
+                               autospec=True, return_value=1E-3) as estimate:
+            super(TestMemoryModelCompute, self).test_compute()
+        self.assertEqual(estimate.call_count, 1)
+
+    def test_no_dry_run_by_default(self):
+        with mock.patch.object(AvgSpecUltraBasic, '_estimate_compute_time_per_pixel',
+                               autospec=True, return_value=1E-3) as estimate:
+            super(TestMemoryModelCompute, self).test_compute()
+        estimate.assert_not_called()
+
+    def test_unit_computation_only(self):
+        # The map function of this class raises NotImplementedError
+        for kwargs in [{'dry_run': True}, {'checkpoint_interval': 1E-6}]:
+            self.proc = AvgSpecUnitComputation(self.h5_main, **kwargs)
+            super(TestMemoryModelCompute, self).test_compute()
+
+    def test_invalid_dry_run(self):
+        with self.assertRaises(TypeError):
+            _ = AvgSpecUltraBasic(self.h5_main, dry_run='yes')
+
+
+class AvgSpecStatusRecorder(AvgSpecUltraBasic):
+
+    def __init__(self, h5_main, **kwargs):
+        # Shared with the copies that write batches in the pipelined mode
+        self.status_history = []
+        super(AvgSpecStatusRecorder, self).__init__(h5_main, **kwargs)
+
+    def _write_results_chunk(self):
+        super(AvgSpecStatusRecorder, self)._write_results_chunk()
+        self.status_history.append(self._h5_status_dset[()].sum())
+
+
+class TestCheckpointPolicyCompute(TestCoreProcessNoTest):
+
+    def setUp(self, proc_class=AvgSpecStatusRecorder, **proc_kwargs):
+        super(TestCheckpointPolicyCompute,
+              self).setUp(proc_class=proc_class,
+                          checkpoint_policy=usid.processing.CheckpointPolicy(batches=3),
+                          **proc_kwargs)
+
+    def test_compute(self):
+        self.proc._max_pos_per_read = 2
+        super(TestCheckpointPolicyCompute, self).test_compute()
+        # Positions are only marked as complete once every 3 batches are flushed
+        self.assertEqual(self.proc.status_history,
+                         [0, 0, 0, 6, 6, 6, 12, 12])
+        self.assertTrue(np.all(self.proc.h5_results_grp['completed_positions'][()] == 1))
+
+    def test_compute_pipelined(self):
+        self.proc = AvgSpecStatusRecorder(self.h5_main, pipelined=True,
+                                          checkpoint_policy=usid.processing.CheckpointPolicy(batches=3))
+        # Each batch will contain 2 positions
+        self.proc._max_pos_per_read = 6
+        super(TestCheckpointPolicyCompute, self).test_compute()
+        self.assertEqual(self.proc.status_history,
+                         [0, 0, 0, 6, 6, 6, 12, 12])
+        self.assertTrue(np.all(self.proc.h5_results_grp['completed_positions'][()] == 1))
+
+    def test_invalid_policy(self):
+        with self.assertRaises(TypeError):
+            _ = AvgSpecUltraBasic(self.h5_main, checkpoint_policy=3)
+
+
+class TestInstrumentedCompute(TestCoreProcessNoTest):
+
+    def setUp(self, proc_class=AvgSpecUltraBasic, **proc_kwargs):
+        super(TestInstrumentedCompute,
+              self).setUp(proc_class=proc_class, instrument=True,
+                          save_stats=True, **proc_kwargs)
+
+    def __check_stats(self, num_batches):
+        self.assertEqual(len(self.proc.batch_stats), num_batches)
+        self.assertEqual([record['batch'] for record in self.proc.batch_stats],
+                         list(range(num_batches)))
+        self.assertEqual(sum([record['positions'] for record in self.proc.batch_stats]),
+                         self.h5_main.shape[0])
+        self.assertEqual(sum([record['read_bytes'] for record in self.proc.batch_stats]),
+                         self.h5_main[()].nbytes)
+        for record in self.proc.batch_stats:
+            self.assertEqual(record['rank'], 0)
+            self.assertGreater(record['peak_rss'], 0)
+            for key in ['read_time', 'compute_time', 'write_time', 'flush_time']:
+                self.assertGreaterEqual(record[key], 0)
+
+        h5_stats = self.proc.h5_results_grp['Batch_Stats']
+        self.assertEqual(h5_stats.shape, (num_batches,))
+        self.assertTrue(np.all(h5_stats['positions'] ==
+                               [record['positions'] for record in self.proc.batch_stats]))
+
+    def test_compute(self):
+        self.proc._max_pos_per_read = 4
+        super(TestInstrumentedCompute, self).test_compute()
+        self.__check_stats(4)
+
+    def test_compute_pipelined(self):
+        self.proc = AvgSpecUltraBasic(self.h5_main, instrument=True,
+                                      save_stats=True, pipelined=True)
+        self.proc._max_pos_per_read = 12
+        super(TestInstrumentedCompute, self).test_compute()
+        self.__check_stats(4)
+
+    def test_not_instrumented(self):
+        proc = AvgSpecUltraBasic(self.h5_main)
+        h5_grp = proc.compute()
+        self.assertEqual(proc.batch_stats, [])
+        self.assertFalse('Batch_Stats' in h5_grp.keys())
+
+    def test_invalid_args(self):
+        with self.assertRaises(TypeError):
+            _ = AvgSpecUltraBasic(self.h5_main, instrument='yes')
+        with self.assertRaises(TypeError):
+            _ = AvgSpecUltraBasic(self.h5_main, save_stats=1)
+
+
+class TestBatchedMapCompute(TestCoreProcessNoTest):
+
+    def setUp(self, proc_class=AvgSpecBatched, **proc_kwargs):
+        super(TestBatchedMapCompute,
+              self).setUp(proc_class=proc_class, **proc_kwargs)
+
+    def test_map_batch_detected(self):
+        self.assertTrue(self.proc._map_batch_implemented())
+        proc = AvgSpecUltraBasic(self.h5_main)
+        self.assertFalse(proc._map_batch_implemented())
+
+    def test_compute_split_across_cores(self):
+        self.proc._cores = 3
+        self.proc._max_pos_per_read = 10
+        super(TestBatchedMapCompute, self).test_compute()
+
+    def test_compute_pool_backend(self):
+        self.proc = AvgSpecBatched(self.h5_main, backend='pool')
+        self.proc._max_pos_per_read = 10
+        super(TestBatchedMapCompute, self).test_compute()
+
+    def test_wrong_number_of_results(self):
+
+        class WrongBatched(AvgSpecUltraBasic):
+
+            @staticmethod
+            def _map_batch(spectrograms, *args, **kwargs):
+                return np.mean(spectrograms)
+
+        proc = WrongBatched(self.h5_main)
+        with self.assertRaises(TypeError):
+            _ = proc.compute()
+
+        class ShortBatched(AvgSpecUltraBasic):
+
+            @staticmethod
+            def _map_batch(spectrograms, *args, **kwargs):
+                return np.mean(spectrograms, axis=1)[1:]
+
+        proc = ShortBatched(self.h5_main, h5_target_group=self.h5_file.create_group('Other'))
+        with self.assertRaises(ValueError):
+            _ = proc.compute()
+
+
+class TestFragmentedResume(unittest.TestCase):
+
+    def setUp(self):
+        delete_existing_file(data_utils.std_beps_path)
+        data_utils.make_beps_file()
+        self.h5_file = h5py.File(data_utils.std_beps_path, mode='r+')
+        self.h5_main = self.h5_file['Raw_Measurement/source_main']
+        self.h5_main = usid.USIDataset(self.h5_main)
+
+        parms_dict = {'parm_1': 1, 'parm_2': [1, 2, 3]}
+        self.results_grp, h5_results = _create_results_grp_dsets(self.h5_main,
+                                                                 'Mean_Val',
+                                                                 parms_dict)
+        self.exp_result = np.expand_dims(np.mean(self.h5_main[()], axis=1),
+                                         axis=1)
+        # Scattered positions (as left behind by several interrupted ranks)
+        status = np.ones(self.h5_main.shape[0], dtype=np.uint8)
+        status[1::3] = 0
+        status[10:17] = 0
+        results = self.exp_result.copy()
+        results[status == 0] = -1
+        h5_results[:, :] = results
+        self.results_grp.create_dataset('completed_positions', data=status)
+
+    def tearDown(self):
+        delete_existing_file(data_utils.std_beps_path)
+
+    def __verify(self, proc):
+        self.assertEqual(len(proc.partial_h5_groups), 1)
+        h5_grp = proc.compute()
+        self.assertEqual(h5_grp, self.results_grp)
+        self.assertTrue(np.allclose(h5_grp['Results'][()], self.exp_result))
+        self.assertTrue(np.all(h5_grp['completed_positions'][()] == 1))
+
+    def test_compute(self):
+        proc = AvgSpecCoalescedWrite(self.h5_main)
+        proc._max_pos_per_read = 9
+        self.__verify(proc)
+
+    def test_compute_lazy(self):
+        proc = AvgSpecCoalescedWrite(self.h5_main, lazy=True)
+        proc._max_pos_per_read = 9
+        proc._unit_computation = lambda *args, **kwargs: setattr(
+            proc, '_results', np.mean(proc.data.compute(), axis=1))
+        self.__verify(proc)
+
+    def test_status_ranges(self):
+        proc = AvgSpecCoalescedWrite(self.h5_main)
+        proc._max_pos_per_read = 9
+        self.__verify(proc)
+        h5_status = self.results_grp['completed_positions']
+        self.assertTrue(np.array_equal(h5_status.attrs['completed_ranges'],
+                                       [[0, self.h5_main.shape[0]]]))
+
+    def test_write_mismatched_positions(self):
+        proc = AvgSpecCoalescedWrite(self.h5_main)
+        with self.assertRaises(ValueError):
+            proc._write_to_positions(self.results_grp['Results'],
+                                     np.arange(3), positions=[0, 1])
+        with self.assertRaises(TypeError):
+            proc._write_to_positions(np.zeros(3), np.arange(2),
+                                     positions=[0, 1])
+
+
+class AvgSpecInterrupted(AvgSpecCoalescedWrite):
+
+    def _write_results_chunk(self):
+        if self._get_pixels_in_current_batch()[0] > 0:
+            raise KeyboardInterrupt('Interrupted after the first batch')
+        super(AvgSpecInterrupted, self)._write_results_chunk()
+
+
+class TestShardedCompute(TestCoreProcessNoTest):
+
+    def setUp(self, proc_class=AvgSpecCoalescedWrite, **proc_kwargs):
+        super(TestShardedCompute,
+              self).setUp(proc_class=proc_class, shard_results=True,
+                          **proc_kwargs)
+        self.proc._max_pos_per_read = 6
+
+    def tearDown(self):
+        super(TestShardedCompute, self).tearDown()
+        for path in glob.glob(os.path.splitext(data_utils.std_beps_path)[0] + '_*_shard_*.h5'):
+            os.remove(path)
+
+    def __get_shard_path(self, h5_grp):
+        return usid.processing.sharding.get_shard_path(h5_grp, 0)
+
+    def test_compute(self):
+        super(TestShardedCompute, self).test_compute()
+        h5_grp = self.proc.h5_results_grp
+        self.assertTrue(h5_grp['Results'].is_virtual)
+        self.assertTrue(np.all(h5_grp['shard_index'][()] == 0))
+        # Attributes pointing at the results datasets are restored
+        self.assertIsInstance(self.proc.h5_results, usid.USIDataset)
+        self.assertEqual(self.proc.h5_results.name, h5_grp['Results'].name)
+        self.assertTrue(np.allclose(self.proc.h5_results.h5_pos_inds[()],
+                                    self.h5_main.h5_pos_inds[()]))
+        with h5py.File(self.__get_shard_path(h5_grp), mode='r') as h5_shard:
+            self.assertEqual(h5_shard['Results'].compression, 'gzip')
+
+    def test_compute_copy(self):
+        self.proc = AvgSpecCoalescedWrite(self.h5_main, shard_results=True,
+                                          merge_shards='copy')
+        self.proc._max_pos_per_read = 6
+        super(TestShardedCompute, self).test_compute()
+        h5_grp = self.proc.h5_results_grp
+        self.assertFalse(h5_grp['Results'].is_virtual)
+        self.assertFalse(os.path.exists(self.__get_shard_path(h5_grp)))
+
+    def test_compute_pipelined(self):
+        self.proc = AvgSpecCoalescedWrite(self.h5_main, shard_results=True,
+                                          pipelined=True)
+        self.proc._max_pos_per_read = 12
+        super(TestShardedCompute, self).test_compute()
+
+    def test_resume(self):
+        proc = AvgSpecInterrupted(self.h5_main, shard_results=True)
+        proc._max_pos_per_read = 6
+        with self.assertRaises(KeyboardInterrupt):
+            _ = proc.compute()
+        h5_grp = proc.h5_results_grp
+        self.assertFalse(h5_grp['Results'].is_virtual)
+        self.assertTrue(os.path.exists(self.__get_shard_path(h5_grp)))
+        self.assertEqual(h5_grp['completed_positions'][()].sum(), 6)
+
+        self.proc = AvgSpecCoalescedWrite(self.h5_main, shard_results=True)
+        self.assertEqual(len(self.proc.partial_h5_groups), 1)
+        self.proc._max_pos_per_read = 6
+        super(TestShardedCompute, self).test_compute()
+        self.assertEqual(self.proc.h5_results_grp, h5_grp)
+
+    def test_resume_unsharded(self):
+        proc = AvgSpecInterrupted(self.h5_main)
+        proc._max_pos_per_read = 6
+        with self.assertRaises(KeyboardInterrupt):
+            _ = proc.compute()
+
+        self.proc = AvgSpecCoalescedWrite(self.h5_main, shard_results=True)
+        self.proc._max_pos_per_read = 6
+        super(TestShardedCompute, self).test_compute()
+        h5_grp = self.proc.h5_results_grp
+        self.assertTrue('Results_unsharded' in h5_grp.keys())
+        self.assertTrue(np.all(h5_grp['shard_index'][:6] == -1))
+        self.assertTrue(np.all(h5_grp['shard_index'][6:] == 0))
+
+    def test_invalid_args(self):
+        with self.assertRaises(TypeError):
+            _ = AvgSpecUltraBasic(self.h5_main, shard_results='yes')
+        with self.assertRaises(ValueError):
+            _ = AvgSpecUltraBasic(self.h5_main, merge_shards='blah')
+
+
+class AvgSpecSlowPixel(AvgSpecCoalescedWrite):
+
+    @staticmethod
+    def _map_function(spectrogram, *args, **kwargs):
+        mean_val = np.mean(spectrogram)
+        if np.isclose(mean_val, kwargs.get('slow_value', np.nan)):
+            time.sleep(1)
+        return mean_val
+
+
+class TestPixelTimeoutCompute(TestCoreProcessNoTest):
+
+    def setUp(self, proc_class=AvgSpecSlowPixel, **proc_kwargs):
+        super(TestPixelTimeoutCompute,
+              self).setUp(proc_class=proc_class, pixel_timeout=0.1,
+                          **proc_kwargs)
+        self.proc._max_pos_per_read = 6
+        self.slow_pos = 8
+        self.slow_value = float(self.exp_result[self.slow_pos, 0])
+
+    def test_compute(self):
+        # Positions are not slow unless requested
+        super(TestPixelTimeoutCompute, self).test_compute()
+
+    def test_retried_without_limit(self):
+        h5_grp = self.proc.compute(slow_value=self.slow_value)
+        self.assertTrue(np.allclose(h5_grp['Results'][()], self.exp_result))
+        self.assertTrue(np.all(h5_grp['completed_positions'][()] == 1))
+        self.assertEqual(h5_grp.attrs['last_pixel'], self.h5_main.shape[0])
+
+    def test_timed_out_again(self):
+        self.proc = AvgSpecSlowPixel(self.h5_main, pixel_timeout=0.1,
+                                     retry_timeout=0.1)
+        self.proc._max_pos_per_read = 6
+        h5_grp = self.proc.compute(slow_value=self.slow_value)
+        status = h5_grp['completed_positions'][()]
+        self.assertEqual(status[self.slow_pos], 2)
+        others = np.arange(self.h5_main.shape[0]) != self.slow_pos
+        self.assertTrue(np.all(status[others] == 1))
+        self.assertTrue(np.allclose(h5_grp['Results'][()][others],
+                                    self.exp_result[others]))
+        self.assertTrue(np.array_equal(h5_grp['completed_positions'].attrs['timed_out_ranges'],
+                                       [[self.slow_pos, self.slow_pos + 1]]))
+
+        # Only the position that timed out is computed when resuming
+        self.proc = AvgSpecSlowPixel(self.h5_main)
+        self.assertEqual(len(self.proc.partial_h5_groups), 1)
+        with mock.patch.object(AvgSpecSlowPixel, '_write_results_chunk',
+                               autospec=True,
+                               side_effect=AvgSpecCoalescedWrite._write_results_chunk) as mock_write:
+            h5_grp = self.proc.compute()
+        self.assertEqual(mock_write.call_count, 1)
+        self.assertTrue(np.allclose(h5_grp['Results'][()], self.exp_result))
+        self.assertTrue(np.all(h5_grp['completed_positions'][()] == 1))
+
+    def test_retry_stats_saved(self):
+        self.proc = AvgSpecSlowPixel(self.h5_main, pixel_timeout=0.1,
+                                     instrument=True, save_stats=True)
+        self.proc._max_pos_per_read = 6
+        h5_grp = self.proc.compute(slow_value=self.slow_value)
+        # Three batches followed by the batch of the position that was retried
+        self.assertEqual(len(self.proc.batch_stats), 4)
+        self.assertEqual(self.proc.batch_stats[-1]['positions'], 1)
+        self.assertTrue(np.all(h5_grp['Batch_Stats']['positions'] == [6, 6, 3, 1]))
+
+    def test_pool_backend(self):
+        self.proc = AvgSpecSlowPixel(self.h5_main, backend='pool',
+                                     pixel_timeout=0.1, retry_timeout=0.1)
+        self.proc._cores = 2
+        self.proc._max_pos_per_read = 6
+        h5_grp = self.proc.compute(slow_value=self.slow_value)
+        status = h5_grp['completed_positions'][()]
+        self.assertEqual(status[self.slow_pos], 2)
+        self.assertEqual(np.sum(status == 1), self.h5_main.shape[0] - 1)
+
+    def test_invalid_args(self):
+        for kwargs in [{'pixel_timeout': 'fast'}, {'pixel_timeout': True},
+                       {'retry_timeout': [1]}]:
+            with self.assertRaises(TypeError):
+                _ = AvgSpecUltraBasic(self.h5_main, **kwargs)
+        for kwargs in [{'pixel_timeout': 0}, {'retry_timeout': -1},
+                       {'pixel_timeout': 1, 'backend': 'threads'},
+                       {'pixel_timeout': 1, 'backend': 'shared'}]:
+            with self.assertRaises(ValueError):
+                _ = AvgSpecUltraBasic(self.h5_main, **kwargs)
+
+
+class AvgSpecChunkedResults(AvgSpecCoalescedWrite):
+
+    def __init__(self, h5_main, *args, **kwargs):
+        super(AvgSpecChunkedResults, self).__init__(h5_main, *args, **kwargs)
+        self.written_batches = []
+
+    def _create_results_datasets(self):
+        self.h5_results_grp = usid.hdf_utils.create_results_group(self.h5_main, self.process_name,
+                                                                  h5_parent_group=self._h5_target_group)
+        usid.hdf_utils.write_simple_attrs(self.h5_results_grp, self.parms_dict)
+        self.h5_results = usid.hdf_utils.write_main_dataset(
+            self.h5_results_grp, (self.h5_main.shape[0], 1), 'Results',
+            'quantity', 'units', None, usid.write_utils.Dimension('Empty', 'a. u.', 1),
+            dtype=np.float32, chunks=(4, 1),
+            h5_pos_inds=self.h5_main.h5_pos_inds,
+            h5_pos_vals=self.h5_main.h5_pos_vals)
+
+    def _write_results_chunk(self):
+        self.written_batches.append(list(self._get_pixels_in_current_batch()))
+        super(AvgSpecChunkedResults, self)._write_results_chunk()
+
+
+class TestChunkAlignedBatches(TestCoreProcessNoTest):
+
+    def setUp(self, proc_class=AvgSpecChunkedResults, **proc_kwargs):
+        super(TestChunkAlignedBatches,
+              self).setUp(proc_class=proc_class, **proc_kwargs)
+        self.proc._max_pos_per_read = 6
+
+    def test_compute(self):
+        super(TestChunkAlignedBatches, self).test_compute()
+        self.assertEqual(self.proc.written_batches,
+                         [list(range(0, 4)), list(range(4, 8)),
+                          list(range(8, 12)), list(range(12, 15))])
+
+    def test_resume(self):
+        self.proc._create_results_datasets()
+        self.proc.h5_results[:3] = self.exp_result[:3]
+        status = np.zeros(self.h5_main.shape[0], dtype=np.uint8)
+        status[:3] = 1
+        self.proc.h5_results_grp.create_dataset('completed_positions', data=status)
+
+        self.proc = AvgSpecChunkedResults(self.h5_main)
+        self.assertEqual(len(self.proc.partial_h5_groups), 1)
+        self.proc._max_pos_per_read = 6
+        super(TestChunkAlignedBatches, self).test_compute()
+        # The first batch only completes the partially computed chunk
+        self.assertEqual(self.proc.written_batches,
+                         [[3], list(range(4, 8)), list(range(8, 12)),
+                          list(range(12, 15))])
+
+    def test_chunks_larger_than_batch(self):
+        self.proc._max_pos_per_read = 3
+        super(TestChunkAlignedBatches, self).test_compute()
+        self.assertEqual([len(batch) for batch in self.proc.written_batches],
+                         [3, 3, 3, 3, 3])
+
+    def test_chunked_source(self):
+        h5_chunked = usid.hdf_utils.write_main_dataset(
+            self.h5_main.parent, self.h5_main[()], 'chunked_main', 'quantity',
+            'units', None, None, chunks=(4, self.h5_main.shape[1]),
+            h5_pos_inds=self.h5_main.h5_pos_inds,
+            h5_pos_vals=self.h5_main.h5_pos_vals,
+            h5_spec_inds=self.h5_main.h5_spec_inds,
+            h5_spec_vals=self.h5_main.h5_spec_vals)
+        self.proc = AvgSpecCoalescedWrite(h5_chunked, instrument=True)
+        # Batches smaller than chunks read some chunks twice
+        self.proc._max_pos_per_read = 3
+        h5_grp = self.proc.compute()
+        self.assertTrue(np.allclose(h5_grp['Results'][()], self.exp_result))
+        self.assertEqual([record['chunks_read'] for record in self.proc.batch_stats],
+                         [1, 2, 2, 1, 1])
+        self.assertEqual([record['chunks_reread'] for record in self.proc.batch_stats],
+                         [0, 1, 1, 1, 0])
+
+        self.proc = AvgSpecCoalescedWrite(h5_chunked, instrument=True)
+        self.proc._max_pos_per_read = 6
+        _ = self.proc.compute(override=True)
+        self.assertEqual([record['chunks_read'] for record in self.proc.batch_stats],
+                         [1, 1, 1, 1])
+        self.assertEqual([record['chunks_reread'] for record in self.proc.batch_stats],
+                         [0, 0, 0, 0])
+
+    def test_chunk_grid(self):
+        from pyUSID.processing.process import _get_chunk_grid
+        self.assertEqual(_get_chunk_grid([4, 6], 12), 12)
+        self.assertEqual(_get_chunk_grid([4, 6], 10), 4)
+        self.assertEqual(_get_chunk_grid([16, 2], 10), 2)
+        self.assertEqual(_get_chunk_grid([], 10), 1)
+
+
 # TODO: read_data_chunk
 # TODO: interrupt computation
 # TODO: set_cores, invalid inputs, etc.
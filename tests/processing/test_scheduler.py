@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 2026
+"""
+from __future__ import division, print_function, unicode_literals, absolute_import
+import unittest
+import os
+import sys
+import shutil
+import subprocess
+import tempfile
+
+sys.path.append("../../pyUSID/")
+from pyUSID.processing.scheduler import SharedJobCounter, get_epochs_due
+
+try:
+    from mpi4py import MPI
+except ImportError:
+    MPI = None
+
+# Each rank claims batches until the jobs run out. Rank 0 prints every claimed batch
+_claim_script = """
+from mpi4py import MPI
+from pyUSID.processing.scheduler import SharedJobCounter
+
+num_jobs, batch_size = 50, 4
+comm = MPI.COMM_WORLD
+counter = SharedJobCounter(comm)
+claimed = []
+start = counter.fetch_and_add(batch_size)
+while start < num_jobs:
+    claimed.append(start)
+    start = counter.fetch_and_add(batch_size)
+counter.free()
+claimed = comm.gather(claimed, root=0)
+if comm.Get_rank() == 0:
+    print(' '.join([str(start) for rank_starts in claimed for start in rank_starts]))
+"""
+
+
+def _find_mpiexec():
+    mpiexec = os.path.join(os.path.dirname(sys.executable), 'mpiexec')
+    if os.path.isfile(mpiexec):
+        return mpiexec
+    return shutil.which('mpiexec')
+
+
+class TestEpochsDue(unittest.TestCase):
+
+    def test_epochs(self):
+        self.assertEqual(get_epochs_due(0, 50, 8), 0)
+        self.assertEqual(get_epochs_due(7, 50, 8), 0)
+        self.assertEqual(get_epochs_due(8, 50, 8), 1)
+        self.assertEqual(get_epochs_due(49, 50, 8), 6)
+        # Ranks that find the queue empty make every remaining checkpoint
+        self.assertEqual(get_epochs_due(52, 50, 8), 6)
+        self.assertEqual(get_epochs_due(500, 48, 8), 5)
+        self.assertEqual(get_epochs_due(5, 0, 8), 0)
+
+    def test_invalid_epoch_size(self):
+        with self.assertRaises(ValueError):
+            _ = get_epochs_due(0, 10, 0)
+
+
+@unittest.skipIf(MPI is None, 'mpi4py is not installed')
+class TestSharedJobCounter(unittest.TestCase):
+
+    def test_single_rank(self):
+        counter = SharedJobCounter(MPI.COMM_SELF, start=5)
+        self.assertEqual(counter.fetch_and_add(3), 5)
+        self.assertEqual(counter.fetch_and_add(10), 8)
+        self.assertEqual(counter.fetch_and_add(1), 18)
+        counter.free()
+
+    def test_fetch_after_free(self):
+        counter = SharedJobCounter(MPI.COMM_SELF)
+        counter.free()
+        # Freeing again should not fail
+        counter.free()
+        with self.assertRaises(ValueError):
+            _ = counter.fetch_and_add(1)
+
+    def test_invalid_comm(self):
+        with self.assertRaises(TypeError):
+            _ = SharedJobCounter('COMM_WORLD')
+
+    def test_invalid_start(self):
+        with self.assertRaises(TypeError):
+            _ = SharedJobCounter(MPI.COMM_SELF, start=1.5)
+
+    @unittest.skipIf(_find_mpiexec() is None, 'mpiexec is not available')
+    def test_batches_claimed_once_across_ranks(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.py', delete=False) as file_handle:
+            file_handle.write(_claim_script)
+            script_path = file_handle.name
+        try:
+            env = dict(os.environ)
+            package_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+            env['PYTHONPATH'] = os.pathsep.join([package_root] + [path for path in
+                                                                  env.get('PYTHONPATH', '').split(os.pathsep)
+                                                                  if path])
+            # Run from the package root so that the tests' 'io' folder does not shadow the standard library
+            output = subprocess.run([_find_mpiexec(), '-n', '3', sys.executable, script_path],
+                                    stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                                    cwd=package_root, env=env, timeout=120)
+        finally:
+            os.remove(script_path)
+        self.assertEqual(output.returncode, 0, msg=output.stderr.decode())
+        claimed = sorted([int(start) for start in output.stdout.decode().split()])
+        self.assertEqual(claimed, list(range(0, 50, 4)))
+
+
+if __name__ == '__main__':
+    unittest.main()
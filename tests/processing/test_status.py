@@ -0,0 +1,164 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 2026
+"""
+from __future__ import division, print_function, unicode_literals, absolute_import
+import unittest
+import os
+import sys
+from unittest import mock
+import numpy as np
+import h5py
+
+sys.path.append("../../pyUSID/")
+from pyUSID.processing.status import StatusTracker, RANGES_ATTR, TIMED_OUT_RANGES_ATTR, \
+    MAX_PERSISTED_RANGES, TIMED_OUT
+
+file_path = 'test_status.h5'
+
+
+class TestStatusTracker(unittest.TestCase):
+
+    def test_empty(self):
+        tracker = StatusTracker(10)
+        self.assertEqual(tracker.num_completed, 0)
+        self.assertEqual(tracker.num_remaining, 10)
+        self.assertEqual(tracker.percent_complete, 0)
+        self.assertFalse(tracker.is_complete)
+        self.assertTrue(np.array_equal(tracker.remaining(), np.arange(10)))
+        self.assertTrue(np.array_equal(tracker.remaining_ranges(), [[0, 10]]))
+
+    def test_mark_merges_ranges(self):
+        tracker = StatusTracker(20)
+        tracker.mark([5, 6, 7, 12])
+        tracker.mark(np.arange(8, 10))
+        tracker.mark_ranges([[15, 20], [0, 2]])
+        self.assertTrue(np.array_equal(tracker.ranges, [[0, 2], [5, 10], [12, 13], [15, 20]]))
+        self.assertEqual(tracker.num_completed, 13)
+        self.assertEqual(tracker.percent_complete, 65)
+        self.assertTrue(np.array_equal(tracker.remaining(), [2, 3, 4, 10, 11, 13, 14]))
+
+    def test_mark_overlapping(self):
+        tracker = StatusTracker(10, ranges=[[0, 4], [2, 6]])
+        tracker.mark(np.arange(3, 10))
+        self.assertTrue(tracker.is_complete)
+        self.assertEqual(tracker.remaining().size, 0)
+        self.assertEqual(tracker.remaining_ranges().shape, (0, 2))
+
+    def test_positions_and_contains(self):
+        tracker = StatusTracker(20, ranges=[[2, 5], [9, 10], [15, 20]])
+        self.assertTrue(np.array_equal(tracker.positions(), [2, 3, 4, 9, 15, 16, 17, 18, 19]))
+        self.assertTrue(np.array_equal(tracker.contains([0, 2, 5, 9, 10, 14, 19]),
+                                       [False, True, False, True, False, False, True]))
+        tracker.clear()
+        self.assertEqual(tracker.num_completed, 0)
+        self.assertEqual(tracker.positions().size, 0)
+        self.assertFalse(np.any(tracker.contains([2, 9])))
+
+    def test_remaining_exclude(self):
+        tracker = StatusTracker(10, ranges=[[0, 3]])
+        timed_out = StatusTracker(10, ranges=[[5, 6], [2, 4]])
+        self.assertTrue(np.array_equal(tracker.remaining(exclude=timed_out), [4, 6, 7, 8, 9]))
+        # The tracker itself is unchanged
+        self.assertEqual(tracker.num_completed, 3)
+        with self.assertRaises(TypeError):
+            _ = tracker.remaining(exclude=[[5, 6]])
+
+    def test_invalid_inputs(self):
+        with self.assertRaises(TypeError):
+            _ = StatusTracker(-1)
+        with self.assertRaises(TypeError):
+            _ = StatusTracker(1.5)
+        tracker = StatusTracker(10)
+        with self.assertRaises(ValueError):
+            tracker.mark([3, 10])
+        with self.assertRaises(ValueError):
+            tracker.mark_ranges([[-1, 2]])
+
+
+class TestStatusPersistence(unittest.TestCase):
+
+    def setUp(self):
+        self.status = np.zeros(50, dtype=np.uint8)
+        self.status[3:11] = 1
+        self.status[20:21] = 1
+        self.status[45:] = 1
+        self.h5_file = h5py.File(file_path, mode='w')
+        self.h5_status = self.h5_file.create_dataset('completed_positions', data=self.status)
+
+    def tearDown(self):
+        self.h5_file.close()
+        os.remove(file_path)
+
+    def test_from_status_dataset(self):
+        for chunk_size in [4, 7, 50, 100]:
+            tracker = StatusTracker.from_status_dataset(self.h5_status, chunk_size=chunk_size)
+            self.assertTrue(np.array_equal(tracker.ranges, [[3, 11], [20, 21], [45, 50]]))
+            self.assertTrue(np.array_equal(tracker.remaining(), np.where(self.status == 0)[0]))
+
+    def test_load_without_ranges_scans(self):
+        tracker = StatusTracker.load(self.h5_status)
+        self.assertEqual(tracker.num_completed, self.status.sum())
+
+    def test_save_and_load(self):
+        tracker = StatusTracker.load(self.h5_status)
+        tracker.save(self.h5_status)
+        self.assertTrue(np.array_equal(self.h5_status.attrs[RANGES_ATTR], tracker.ranges))
+        # Load should trust the ranges rather than scanning the dataset
+        with mock.patch.object(StatusTracker, 'from_status_dataset') as scan:
+            loaded = StatusTracker.load(self.h5_status)
+            self.assertEqual(scan.call_count, 0)
+        self.assertTrue(np.array_equal(loaded.ranges, tracker.ranges))
+
+        StatusTracker.invalidate(self.h5_status)
+        self.assertFalse(RANGES_ATTR in self.h5_status.attrs.keys())
+        self.h5_status[:] = 0
+        self.assertEqual(StatusTracker.load(self.h5_status).num_completed, 0)
+
+    def test_stale_ranges_rebuilt(self):
+        StatusTracker.load(self.h5_status).save(self.h5_status)
+        # Written by an older version of pyUSID that does not update the ranges
+        self.h5_status[11:16] = 1
+        self.h5_status[0:2] = 1
+        loaded = StatusTracker.load(self.h5_status)
+        self.assertTrue(np.array_equal(loaded.ranges, [[0, 2], [3, 16], [20, 21], [45, 50]]))
+        # Positions that are no longer marked as computed
+        self.h5_status[:] = 0
+        self.assertEqual(StatusTracker.load(self.h5_status).num_completed, 0)
+
+    def test_save_empty(self):
+        tracker = StatusTracker(self.h5_status.shape[0])
+        tracker.save(self.h5_status)
+        self.assertTrue(np.array_equal(self.h5_status.attrs[RANGES_ATTR], [[0, 0]]))
+        self.h5_status[:] = 0
+        self.assertEqual(StatusTracker.load(self.h5_status).num_completed, 0)
+        self.h5_status[:] = 1
+        self.assertEqual(StatusTracker.load(self.h5_status).num_completed, 50)
+
+    def test_timed_out_value(self):
+        self.h5_status[30:33] = TIMED_OUT
+        timed_out = StatusTracker.load(self.h5_status, value=TIMED_OUT)
+        self.assertTrue(np.array_equal(timed_out.ranges, [[30, 33]]))
+        timed_out.save(self.h5_status, value=TIMED_OUT)
+        StatusTracker.load(self.h5_status).save(self.h5_status)
+        self.assertTrue(np.array_equal(self.h5_status.attrs[TIMED_OUT_RANGES_ATTR], [[30, 33]]))
+        self.assertTrue(np.array_equal(self.h5_status.attrs[RANGES_ATTR], [[3, 11], [20, 21], [45, 50]]))
+
+        StatusTracker.invalidate(self.h5_status)
+        self.assertFalse(TIMED_OUT_RANGES_ATTR in self.h5_status.attrs.keys())
+        self.assertFalse(RANGES_ATTR in self.h5_status.attrs.keys())
+        with self.assertRaises(ValueError):
+            _ = StatusTracker.load(self.h5_status, value=0)
+
+    def test_too_many_ranges(self):
+        num_pos = 2 * MAX_PERSISTED_RANGES + 2
+        h5_status = self.h5_file.create_dataset('fragmented', shape=(num_pos,), dtype=np.uint8)
+        h5_status[::2] = 1
+        tracker = StatusTracker.load(h5_status)
+        self.assertEqual(tracker.num_completed, MAX_PERSISTED_RANGES + 1)
+        tracker.save(h5_status)
+        self.assertFalse(RANGES_ATTR in h5_status.attrs.keys())
+
+
+if __name__ == '__main__':
+    unittest.main()
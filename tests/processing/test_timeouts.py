@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 2026
+"""
+from __future__ import division, print_function, unicode_literals, absolute_import
+import unittest
+import sys
+import time
+import pickle
+import signal
+import threading
+from unittest import mock
+
+sys.path.append("../../pyUSID/")
+from pyUSID.processing.timeouts import TimeLimitedFunction, TimedOut
+
+
+def _sleep_and_return(duration, value=1):
+    time.sleep(duration)
+    return value
+
+
+def _swallow_exceptions(duration):
+    try:
+        time.sleep(duration)
+    except Exception:
+        return 'swallowed'
+    return 'done'
+
+
+class TestTimeLimitedFunction(unittest.TestCase):
+
+    def test_within_limit(self):
+        func = TimeLimitedFunction(_sleep_and_return, 5)
+        self.assertEqual(func(0, value=3), 3)
+
+    def test_timed_out(self):
+        func = TimeLimitedFunction(_sleep_and_return, 0.05)
+        t_start = time.time()
+        self.assertEqual(func(2), TimedOut())
+        self.assertLess(time.time() - t_start, 1)
+        # The timer is disarmed afterwards
+        self.assertEqual(func(0), 1)
+
+    def test_not_swallowed(self):
+        func = TimeLimitedFunction(_swallow_exceptions, 0.05)
+        self.assertIsInstance(func(2), TimedOut)
+
+    def test_expires_after_return(self):
+        func = TimeLimitedFunction(_sleep_and_return, 5)
+        orig_setitimer = signal.setitimer
+
+        def expire_then_disarm(which, seconds, interval=0):
+            if seconds == 0:
+                # The timer expires after the function returned but before it is disarmed
+                signal.getsignal(signal.SIGALRM)(signal.SIGALRM, None)
+            return orig_setitimer(which, seconds, interval)
+
+        with mock.patch('pyUSID.processing.timeouts.signal.setitimer', side_effect=expire_then_disarm):
+            self.assertEqual(func(0, value=7), 7)
+
+    def test_outside_main_thread(self):
+        func = TimeLimitedFunction(_sleep_and_return, 0.01)
+        errors = []
+
+        def call():
+            try:
+                func(0.1)
+            except RuntimeError as exc:
+                errors.append(exc)
+
+        thread = threading.Thread(target=call)
+        thread.start()
+        thread.join()
+        # The time limit cannot be enforced
+        self.assertEqual(len(errors), 1)
+
+    def test_restores_handler_and_timer(self):
+        alarms = []
+
+        def on_alarm(signum, frame):
+            alarms.append(signum)
+
+        prev_handler = signal.signal(signal.SIGALRM, on_alarm)
+        try:
+            signal.setitimer(signal.ITIMER_REAL, 5)
+            func = TimeLimitedFunction(_sleep_and_return, 0.05)
+            self.assertEqual(func(2), TimedOut())
+            self.assertIs(signal.getsignal(signal.SIGALRM), on_alarm)
+            delay, _ = signal.getitimer(signal.ITIMER_REAL)
+            self.assertTrue(4 < delay <= 5)
+
+            # A timer that expires during the call fires right after the call
+            signal.setitimer(signal.ITIMER_REAL, 0.05)
+            self.assertEqual(TimeLimitedFunction(_sleep_and_return, 5)(0.2), 1)
+            time.sleep(0.05)
+            self.assertEqual(alarms, [signal.SIGALRM])
+        finally:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, prev_handler)
+
+    def test_equality_and_pickle(self):
+        func = TimeLimitedFunction(_sleep_and_return, 1)
+        self.assertEqual(func, TimeLimitedFunction(_sleep_and_return, 1.0))
+        self.assertNotEqual(func, TimeLimitedFunction(_sleep_and_return, 2))
+        self.assertNotEqual(func, TimeLimitedFunction(_swallow_exceptions, 1))
+        self.assertEqual(pickle.loads(pickle.dumps(func)), func)
+        self.assertEqual(pickle.loads(pickle.dumps(TimedOut())), TimedOut())
+
+    def test_invalid_inputs(self):
+        with self.assertRaises(TypeError):
+            _ = TimeLimitedFunction('not callable', 1)
+        with self.assertRaises(TypeError):
+            _ = TimeLimitedFunction(_sleep_and_return, '1')
+        with self.assertRaises(TypeError):
+            _ = TimeLimitedFunction(_sleep_and_return, True)
+        with self.assertRaises(ValueError):
+            _ = TimeLimitedFunction(_sleep_and_return, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 2026
+"""
+from __future__ import division, print_function, unicode_literals, absolute_import
+import unittest
+import sys
+import numpy as np
+from unittest import mock
+
+sys.path.append("../../pyUSID/")
+from pyUSID.processing import workers
+from pyUSID.processing.workers import WorkerPool, SharedArray
+
+
+def _weighted_sum(vector, weights, offset=0):
+    return np.sum(vector * weights) + offset
+
+
+class TestWorkerPool(unittest.TestCase):
+
+    def setUp(self):
+        self.data = np.random.rand(50, 7)
+        self.weights = np.random.rand(7)
+        self.expected = np.sum(self.data * self.weights, axis=1) + 3
+
+    def test_serial(self):
+        pool = WorkerPool(_weighted_sum, cores=1, func_args=[self.weights],
+                          func_kwargs={'offset': 3})
+        self.assertTrue(np.allclose(pool.map(self.data), self.expected))
+        pool.close()
+
+    def test_multiple_batches(self):
+        with WorkerPool(_weighted_sum, cores=2, func_args=(self.weights,),
+                        func_kwargs={'offset': 3}) as pool:
+            for batch in range(0, 50, 20):
+                results = pool.map(self.data[batch: batch + 20])
+                self.assertTrue(np.allclose(results,
+                                            self.expected[batch: batch + 20]))
+
+    def test_map_after_close(self):
+        pool = WorkerPool(_weighted_sum, cores=2, func_args=[self.weights])
+        pool.close()
+        with self.assertRaises(ValueError):
+            _ = pool.map(self.data)
+
+    def test_matches(self):
+        kwargs = {'offset': 3}
+        pool = WorkerPool(_weighted_sum, cores=1, func_args=[self.weights],
+                          func_kwargs=kwargs)
+        self.assertTrue(pool.matches(_weighted_sum, (self.weights,), kwargs))
+        self.assertFalse(pool.matches(_weighted_sum,
+                                      (self.weights.copy(),), kwargs))
+        self.assertFalse(pool.matches(np.sum, (self.weights,), kwargs))
+        self.assertFalse(pool.matches(_weighted_sum, (self.weights,), None))
+
+    def test_not_callable(self):
+        with self.assertRaises(TypeError):
+            _ = WorkerPool('not a function')
+
+    def test_invalid_cores(self):
+        with self.assertRaises(TypeError):
+            _ = WorkerPool(_weighted_sum, cores=1.5)
+        with self.assertRaises(ValueError):
+            _ = WorkerPool(_weighted_sum, cores=0)
+
+    def test_invalid_args(self):
+        with self.assertRaises(TypeError):
+            _ = WorkerPool(_weighted_sum, func_args={'a': 1})
+        with self.assertRaises(TypeError):
+            _ = WorkerPool(_weighted_sum, func_kwargs=[1, 2])
+
+
+def _row_sums(block):
+    return np.sum(block, axis=1)
+
+
+class TestSharedArray(unittest.TestCase):
+
+    def test_attach(self):
+        shared = SharedArray((5, 3), np.float32)
+        shared.array[:] = np.arange(15).reshape(5, 3)
+        attached = SharedArray.attach(shared.descriptor)
+        self.assertEqual(attached.shape, (5, 3))
+        self.assertEqual(attached.dtype, np.float32)
+        self.assertTrue(np.allclose(attached.array, shared.array))
+        # Changes are visible to the other side without copying
+        attached.array[0, 0] = -1
+        self.assertEqual(shared.array[0, 0], -1)
+        attached.close()
+        # The memory belongs to the process that allocated it
+        self.assertEqual(shared.array[0, 0], -1)
+        shared.close()
+        self.assertIsNone(shared.array)
+        # Closing again should not fail
+        shared.close()
+
+    @unittest.skipIf(not workers._TRACKED, 'Shared memory is not tracked when attaching')
+    def test_attach_untracked(self):
+        shared = SharedArray((4,), np.uint8)
+        register = workers.resource_tracker.register
+        with mock.patch.object(workers.resource_tracker, 'unregister') as mock_unregister:
+            attached = SharedArray.attach(shared.descriptor)
+            # Memory allocated by this process remains registered
+            mock_unregister.assert_not_called()
+            with mock.patch.object(workers, '_allocated_names', set()):
+                other = SharedArray.attach(shared.descriptor)
+            # The resource tracker is not patched but told to forget memory allocated elsewhere
+            self.assertIs(workers.resource_tracker.register, register)
+        mock_unregister.assert_called_once_with('/' + shared.name, 'shared_memory')
+        for shared_array in [other, attached, shared]:
+            shared_array.close()
+
+
+class TestMapShared(unittest.TestCase):
+
+    def setUp(self):
+        self.data = SharedArray((50, 7), np.float64)
+        self.data.array[:] = np.random.rand(50, 7)
+        self.out = SharedArray((50,), np.float64)
+        self.weights = np.random.rand(7)
+
+    def tearDown(self):
+        self.data.close()
+        self.out.close()
+
+    def test_serial(self):
+        pool = WorkerPool(_weighted_sum, cores=1, func_args=[self.weights])
+        pool.map_shared(self.data, self.out)
+        self.assertTrue(np.allclose(self.out.array,
+                                    np.sum(self.data.array * self.weights, axis=1)))
+
+    def test_multiple_cores(self):
+        with WorkerPool(_weighted_sum, cores=2, func_args=[self.weights],
+                        func_kwargs={'offset': 3}) as pool:
+            # Only the leading rows should be computed
+            self.out.array[:] = 0
+            pool.map_shared(self.data, self.out, num_rows=20)
+            expected = np.sum(self.data.array[:20] * self.weights, axis=1) + 3
+            self.assertTrue(np.allclose(self.out.array[:20], expected))
+            self.assertTrue(np.all(self.out.array[20:] == 0))
+
+    def test_batched(self):
+        with WorkerPool(_row_sums, cores=2) as pool:
+            pool.map_shared(self.data, self.out, batched=True)
+        self.assertTrue(np.allclose(self.out.array, np.sum(self.data.array, axis=1)))
+
+    def test_invalid_args(self):
+        pool = WorkerPool(_row_sums, cores=1)
+        with self.assertRaises(TypeError):
+            pool.map_shared(self.data.array, self.out)
+        with self.assertRaises(ValueError):
+            pool.map_shared(self.data, self.out, num_rows=51)
+
+
+if __name__ == '__main__':
+    unittest.main()